@@ -0,0 +1,177 @@
+import contextlib
+import gc
+import io
+import sys
+import time
+import tracemalloc
+
+from co import reader
+from co import ast
+from co.ast.Traversal import operands, post_order
+from bench.generator import generate
+from bench.pass_pipeline import dump, run_sequential
+
+# Purpose:
+
+# Compare the object tree of AstNodes with an AstArena holding the same
+# tree as integer columns, on a generated program of about a million
+# nodes (the large tier, see generator). Three things are measured:
+#
+#   memory:     what the tree retains, as seen by tracemalloc, i.e. the
+#               nodes with their children lists and tokens for the
+#               object tree, and the columns, attribute lists and kind
+#               table for the arena
+#   traversal:  a pre-order visit of every node, a Walker counting
+#               names, and the post-order and operand lists of
+#               every expression (see Traversal)
+#   passes:     Pass1 to Pass5b, one after another, which must give the
+#               same tree and the same messages on both
+#
+# Parsing is not timed; the arena is built from the parsed tree.
+
+# Usage:
+#
+#   python -m bench.ast_arena [tier] [seed]
+
+class NameCounter (ast.Walker):
+
+  pre_order = {
+    'Name': 'name',
+  }
+
+  def __init__ (self):
+    self.count = 0
+
+  def name (self, node):
+    self.count += 1
+
+def visit_tree (root) -> int:
+  count = 0
+  stack = [root]
+  pop = stack.pop
+  extend = stack.extend
+  while stack:
+    node = pop()
+    count += 1
+    extend(reversed(node.children))
+  return count
+
+def visit_arena (root: ast.ArenaNode) -> int:
+  arena = root.arena
+  first_child = arena.first_child
+  next_sibling = arena.next_sibling
+  count = 0
+  stack = [root.index]
+  pop = stack.pop
+  push = stack.append
+  while stack:
+    index = pop()
+    count += 1
+    mark = len(stack)
+    child = first_child[index]
+    while child != -1:
+      push(child)
+      child = next_sibling[child]
+    if len(stack) - mark > 1:
+      stack[mark:] = reversed(stack[mark:])
+  return count
+
+def walk (root) -> int:
+  walker = NameCounter()
+  walker.walk(root)
+  return walker.count
+
+def expressions (root):
+  # Function listing the operators and operands of every expression. The roots are found
+  # with a Walker, which is not timed.
+  class Roots (ast.Walker):
+    pre_order = { 'ExpressionRoot': 'expression' }
+    def __init__ (self):
+      self.roots = []
+    def expression (self, node):
+      self.roots.append(node.child(0))
+      return ast.Walker.SKIP
+  finder = Roots()
+  finder.walk(root)
+  roots = finder.roots
+  def run () -> int:
+    return sum(len(post_order(node)) + len(operands(node)) for node in roots)
+  return run
+
+def timed (function, repeat: int = 3):
+  best = None
+  for _ in range(repeat):
+    gc.collect()
+    gc.disable()
+    try:
+      start = time.perf_counter()
+      result = function()
+      elapsed = time.perf_counter() - start
+    finally:
+      gc.enable()
+    best = elapsed if best is None else min(best, elapsed)
+  return result, best
+
+def parse (buffer: reader.TokenBuffer):
+  return reader.BufferParser(buffer).process()
+
+def traced (function):
+  # Result of function and the memory it still holds on return
+  gc.collect()
+  tracemalloc.start()
+  result = function()
+  gc.collect()
+  size, _ = tracemalloc.get_traced_memory()
+  tracemalloc.stop()
+  return result, size
+
+def run_passes (root):
+  output = io.StringIO()
+  gc.collect()
+  gc.disable()
+  try:
+    with contextlib.redirect_stdout(output):
+      start = time.perf_counter()
+      run_sequential(root, False)
+      elapsed = time.perf_counter() - start
+  finally:
+    gc.enable()
+  return (dump(root), output.getvalue()), elapsed
+
+def main ():
+  tier = sys.argv[1] if len(sys.argv) > 1 else 'large'
+  seed = int(sys.argv[2]) if len(sys.argv) > 2 else 0
+  lexer = reader.TableLexer()
+  lexer.setInput(generate(tier, seed))
+  buffer = lexer.tokenize_all()
+  buffer.settle()
+  tree, tree_size = traced(lambda: parse(buffer))
+  arena, arena_size = traced(lambda: ast.AstArena.from_tree(tree, buffer))
+  _, build_time = timed(lambda: ast.AstArena.from_tree(tree, buffer), repeat=1)
+  count = len(arena)
+  print(f"nodes: {count:,}, arena built in {build_time:.3f} s")
+  print(f"{'memory':<12}{'traced MiB':>12}{'bytes/node':>12}")
+  print(f"{'tree':<12}{tree_size / 2**20:>12.1f}{tree_size / count:>12.1f}")
+  print(f"{'arena':<12}{arena_size / 2**20:>12.1f}{arena_size / count:>12.1f}")
+  print(f"{'  columns':<12}{arena.nbytes() / 2**20:>12.1f}{arena.nbytes() / count:>12.1f}")
+  print(f"reduction: {tree_size / arena_size:.1f}x")
+  print(f"{'traversal':<14}{'tree s':>10}{'arena s':>10}{'speedup':>10}  same result")
+  root = arena.root
+  for name, tree_run, arena_run in (
+    ('pre-order', lambda: visit_tree(tree), lambda: visit_arena(root)),
+    ('walker', lambda: walk(tree), lambda: walk(root)),
+    ('expressions', expressions(tree), expressions(root)),
+  ):
+    tree_result, tree_time = timed(tree_run)
+    arena_result, arena_time = timed(arena_run)
+    print(f"{name:<14}{tree_time:>10.3f}{arena_time:>10.3f}{tree_time / arena_time:>9.2f}x  {tree_result == arena_result}")
+  # The passes annotate the trees, so they run once, on fresh copies
+  del tree, arena, root
+  tree = parse(buffer)
+  arena = ast.AstArena.from_tree(parse(buffer), buffer)
+  tree_result, tree_time = run_passes(tree)
+  arena_result, arena_time = run_passes(arena.root)
+  print(f"{'passes':<14}{tree_time:>10.3f}{arena_time:>10.3f}{tree_time / arena_time:>9.2f}x  {tree_result == arena_result}")
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,106 @@
+import gc
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from co import reader
+from bench.generator import generate
+
+# Purpose:
+
+# Compare parsing a package of generated source files from scratch
+# with loading their trees from an AST cache (see AstCache). The first
+# cached run parses every file and fills the cache, the second loads
+# every tree from it, and the third follows an edit to one file, which
+# is parsed again while the others are loaded. Every run starts from
+# the files on disk, so reading and hashing the sources are part of the
+# cached times. Files are parsed in this process, one after another,
+# and all runs must give the same package tree.
+
+# Usage:
+#
+#   python -m bench.ast_cache [file_count] [tier]
+#
+# The defaults are 100 files of the small tier (see generator), each
+# generated from its own seed.
+
+def shape (root) -> list:
+  # Kinds, parser flags and tokens in pre-order, for comparing trees
+  result = []
+  stack = [root]
+  while stack:
+    node = stack.pop()
+    token = node.token
+    result.append((
+      node.kind,
+      len(node.children),
+      node.is_constant,
+      node.is_global,
+      node.is_final,
+      token and (token.kind, token.lexeme, token.position, token.value),
+    ))
+    stack.extend(reversed(node.children))
+  return result
+
+def timed (function, repeat: int = 3):
+  best = None
+  for _ in range(repeat):
+    gc.collect()
+    gc.disable()
+    try:
+      start = time.perf_counter()
+      result = function()
+      elapsed = time.perf_counter() - start
+    finally:
+      gc.enable()
+    best = elapsed if best is None else min(best, elapsed)
+  return result, best
+
+def main ():
+  file_count = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+  tier = sys.argv[2] if len(sys.argv) > 2 else 'small'
+  directory = tempfile.mkdtemp()
+  try:
+    sources = os.path.join(directory, 'sources')
+    os.makedirs(sources)
+    for i in range(file_count):
+      with open(os.path.join(sources, f"source{i:04}.co"), 'w') as file:
+        file.write(generate(tier, i))
+    size = sum(entry.stat().st_size for entry in os.scandir(sources))
+    cache = os.path.join(directory, 'cache')
+    parse = lambda: reader.PackageParser(sources, workers=1).process()
+    load = lambda: reader.PackageParser(sources, workers=1, cache_directory=cache).process()
+    reference, parse_time = timed(parse)
+    stored, store_time = timed(load, repeat=1)
+    loaded, load_time = timed(load)
+    # Edit one file, and load again
+    with open(os.path.join(sources, 'source0000.co'), 'a') as file:
+      file.write("var edited: int32 = 1;\n")
+    edited, edit_time = timed(load, repeat=1)
+    cache_size = sum(entry.stat().st_size for entry in os.scandir(cache) if entry.name.endswith('.ast'))
+  finally:
+    shutil.rmtree(directory)
+  expected = shape(reference)
+  same = expected == shape(stored) == shape(loaded)
+  # The edited file ends with the new declaration, and the others are
+  # as they were
+  edit_seen = (
+    edited.child(0).children[-1].child(0).token.lexeme == 'edited'
+    and all(shape(a) == shape(b) for a, b in zip(reference.children[1:], edited.children[1:]))
+  )
+  print(f"package: {file_count} files, {size / 2**20:.1f} MiB, {len(expected)} nodes")
+  print(f"cache: {cache_size / 2**20:.1f} MiB of trees")
+  print(f"same trees: {same}, edit picked up: {edit_seen}")
+  print(f"{'run':<24}{'seconds':>10}{'speedup':>10}")
+  for name, elapsed in (
+    ('parse', parse_time),
+    ('cache miss (store)', store_time),
+    ('cache hit (load)', load_time),
+    ('one file edited', edit_time),
+  ):
+    print(f"{name:<24}{elapsed:>10.3f}{parse_time / elapsed:>10.1f}")
+
+if __name__ == '__main__':
+  main()
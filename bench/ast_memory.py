@@ -0,0 +1,134 @@
+import sys
+import tracemalloc
+
+from co import reader
+from co import ast
+from bench.lexer_throughput import make_source
+
+# Purpose:
+
+# Report the memory used per AST node for a large synthetic
+# translation unit, comparing the slotted AstNode with the dict-based
+# layout that it replaced. The tree is parsed and then annotated by
+# the scope and typealias passes, so nodes carry their attributes.
+
+# Two figures are given for each layout:
+#
+#   node bytes: the node objects themselves, with their children
+#               lists and attribute dicts, summed with sys.getsizeof
+#   traced:     everything allocated while parsing and annotating,
+#               including tokens and symbols, as seen by tracemalloc
+
+# Usage:
+#
+#   python -m bench.ast_memory [line_count]
+
+# Captured before measure() swaps the class
+FIELDS = ast.AstNode.__slots__
+
+class DictAstNode:
+
+  # The earlier layout: an instance dict plus an attributes dict and a
+  # children list for every node
+
+  def __init__ (self, kind: str = 'None'):
+    self.kind = kind
+    self.children = []
+    self.token = None
+    self.attributes = {}
+
+  def child (self, index: int = 0):
+    return self.children[index]
+
+  def child_count (self) -> int:
+    return len(self.children)
+
+  def add_child (self, node):
+    self.children.append(node)
+
+  def set_child (self, index: int, node):
+    self.children[index] = node
+
+  def set_token (self, token):
+    self.token = token
+
+  def attribute (self, name: str):
+    return self.attributes.get(name)
+
+  def set_attribute (self, name: str, value):
+    self.attributes[name] = value
+
+  # The passes now assign fields directly. Route those assignments
+  # into the attributes dict, as set_attribute() used to.
+
+  def __getattr__ (self, name: str):
+    if name in FIELDS:
+      return self.__dict__['attributes'].get(name)
+    raise AttributeError(name)
+
+  def __setattr__ (self, name: str, value):
+    if name in ('kind', 'children', 'token', 'attributes'):
+      self.__dict__[name] = value
+    else:
+      self.__dict__['attributes'][name] = value
+
+def build (buffer: reader.TokenBuffer):
+  root = reader.BufferParser(buffer).process()
+  pass1 = reader.Pass1(root)
+  pass1.process()
+  reader.Pass2(root, pass1.builtin_scope).process()
+  return root
+
+def node_bytes (root) -> tuple:
+  # Sum the storage owned by each node, walking the tree iteratively
+  count = 0
+  size = 0
+  stack = [root]
+  while stack:
+    node = stack.pop()
+    count += 1
+    size += sys.getsizeof(node)
+    # Slotted leaves share one empty tuple, which they do not own
+    if isinstance(node.children, list):
+      size += sys.getsizeof(node.children)
+    if hasattr(node, '__dict__'):
+      size += sys.getsizeof(node.__dict__)
+      size += sys.getsizeof(node.__dict__['attributes'])
+    elif node.extra is not None:
+      size += sys.getsizeof(node.extra)
+    stack.extend(node.children)
+  return count, size
+
+def measure (node_class, buffer: reader.TokenBuffer) -> tuple:
+  # The parser creates nodes through the co.ast package, so swapping
+  # the class there selects the layout
+  saved = ast.AstNode
+  ast.AstNode = node_class
+  try:
+    tracemalloc.start()
+    root = build(buffer)
+    traced, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+  finally:
+    ast.AstNode = saved
+  count, size = node_bytes(root)
+  return count, size, traced
+
+def main ():
+  line_count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+  lexer = reader.TableLexer()
+  lexer.setInput(make_source(line_count))
+  buffer = lexer.tokenize_all()
+  results = [
+    ('dict', measure(DictAstNode, buffer)),
+    ('slots', measure(ast.AstNode, buffer)),
+  ]
+  print(f"nodes: {results[0][1][0]}")
+  print(f"{'layout':<8}{'node bytes':>14}{'bytes/node':>12}{'traced':>14}{'bytes/node':>12}")
+  for name, (count, size, traced) in results:
+    print(f"{name:<8}{size:>14,}{size / count:>12.1f}{traced:>14,}{traced / count:>12.1f}")
+  print(f"reduction: {results[0][1][1] / results[1][1][1]:.1f}x node bytes, "
+        f"{results[0][1][2] / results[1][1][2]:.1f}x traced")
+
+if __name__ == '__main__':
+  main()
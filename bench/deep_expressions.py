@@ -0,0 +1,101 @@
+import contextlib
+import gc
+import io
+import sys
+import time
+
+from co import reader
+from bench.expression_parser import ClimbingParser
+
+# Purpose:
+
+# Stress the parser and the passes with single expressions that are
+# very long or very deeply nested, and show that the time per term
+# stays flat as they grow, i.e. that the work is linear. Three shapes
+# are measured, each the initializer of one global:
+#
+#   chain:   c + c + c + ...          left leaning, as deep as it is long
+#   nested:  c + (c + (c + ...))      right leaning, in parentheses
+#   prefix:  - - - ... c              a run of prefix operators
+#
+# Before Parser.expression() and the expression visitors of the passes
+# kept explicit stacks, each of these hit the recursion limit within a
+# thousand terms. For comparison, the recursive precedence climbing
+# parser is also run on the smallest size of each shape. It parses a
+# chain in a loop, but recurses on nesting and prefix operators.
+
+# Usage:
+#
+#   python -m bench.deep_expressions [chain_terms] [nested_terms]
+#
+# The defaults are a chain of a million terms and nesting and prefix
+# runs of a hundred thousand levels. Each shape is also measured at a
+# quarter and half of its size.
+
+PASSES = [
+  reader.Pass1,
+  reader.Pass2,
+  reader.Pass3a,
+  reader.Pass3b,
+  reader.Pass5a,
+  reader.Pass5b,
+]
+
+def make_source (shape: str, terms: int) -> str:
+  if shape == 'chain':
+    expression = ' + '.join(['c'] * terms)
+  elif shape == 'nested':
+    expression = 'c + (' * (terms - 1) + 'c' + ')' * (terms - 1)
+  else:
+    expression = '- ' * (terms - 1) + 'c'
+  return f"const val c: int32 = 1;\nvar x: int32 = {expression};\n"
+
+def run_passes (root):
+  pass1 = reader.Pass1(root)
+  pass1.process()
+  reader.Pass2(root, pass1.builtin_scope).process()
+  for pass_class in PASSES[2:]:
+    pass_class(root).process()
+
+def measure (shape: str, terms: int) -> tuple:
+  lexer = reader.TableLexer()
+  lexer.setInput(make_source(shape, terms))
+  buffer = lexer.tokenize_all()
+  gc.collect()
+  gc.disable()
+  output = io.StringIO()
+  try:
+    start = time.perf_counter()
+    root = reader.BufferParser(buffer).process()
+    parsed = time.perf_counter()
+    with contextlib.redirect_stdout(output):
+      run_passes(root)
+    finished = time.perf_counter()
+  finally:
+    gc.enable()
+  # The initializer of x must be constant, as c is
+  constant = root.child(1).child(2).is_constant
+  return parsed - start, finished - parsed, constant and output.getvalue() == ''
+
+def recursive_outcome (shape: str, terms: int) -> str:
+  lexer = reader.TableLexer()
+  lexer.setInput(make_source(shape, terms))
+  try:
+    ClimbingParser(lexer.tokenize_all()).process()
+  except RecursionError:
+    return 'RecursionError'
+  return 'parsed'
+
+def main ():
+  chain_terms = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+  nested_terms = int(sys.argv[2]) if len(sys.argv) > 2 else 100000
+  print(f"{'shape':<8}{'terms':>9}{'parse s':>9}{'passes s':>10}{'parse us/term':>15}{'passes us/term':>16}  ok")
+  for shape, terms in (('chain', chain_terms), ('nested', nested_terms), ('prefix', nested_terms)):
+    for size in (terms // 4, terms // 2, terms):
+      parse_time, pass_time, ok = measure(shape, size)
+      print(f"{shape:<8}{size:>9}{parse_time:>9.3f}{pass_time:>10.3f}"
+            f"{parse_time / size * 1e6:>15.2f}{pass_time / size * 1e6:>16.2f}  {ok}")
+    print(f"{'':<8}{terms // 4:>9}  recursive parser: {recursive_outcome(shape, terms // 4)}")
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,281 @@
+import gc
+import sys
+import time
+
+from co import reader
+from co import ast
+from co.reader.Operators import ASSIGNMENT_OPERATORS, EQUALITY_OPERATORS, RELATIONAL_OPERATORS
+from co.reader.Operators import SHIFT_OPERATORS, ADDITIVE_OPERATORS, MULTIPLICATIVE_OPERATORS
+from co.reader.Operators import UNARY_OPERATORS
+from co.reader.Parser import BINARY_OPERATORS
+from co.reader.TokenKind import TokenKind
+
+# Purpose:
+
+# Compare the expression parser, which climbs precedences with an
+# explicit operator stack, with the recursive precedence climbing and
+# the recursive descent cascade that came before it, and check that
+# all three build the same trees. Two shapes of input are measured:
+#
+#   wide: many globals with short initializers, mostly single operands
+#   deep: long operator chains that cycle through every precedence
+#         level, plus nested parentheses
+
+# Usage:
+#
+#   python -m bench.expression_parser [declaration_count]
+
+# Lowest binding power, at which a full expression is parsed
+EXPRESSION_POWER = 1
+
+OPERATORS = [
+  '=', 'or', 'and', '|', '^', '&', '==', '<', '<<', '+', '*',
+  '-', '%', '>>', '>=', '!=', '/', '+=',
+]
+
+def make_wide (count: int) -> str:
+  lines = []
+  for i in range(count):
+    if i % 4 == 3:
+      lines.append(f"var w{i}: int32 = w{i - 1} + {i} * 2;\n")
+    else:
+      lines.append(f"var w{i}: int32 = {i};\n")
+  return ''.join(lines)
+
+def make_deep (count: int, length: int = 60, nesting: int = 40) -> str:
+  lines = []
+  for i in range(count // length):
+    terms = [f"d{i}"]
+    for j in range(length):
+      terms.append(OPERATORS[j % len(OPERATORS)])
+      terms.append(str(j) if j % 3 else f"-d{j}")
+    chain = ' '.join(terms)
+    nested = '(' * nesting + f"{i}" + ' + 1)' * nesting
+    lines.append(f"var d{i}: int32 = {chain} + {nested};\n")
+  return ''.join(lines)
+
+def dump (node, depth: int = 0, out: list = None) -> list:
+  out = [] if out is None else out
+  out.append((depth, node.kind, repr(node.token)))
+  for child in node.children:
+    dump(child, depth + 1, out)
+  return out
+
+def parse (parser_class, source: str):
+  lexer = reader.TableLexer()
+  lexer.setInput(source)
+  buffer = lexer.tokenize_all()
+  # Only the parser is timed. As in timeit, the garbage collector is
+  # paused, since full collections over the growing tree would
+  # otherwise swamp the difference being measured.
+  parser = parser_class(buffer)
+  gc.collect()
+  gc.disable()
+  try:
+    start = time.perf_counter()
+    root = parser.process()
+    return root, time.perf_counter() - start
+  finally:
+    gc.enable()
+
+class RecursiveParser (reader.BufferParser):
+
+  # The recursive forms of Parser.expression(), kept as baselines.
+  # Both recurse on every operand, prefix operator and parenthesis.
+
+  def binaryExpression (self, power: int) -> ast.AstNode:
+    # Precedence climbing over the operator table. Parse one operand,
+    # then fold in each following operator that binds at least as
+    # tightly as the given power. One call replaces a dozen levels of
+    # the cascade below.
+    n = self.unaryExpression()
+    operator = BINARY_OPERATORS.get(self.lookahead.kind)
+    while operator is not None and operator[0] >= power:
+      p = n
+      n = ast.AstNode(operator[2])
+      n.set_token(self.token())
+      n.add_child(p)
+      self.consume()
+      n.add_child(self.binaryExpression(operator[1]))
+      operator = BINARY_OPERATORS.get(self.lookahead.kind)
+    return n
+
+  # Recursive descent cascade, one method per precedence level. It
+  # documents the grammar that the operator table encodes.
+
+  def assignmentExpression (self) -> ast.AstNode:
+    n = self.logicalOrExpression()
+    while self.lookahead.kind in ASSIGNMENT_OPERATORS:
+      p = n
+      n = ast.AstNode('BinaryExpression')
+      n.set_token(self.token())
+      n.add_child(p)
+      self.match(self.lookahead.kind)
+      p = self.logicalOrExpression()
+      n.add_child(p)
+    return n
+
+  def logicalOrExpression (self) -> ast.AstNode:
+    n = self.logicalAndExpression()
+    while self.lookahead.kind == TokenKind.OR:
+      p = n
+      n = ast.AstNode('BinaryExpression')
+      n.set_token(self.token())
+      n.add_child(p)
+      self.match(TokenKind.OR)
+      n.add_child(self.logicalAndExpression())
+    return n
+
+  def logicalAndExpression (self) -> ast.AstNode:
+    n = self.inclusiveOrExpression()
+    while self.lookahead.kind == TokenKind.AND:
+      p = n
+      n = ast.AstNode('BinaryExpression')
+      n.set_token(self.token())
+      n.add_child(p)
+      self.match(TokenKind.AND)
+      n.add_child(self.inclusiveOrExpression())
+    return n
+  
+  def inclusiveOrExpression (self) -> ast.AstNode:
+    n = self.exclusiveOrExpression()
+    while self.lookahead.kind == TokenKind.BAR:
+      p = n
+      n = ast.AstNode('BinaryExpression')
+      n.set_token(self.token())
+      n.add_child(p)
+      self.match(TokenKind.BAR)
+      n.add_child(self.exclusiveOrExpression())
+    return n
+
+  def exclusiveOrExpression (self) -> ast.AstNode:
+    n = self.andExpression()
+    while self.lookahead.kind == TokenKind.CARET:
+      p = n
+      n = ast.AstNode('BinaryExpression')
+      n.set_token(self.token())
+      n.add_child(p)
+      self.match(TokenKind.CARET)
+      n.add_child(self.andExpression())
+    return n
+  
+  def andExpression (self) -> ast.AstNode:
+    n = self.equalityExpression()
+    while self.lookahead.kind == TokenKind.AMPERSAND:
+      p = n
+      n = ast.AstNode('BinaryExpression')
+      n.set_token(self.token())
+      n.add_child(p)
+      self.match(TokenKind.AMPERSAND)
+      n.add_child(self.equalityExpression())
+    return n
+
+  def equalityExpression (self) -> ast.AstNode:
+    n = self.relationalExpression()
+    while self.lookahead.kind in EQUALITY_OPERATORS:
+      p = n
+      n = ast.AstNode('BinaryExpression')
+      n.set_token(self.token())
+      n.add_child(p)
+      self.match(self.lookahead.kind)
+      n.add_child(self.relationalExpression())
+    return n
+
+  def relationalExpression (self) -> ast.AstNode:
+    n = self.shiftExpression()
+    while self.lookahead.kind in RELATIONAL_OPERATORS:
+      p = n
+      n = ast.AstNode('BinaryExpression')
+      n.set_token(self.token())
+      n.add_child(p)
+      self.match(self.lookahead.kind)
+      n.add_child(self.shiftExpression())
+    return n
+
+  def shiftExpression (self) -> ast.AstNode:
+    n = self.additiveExpression()
+    while self.lookahead.kind in SHIFT_OPERATORS:
+      p = n
+      n = ast.AstNode('BinaryExpression')
+      n.set_token(self.token())
+      n.add_child(p)
+      self.match(self.lookahead.kind)
+      n.add_child(self.additiveExpression())
+    return n
+
+  def additiveExpression (self) -> ast.AstNode:
+    n = self.multiplicativeExpression()
+    while self.lookahead.kind in ADDITIVE_OPERATORS:
+      p = n
+      n = ast.AstNode('BinaryExpression')
+      n.set_token(self.token())
+      n.add_child(p)
+      self.match(self.lookahead.kind)
+      n.add_child(self.multiplicativeExpression())
+    return n
+
+  def multiplicativeExpression (self) -> ast.AstNode:
+    n = self.unaryExpression()
+    while self.lookahead.kind in MULTIPLICATIVE_OPERATORS:
+      p = n
+      n = ast.AstNode('BinaryExpression')
+      n.set_token(self.token())
+      n.add_child(p)
+      self.match(self.lookahead.kind)
+      n.add_child(self.unaryExpression())
+    return n
+  
+  def unaryExpression (self) -> ast.AstNode:
+    if self.lookahead.kind in UNARY_OPERATORS:
+      n = ast.AstNode('UnaryExpression')
+      n.set_token(self.token())
+      self.match(self.lookahead.kind)
+      n.add_child(self.unaryExpression())
+    else:
+      n = self.primaryExpression()
+    return n
+
+  def primaryExpression (self) -> ast.AstNode:
+    if self.lookahead.kind == TokenKind.L_PARENTHESIS:
+      return self.parenthesizedExpression()
+    return super().primaryExpression()
+
+  def parenthesizedExpression (self) -> ast.AstNode:
+    self.match(TokenKind.L_PARENTHESIS)
+    n = self.expression()
+    self.match(TokenKind.R_PARENTHESIS)
+    return self.postfixExpression(n)
+
+class CascadeParser (RecursiveParser):
+
+  # Parses expressions with the recursive descent cascade
+
+  def expression (self):
+    return self.assignmentExpression()
+
+class ClimbingParser (RecursiveParser):
+
+  # Parses expressions with recursive precedence climbing
+
+  def expression (self):
+    return self.binaryExpression(EXPRESSION_POWER)
+
+def measure (parser_class, source: str, repeat: int = 3):
+  best = None
+  for _ in range(repeat):
+    root, elapsed = parse(parser_class, source)
+    best = elapsed if best is None else min(best, elapsed)
+  return root, best
+
+def main ():
+  count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+  print(f"{'input':<8}{'cascade':>10}{'climbing':>10}{'stack':>10}{'speedup':>10}  same trees")
+  for name, source in [('wide', make_wide(count)), ('deep', make_deep(count))]:
+    reference, cascade_time = measure(CascadeParser, source)
+    climbing, climbing_time = measure(ClimbingParser, source)
+    candidate, stack_time = measure(reader.BufferParser, source)
+    same = dump(reference) == dump(climbing) == dump(candidate)
+    print(f"{name:<8}{cascade_time:>10.3f}{climbing_time:>10.3f}{stack_time:>10.3f}{cascade_time / stack_time:>9.1f}x  {same}")
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,225 @@
+import contextlib
+import gc
+import io
+import json
+import platform
+import resource
+import subprocess
+import sys
+import time
+
+from co import reader
+from co.reader.TokenCache import LEXER_VERSION
+from bench.generator import TIERS, generate
+
+# Purpose:
+
+# Benchmark the lexer, the parser and the passes on generated programs
+# (see generator) of each size tier, and save the results as JSON, so
+# that a later run can be compared with them. Each tier runs in its own
+# process, so that its peak resident set size can be read back.
+
+# For each tier this reports:
+#
+#   tokens/sec   TableLexer.tokenize_all(), and the character engine
+#                Lexer through getToken()
+#   nodes/sec    BufferParser over the token buffer, and Parser reading
+#                tokens straight from a TableLexer, as main.py does
+#   passes       Pass1 through Pass5b, each timed on its own, run one
+#                after another as in main.py
+#   peak RSS     for the whole run of the tier, source included
+#
+# Times are the best of a few runs, with the garbage collector off.
+# The passes print nothing for generated programs; any lines they
+# print are counted as diagnostics.
+
+# Usage:
+#
+#   python -m bench.frontend_suite [--seed N] [--repeat N] [--output FILE] [--baseline FILE] [tier ...]
+#
+# --baseline compares this run with the JSON saved by an earlier one,
+# giving each time as a ratio to the earlier time.
+
+PASSES = [
+  reader.Pass1,
+  reader.Pass2,
+  reader.Pass3a,
+  reader.Pass3b,
+  reader.Pass5a,
+  reader.Pass5b,
+]
+
+def timed (function, repeat: int):
+  best = None
+  for _ in range(repeat):
+    gc.collect()
+    gc.disable()
+    try:
+      start = time.perf_counter()
+      result = function()
+      elapsed = time.perf_counter() - start
+    finally:
+      gc.enable()
+    best = elapsed if best is None else min(best, elapsed)
+  return result, best
+
+def count_nodes (root) -> int:
+  count = 0
+  stack = [root]
+  while stack:
+    node = stack.pop()
+    count += 1
+    stack.extend(child for child in node.children if child is not None)
+  return count
+
+def lex_table (source: str) -> reader.TokenBuffer:
+  lexer = reader.TableLexer()
+  lexer.setInput(source)
+  return lexer.tokenize_all()
+
+def lex_characters (source: str) -> int:
+  lexer = reader.Lexer()
+  lexer.setInput(source)
+  count = 1
+  while lexer.getToken().kind != reader.TokenKind.EOF:
+    count += 1
+  return count
+
+def parse_stream (source: str):
+  lexer = reader.TableLexer()
+  lexer.setInput(source)
+  return reader.Parser(lexer).process()
+
+def run_passes (root, times: dict):
+  # Each pass on its own, as main.py runs them
+  pass1 = None
+  for pass_class in PASSES:
+    if pass_class is reader.Pass2:
+      instance = reader.Pass2(root, pass1.builtin_scope)
+    else:
+      instance = pass_class(root)
+    start = time.perf_counter()
+    instance.process()
+    elapsed = time.perf_counter() - start
+    name = pass_class.__name__
+    times[name] = min(times.get(name, elapsed), elapsed)
+    if pass_class is reader.Pass1:
+      pass1 = instance
+
+def measure_tier (tier: str, seed: int, repeat: int) -> dict:
+  source = generate(tier, seed)
+  buffer, table_time = timed(lambda: lex_table(source), repeat)
+  token_count, character_time = timed(lambda: lex_characters(source), repeat)
+  if token_count != len(buffer):
+    raise Exception(f"lexers disagree on {tier}: {token_count} and {len(buffer)} tokens")
+  root, buffer_time = timed(lambda: reader.BufferParser(buffer).process(), repeat)
+  _, stream_time = timed(lambda: parse_stream(source), repeat)
+  node_count = count_nodes(root)
+  pass_times = {}
+  output = io.StringIO()
+  for _ in range(repeat):
+    root = reader.BufferParser(buffer).process()
+    gc.collect()
+    gc.disable()
+    try:
+      with contextlib.redirect_stdout(output):
+        run_passes(root, pass_times)
+    finally:
+      gc.enable()
+  diagnostics = output.getvalue().count('\n') // repeat
+  return {
+    'seed': seed,
+    'shape': TIERS[tier],
+    'lines': source.count('\n'),
+    'bytes': len(source.encode('utf-8')),
+    'tokens': len(buffer),
+    'nodes': node_count,
+    'seconds': {
+      'lex': table_time,
+      'lex_characters': character_time,
+      'parse': buffer_time,
+      'lex_parse': stream_time,
+      'passes': sum(pass_times.values()),
+    },
+    'tokens_per_second': len(buffer) / table_time,
+    'tokens_per_second_characters': token_count / character_time,
+    'nodes_per_second': node_count / buffer_time,
+    'nodes_per_second_lex_parse': node_count / stream_time,
+    'pass_seconds': pass_times,
+    'diagnostics': diagnostics,
+    # Kilobytes on Linux
+    'peak_rss_bytes': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+  }
+
+def child (tier: str, seed: int, repeat: int):
+  print(json.dumps(measure_tier(tier, seed, repeat)))
+
+def run (tier: str, seed: int, repeat: int) -> dict:
+  command = [sys.executable, '-m', 'bench.frontend_suite', '--child', tier, str(seed), str(repeat)]
+  output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+  return json.loads(output)
+
+def ratio (new: float, old) -> str:
+  return f"{new / old:>7.2f}x" if old else f"{'-':>8}"
+
+def report (results: dict, baseline: dict):
+  old_tiers = baseline.get('tiers', {}) if baseline else {}
+  print(f"{'tier':<8}{'lines':>9}{'tokens':>10}{'nodes':>10}{'tokens/s':>12}{'nodes/s':>11}{'peak MiB':>10}{'diag':>6}")
+  for tier, result in results.items():
+    print(
+      f"{tier:<8}{result['lines']:>9}{result['tokens']:>10}{result['nodes']:>10}"
+      f"{result['tokens_per_second']:>12,.0f}{result['nodes_per_second']:>11,.0f}"
+      f"{result['peak_rss_bytes'] / 2**20:>10.1f}{result['diagnostics']:>6}"
+    )
+  print()
+  stages = list(next(iter(results.values()))['seconds']) + [pass_class.__name__ for pass_class in PASSES]
+  print(f"{'seconds':<16}" + ''.join(f"{tier:>10}" + (f"{'vs base':>9}" if baseline else '') for tier in results))
+  for stage in stages:
+    line = f"{stage:<16}"
+    for tier, result in results.items():
+      seconds = result['seconds'].get(stage, result['pass_seconds'].get(stage))
+      line += f"{seconds:>10.3f}"
+      if baseline:
+        old = old_tiers.get(tier)
+        if old is not None and old['seed'] == result['seed']:
+          line += ratio(seconds, old['seconds'].get(stage, old['pass_seconds'].get(stage)))
+        else:
+          line += f"{'-':>9}"
+    print(line)
+
+def main ():
+  arguments = sys.argv[1:]
+  options = { '--seed': '0', '--repeat': '3', '--output': 'frontend_suite.json', '--baseline': None }
+  tiers = []
+  while arguments:
+    argument = arguments.pop(0)
+    if argument in options:
+      options[argument] = arguments.pop(0)
+    elif argument in TIERS:
+      tiers.append(argument)
+    else:
+      raise Exception(f"unknown argument '{argument}'")
+  seed = int(options['--seed'])
+  repeat = int(options['--repeat'])
+  baseline = None
+  if options['--baseline'] is not None:
+    with open(options['--baseline']) as file:
+      baseline = json.load(file)
+  results = {}
+  for tier in tiers or list(TIERS):
+    results[tier] = run(tier, seed, repeat)
+  report(results, baseline)
+  with open(options['--output'], 'w') as file:
+    json.dump({
+      'python': platform.python_version(),
+      'machine': platform.machine(),
+      'lexer_version': LEXER_VERSION,
+      'tiers': results,
+    }, file, indent=2)
+  print(f"\nsaved {options['--output']}")
+
+if __name__ == '__main__':
+  if len(sys.argv) > 1 and sys.argv[1] == '--child':
+    child(sys.argv[2], int(sys.argv[3]), int(sys.argv[4]))
+  else:
+    main()
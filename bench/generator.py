@@ -0,0 +1,228 @@
+import random
+import sys
+
+# Purpose:
+
+# Generate synthetic Cobalt programs of a chosen size and shape, as
+# workloads for the lexer, parser and passes. The output is a function
+# of the seed and the shape only, so the same call always gives the
+# same program, and runs on different machines or revisions measure
+# the same input.
+
+# A program is made of, in shuffled order:
+#
+#   typealiases  chains of aliases for primitive, pointer and other
+#                alias types
+#   constants    'const val' globals whose initializers refer to other
+#                constants, forming dependency chains in both textual
+#                directions
+#   globals      scalar variables initialized from constants, arrays
+#                sized by literals or constants, and pointers
+#   functions    parameters and a body of local variables, local
+#                arrays and local pointers
+#
+# Initializers are expressions nested up to the given depth. Each
+# level has one operand that nests further, in parentheses, and one
+# that does not, so an expression grows linearly with its depth, and
+# its tree is as deep as its nesting. Nesting goes left or right at
+# random.
+
+# Notes:
+#
+# 1. Programs are meant to pass the passes without diagnostics.
+# Initializers therefore only use literals and constants, since Pass5b
+# checks every initializer for being constant, and bodies only hold
+# declaration statements, which are all that Pass1 sets up scopes for.
+# Typealiases do not name array types, which Pass2 cannot resolve yet,
+# and there are no hexadecimal or binary literals, which the Parser
+# does not take yet.
+#
+# 2. Dependencies between constants, and between typealiases, follow a
+# random order of the declarations, so there are no cycles, but uses
+# come before declarations about half the time.
+#
+# 3. The Parser and the expression visitors of the passes keep explicit
+# stacks, so the depth is not bounded by the recursion limit. Deep
+# expressions still cost time and memory linear in their size.
+
+# Usage:
+#
+#   python -m bench.generator [tier] [seed] > program.co
+
+PRIMITIVE_TYPES = ['int8', 'int16', 'int32', 'int64', 'uint8', 'uint16', 'uint32', 'uint64', 'float32', 'float64', 'bool']
+
+INTEGER_OPERATORS = ['+', '-', '*', '/', '%', '<<', '>>', '&', '|', '^']
+
+FLOAT_OPERATORS = ['+', '-', '*', '/']
+
+# Shapes by size. The keys are arguments of SourceGenerator.
+
+TIERS = {
+  'small': dict(typealiases=20, constants=200, globals=200, functions=50),
+  'medium': dict(typealiases=200, constants=2000, globals=2000, functions=500),
+  'large': dict(typealiases=2000, constants=20000, globals=20000, functions=5000),
+  'deep': dict(typealiases=20, constants=200, globals=200, functions=50, depth=100),
+}
+
+class SourceGenerator:
+
+  def __init__ (
+    self,
+    seed: int = 0,
+    typealiases: int = 20,
+    constants: int = 200,
+    globals: int = 200,
+    functions: int = 50,
+    parameters: int = 4,
+    locals: int = 12,
+    depth: int = 8,
+    window: int = 16,
+  ):
+    self.random = random.Random(seed)
+    self.typealiases = typealiases
+    self.constants = constants
+    self.globals = globals
+    self.functions = functions
+    # Upper bounds per function
+    self.parameters = parameters
+    self.locals = locals
+    # Upper bound on expression nesting
+    self.depth = depth
+    # Constants refer to the latest constants, in dependency order,
+    # among this many. Other initializers refer to any constant.
+    self.window = window
+
+  def generate (self) -> str:
+    self.alias_names = self.declaration_order(self.typealiases)
+    self.aliases_done = []
+    self.constant_names = self.declaration_order(self.constants)
+    # Integer and floating point constants, in dependency order
+    self.integer_constants = []
+    self.float_constants = []
+    declarations = []
+    for i in self.alias_names:
+      declarations.append(self.typealiasDeclaration(i))
+    for i in self.constant_names:
+      declarations.append(self.constantDeclaration(i))
+    for i in range(self.globals):
+      declarations.append(self.globalDeclaration(i))
+    for i in range(self.functions):
+      declarations.append(self.functionDeclaration(i))
+    self.random.shuffle(declarations)
+    return ''.join(declarations)
+
+  def declaration_order (self, count: int) -> list:
+    # Declaration numbers in a random order; each declaration may only
+    # depend on those before it in this order
+    order = list(range(count))
+    self.random.shuffle(order)
+    return order
+
+  # DECLARATIONS
+
+  def typealiasDeclaration (self, i: int) -> str:
+    # Another alias from earlier in dependency order, or a primitive
+    # type, possibly behind pointers
+    pointers = '*' * self.random.choice([0, 0, 0, 1, 1, 2])
+    if self.aliases_done and self.random.random() < 0.6:
+      target = f"T{self.random.choice(self.aliases_done)}"
+    else:
+      target = self.random.choice(PRIMITIVE_TYPES)
+    self.aliases_done.append(i)
+    return f"typealias T{i} = {pointers}{target};\n"
+
+  def constantDeclaration (self, i: int) -> str:
+    if self.random.random() < 0.25:
+      type_name = self.random.choice(['float32', 'float64'])
+      names = self.float_constants
+      floating = True
+    else:
+      type_name = self.random.choice(['int32', 'int64'])
+      names = self.integer_constants
+      floating = False
+    expression = self.expression(names[-self.window:], floating)
+    names.append(f"c{i}")
+    return f"const val c{i}: {type_name} = {expression};\n"
+
+  def globalDeclaration (self, i: int) -> str:
+    choice = self.random.random()
+    if choice < 0.5:
+      return f"var g{i}: {self.scalarType()} = {self.expression(self.integer_constants, False)};\n"
+    elif choice < 0.75:
+      return f"var g{i}: {self.arrayType()};\n"
+    else:
+      return f"var g{i}: {self.pointerType()};\n"
+
+  def functionDeclaration (self, i: int) -> str:
+    parameters = ', '.join(
+      f"x{k}: {self.random.choice([self.scalarType, self.pointerType])()}"
+      for k in range(self.random.randint(0, self.parameters))
+    )
+    lines = [f"// Function {i}\n"]
+    if self.random.random() < 0.2:
+      lines.append(f"def f{i} ({parameters}) {{\n")
+    else:
+      lines.append(f"def f{i} ({parameters}) -> {self.scalarType()} {{\n")
+    for k in range(self.random.randint(0, self.locals)):
+      choice = self.random.random()
+      if choice < 0.7:
+        lines.append(f"  var v{k}: {self.scalarType()} = {self.expression(self.integer_constants, False)};\n")
+      elif choice < 0.85:
+        lines.append(f"  var v{k}: {self.arrayType()};\n")
+      else:
+        lines.append(f"  var v{k}: {self.pointerType()};\n")
+    lines.append("}\n\n")
+    return ''.join(lines)
+
+  # TYPES
+
+  def scalarType (self) -> str:
+    if self.alias_names and self.random.random() < 0.2:
+      return f"T{self.random.choice(self.alias_names)}"
+    return self.random.choice(['int32', 'int32', 'int64', 'uint32'])
+
+  def arrayType (self) -> str:
+    # One or two dimensions, sized by literals or integer constants
+    sizes = []
+    for _ in range(self.random.choice([1, 1, 2])):
+      if self.integer_constants and self.random.random() < 0.5:
+        sizes.append(f"[{self.random.choice(self.integer_constants)}]")
+      else:
+        sizes.append(f"[{self.random.randint(1, 64)}]")
+    return self.scalarType() + ''.join(sizes)
+
+  def pointerType (self) -> str:
+    return '*' * self.random.choice([1, 1, 2]) + self.scalarType()
+
+  # EXPRESSIONS
+
+  def expression (self, names: list, floating: bool) -> str:
+    return self.nested(self.random.randint(0, self.depth), names, floating)
+
+  def nested (self, depth: int, names: list, floating: bool) -> str:
+    if depth == 0:
+      return self.operand(names, floating)
+    if self.random.random() < 0.1:
+      return f"-({self.nested(depth - 1, names, floating)})"
+    operator = self.random.choice(FLOAT_OPERATORS if floating else INTEGER_OPERATORS)
+    inner = self.nested(depth - 1, names, floating)
+    other = self.operand(names, floating)
+    if self.random.random() < 0.5:
+      return f"({inner}) {operator} {other}"
+    return f"{other} {operator} ({inner})"
+
+  def operand (self, names: list, floating: bool) -> str:
+    if names and self.random.random() < 0.4:
+      return self.random.choice(names)
+    if floating:
+      return self.random.choice([f"{self.random.randint(0, 999)}.{self.random.randint(0, 99)}", f"{self.random.randint(1, 99)}.5e{self.random.randint(-3, 3)}"])
+    value = self.random.randint(0, 9999)
+    return self.random.choice([f"{value}", f"{value}", f"{value}L", f"{value}u"])
+
+def generate (tier: str = 'small', seed: int = 0) -> str:
+  return SourceGenerator(seed, **TIERS[tier]).generate()
+
+if __name__ == '__main__':
+  tier = sys.argv[1] if len(sys.argv) > 1 else 'small'
+  seed = int(sys.argv[2]) if len(sys.argv) > 2 else 0
+  sys.stdout.write(generate(tier, seed))
@@ -0,0 +1,80 @@
+import sys
+import tracemalloc
+
+from co import reader
+from co.reader.Lexer import keyword_lookup
+from bench.lexer_throughput import make_source
+
+# Purpose:
+
+# Report the memory saved by interning identifiers and keywords in the
+# lexer's string pool. A large synthetic translation unit is parsed
+# from a token buffer and annotated by the scope and typealias passes,
+# once with the pool and once with a pool that hands back every lexeme
+# as a string of its own, as the lexer did before.
+
+# Two figures are given for each run:
+#
+#   lexemes: distinct identifier and keyword string objects held by
+#            the tree, and their bytes, summed with sys.getsizeof
+#   traced:  everything allocated while parsing and annotating, as
+#            seen by tracemalloc
+
+# Usage:
+#
+#   python -m bench.identifier_interning [line_count]
+
+class CopyingPool (reader.StringPool):
+
+  # Classifies like the real pool but does not share strings
+
+  def intern (self, lexeme: str) -> str:
+    return lexeme
+
+def build (buffer: reader.TokenBuffer):
+  root = reader.BufferParser(buffer).process()
+  pass1 = reader.Pass1(root)
+  pass1.process()
+  reader.Pass2(root, pass1.builtin_scope).process()
+  return root
+
+def lexeme_bytes (root, kinds: frozenset) -> tuple:
+  # Count each distinct string object once, walking the tree
+  # iteratively
+  seen = {}
+  stack = [root]
+  while stack:
+    node = stack.pop()
+    token = node.token
+    if token is not None and token.kind in kinds:
+      seen[id(token.lexeme)] = token.lexeme
+    stack.extend(node.children)
+  return len(seen), sum(sys.getsizeof(lexeme) for lexeme in seen.values())
+
+def measure (pool: reader.StringPool, source: str) -> tuple:
+  lexer = reader.TableLexer()
+  lexer.pool = pool
+  lexer.setInput(source)
+  buffer = lexer.tokenize_all()
+  tracemalloc.start()
+  root = build(buffer)
+  traced, _ = tracemalloc.get_traced_memory()
+  tracemalloc.stop()
+  count, size = lexeme_bytes(root, pool.kinds)
+  return count, size, traced
+
+def main ():
+  line_count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+  source = make_source(line_count)
+  results = [
+    ('copied', measure(CopyingPool(keyword_lookup), source)),
+    ('pooled', measure(reader.StringPool(keyword_lookup), source)),
+  ]
+  print(f"{'lexemes':<8}{'strings':>10}{'bytes':>14}{'traced':>14}")
+  for name, (count, size, traced) in results:
+    print(f"{name:<8}{count:>10,}{size:>14,}{traced:>14,}")
+  saved = results[0][1][2] - results[1][1][2]
+  print(f"saved: {saved:,} bytes traced ({saved / results[0][1][2]:.1%})")
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,107 @@
+import contextlib
+import gc
+import io
+import random
+import statistics
+import sys
+import time
+
+from co import reader
+from bench.lexer_throughput import make_source
+
+# Purpose:
+
+# Time single-character edits to a large source, relexed incrementally
+# with Lexer.relex, against tokenizing the whole edited source again.
+# All edits accumulate in the same buffer, which is checked against a
+# full tokenization at the end.
+
+# Two patterns of edits are timed (with a fixed seed):
+#
+#   typing:    a word is typed at a cursor one character at a time and
+#              then deleted again, as in an editor
+#   scattered: each edit is at a new random offset, so the pending
+#              shift (see TokenBuffer) is moved across the file every
+#              time; this is the worst case
+#
+# Inserting a quote opens a string that runs on to the next quote, or
+# to the end of the file, so those edits rescan that far.
+
+# Usage:
+#
+#   python -m bench.incremental_relex [line_count] [edit_count]
+
+def tokenize (source: str) -> reader.TokenBuffer:
+  lexer = reader.TableLexer()
+  lexer.setInput(source)
+  return lexer.tokenize_all()
+
+def typing (buffer: reader.TokenBuffer, count: int) -> list:
+  # Type and then delete words of eight letters at random cursors
+  edits = []
+  while len(edits) < count:
+    cursor = random.randrange(len(buffer.input) - 1)
+    for index in range(8):
+      edits.append((cursor + index, 0, random.choice('abcxyz')))
+    for index in reversed(range(8)):
+      edits.append((cursor + index, 1, ''))
+  return edits
+
+def scattered (buffer: reader.TokenBuffer, count: int, make) -> list:
+  return [
+    (random.randrange(len(buffer.input) - 1), *make())
+    for _ in range(count)
+  ]
+
+def run (lexer, buffer, edits: list) -> tuple:
+  times = []
+  relexed = []
+  for offset, removed, inserted in edits:
+    start = time.perf_counter()
+    changed = lexer.relex(buffer, offset, removed, inserted)
+    times.append(time.perf_counter() - start)
+    relexed.append(len(changed))
+  return times, relexed
+
+def main ():
+  line_count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+  edit_count = int(sys.argv[2]) if len(sys.argv) > 2 else 64
+  random.seed(0)
+  source = make_source(line_count)
+  lexer = reader.TableLexer()
+  lexer.setInput(source)
+  buffer = lexer.tokenize_all()
+  token_count = len(buffer)
+  gc.disable()
+  start = time.perf_counter()
+  tokenize(source)
+  full_time = time.perf_counter() - start
+  patterns = [
+    ('typing', lambda: typing(buffer, edit_count)),
+    ('scattered letter', lambda: scattered(buffer, edit_count, lambda: (0, random.choice('abcxyz')))),
+    ('scattered space', lambda: scattered(buffer, edit_count, lambda: (0, ' '))),
+    ('scattered delete', lambda: scattered(buffer, edit_count, lambda: (1, ''))),
+    ('scattered quote', lambda: scattered(buffer, edit_count, lambda: (0, '"'))),
+  ]
+  # Diagnostics for the broken text go to stdout; keep them out
+  with contextlib.redirect_stdout(io.StringIO()):
+    rows = [(name, *run(lexer, buffer, make())) for name, make in patterns]
+    reference = tokenize(buffer.input)
+  gc.enable()
+  print(f"lines: {source.count(chr(10))}, tokens: {token_count}")
+  print(f"full tokenize_all: {full_time * 1000:.1f} ms")
+  print(f"{'edits':<18}{'median ms':>12}{'max ms':>10}{'tokens':>10}{'speedup':>10}")
+  for name, times, relexed in rows:
+    median = statistics.median(times)
+    print(f"{name:<18}{median * 1000:>12.2f}{max(times) * 1000:>10.2f}"
+          f"{statistics.median(relexed):>10.0f}{full_time / median:>9.0f}x")
+  buffer.settle()
+  buffer.line_index.settle()
+  same = all(
+    getattr(buffer, column) == getattr(reference, column)
+    for column in ('kinds', 'starts', 'ends')
+  ) and buffer.line_index.starts == reference.line_index.starts
+  print(f"same as full tokenization: {same}")
+
+if __name__ == '__main__':
+  main()
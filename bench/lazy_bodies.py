@@ -0,0 +1,123 @@
+import contextlib
+import gc
+import io
+import sys
+import time
+import tracemalloc
+
+from co import reader
+from bench.generator import SourceGenerator
+
+# Purpose:
+
+# Compare eager parsing with lazy parsing of function bodies (see
+# BufferParser) on programs with the same declarations and bodies of
+# growing size. Two workloads are run on the tree:
+#
+#   signatures   Pass1, Pass2 and Pass3b, which only need declarations,
+#                plus an outline: the name and parameter count of each
+#                function
+#   full         Pass1 through Pass5b, which read every body
+#
+# For the signature workload, a lazy parse never builds the bodies, so
+# its time and memory follow the number of declarations rather than the
+# size of the program. For the full workload, every body gets built
+# anyway, and lazy parsing should cost about the same as eager parsing.
+
+# Notes:
+#
+# 1. Times start from a token buffer, so lexing is not included. Memory
+# is the peak traced by tracemalloc while parsing and running the
+# workload, measured on a separate run from the times.
+
+# Usage:
+#
+#   python -m bench.lazy_bodies [locals ...]
+#
+# Each argument is the upper bound on locals per function. The defaults
+# are 10, 100 and 1000.
+
+DECLARATIONS = dict(typealiases=20, constants=200, globals=200, functions=200)
+
+FULL_PASSES = [
+  reader.Pass3a,
+  reader.Pass5a,
+  reader.Pass5b,
+]
+
+def outline (root) -> list:
+  return [
+    (node.child(0).token.lexeme, node.child(1).child_count())
+    for node in root.children
+    if node.kind == 'FunctionDeclaration'
+  ]
+
+def signatures (root):
+  pass1 = reader.Pass1(root)
+  pass1.process()
+  reader.Pass2(root, pass1.builtin_scope).process()
+  reader.Pass3b(root).process()
+  return outline(root)
+
+def full (root):
+  result = signatures(root)
+  for pass_class in FULL_PASSES:
+    pass_class(root).process()
+  # What Pass5b found for each node, for comparing the two parses
+  constants = []
+  stack = [root]
+  while stack:
+    node = stack.pop()
+    constants.append(node.is_constant)
+    stack.extend(child for child in node.children if child is not None)
+  return result, constants
+
+def run (buffer, lazy: bool, workload):
+  root = reader.BufferParser(buffer, lazy).process()
+  with contextlib.redirect_stdout(io.StringIO()):
+    result = workload(root)
+  return root, result
+
+def timed (buffer, lazy: bool, workload, repeat: int = 3) -> float:
+  best = None
+  for _ in range(repeat):
+    gc.collect()
+    gc.disable()
+    try:
+      start = time.perf_counter()
+      run(buffer, lazy, workload)
+      elapsed = time.perf_counter() - start
+    finally:
+      gc.enable()
+    best = elapsed if best is None else min(best, elapsed)
+  return best
+
+def traced (buffer, lazy: bool, workload) -> int:
+  gc.collect()
+  tracemalloc.start()
+  try:
+    # Keep the tree alive until the peak is read
+    root, _ = run(buffer, lazy, workload)
+    return tracemalloc.get_traced_memory()[1]
+  finally:
+    tracemalloc.stop()
+
+def main ():
+  local_counts = [int(arg) for arg in sys.argv[1:]] or [10, 100, 1000]
+  print(f"{'locals':>7}{'tokens':>10}{'workload':>12}{'eager s':>9}{'lazy s':>9}{'speedup':>9}{'eager MiB':>11}{'lazy MiB':>10}  same")
+  for local_count in local_counts:
+    source = SourceGenerator(seed=0, locals=local_count, **DECLARATIONS).generate()
+    lexer = reader.TableLexer()
+    lexer.setInput(source)
+    buffer = lexer.tokenize_all()
+    for name, workload in (('signatures', signatures), ('full', full)):
+      same = run(buffer, False, workload)[1] == run(buffer, True, workload)[1]
+      eager_time = timed(buffer, False, workload)
+      lazy_time = timed(buffer, True, workload)
+      eager_memory = traced(buffer, False, workload)
+      lazy_memory = traced(buffer, True, workload)
+      print(f"{local_count:>7}{len(buffer):>10}{name:>12}{eager_time:>9.3f}{lazy_time:>9.3f}"
+            f"{eager_time / lazy_time:>8.1f}x{eager_memory / 2**20:>11.1f}{lazy_memory / 2**20:>10.1f}  {same}")
+
+if __name__ == '__main__':
+  main()
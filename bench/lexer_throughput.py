@@ -0,0 +1,77 @@
+import sys
+import time
+
+from co import reader
+
+# Purpose:
+
+# Measure lexer throughput in tokens per second for the original
+# character-at-a-time engine and the table-driven engine, and check
+# that both produce the same token stream.
+
+# Usage:
+#
+#   python -m bench.lexer_throughput [line_count]
+
+TEMPLATE = """\
+// Global {i}
+var g{i}: int32 = {i} + g{j} * 2;
+const val c{i} = {i}u + 101L - 1.5e3f;
+
+/* Function {i}
+   with a block comment */
+def f{i} (a: int32, b: float64) -> int32 {{
+  var t{i}: int32[4];
+  var s: bool = a >= {i} and b != 2.25;
+  if (a << 2 == b) {{
+    t{i}[0] = a % 3;
+  }}
+  return a + b;
+}}
+
+"""
+
+def make_source (line_count: int) -> str:
+  chunks = []
+  lines_per_chunk = TEMPLATE.count('\n')
+  for i in range(max(1, line_count // lines_per_chunk)):
+    chunks.append(TEMPLATE.format(i=i, j=i // 2))
+  return ''.join(chunks)
+
+def tokenize (lexer_class, source: str) -> list:
+  lexer = lexer_class()
+  lexer.setInput(source)
+  tokens = []
+  token = lexer.getToken()
+  while token.kind != reader.TokenKind.EOF:
+    tokens.append(token)
+    token = lexer.getToken()
+  tokens.append(token)
+  return tokens
+
+def measure (lexer_class, source: str, repeat: int = 3):
+  best = None
+  for _ in range(repeat):
+    start = time.perf_counter()
+    tokens = tokenize(lexer_class, source)
+    elapsed = time.perf_counter() - start
+    best = elapsed if best is None else min(best, elapsed)
+  return tokens, best
+
+def main ():
+  line_count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+  source = make_source(line_count)
+  reference, reference_time = measure(reader.Lexer, source)
+  candidate, candidate_time = measure(reader.TableLexer, source)
+  identical = [repr(t) for t in reference] == [repr(t) for t in candidate]
+  count = len(reference)
+  print(f"lines:  {source.count(chr(10))}")
+  print(f"tokens: {count}")
+  print(f"identical token streams: {identical}")
+  print(f"{'engine':<12}{'seconds':>10}{'tokens/sec':>14}")
+  print(f"{'Lexer':<12}{reference_time:>10.3f}{count / reference_time:>14,.0f}")
+  print(f"{'TableLexer':<12}{candidate_time:>10.3f}{count / candidate_time:>14,.0f}")
+  print(f"speedup: {reference_time / candidate_time:.1f}x")
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,49 @@
+import gc
+import sys
+import time
+
+from co import reader
+
+# Purpose:
+
+# Time the lexers on inputs that are mostly malformed, of growing size,
+# to show that the cost stays linear in the size of the input. Errors
+# are queued in the lexer's logger, which keeps a limited number of
+# distinct messages, instead of being printed as they are found.
+
+# Usage:
+#
+#   python -m bench.lexical_errors [line_count ...]
+
+# Malformed numbers, runs of invalid characters, lone carriage returns
+# and an unterminated character literal, on every line
+BAD_LINE = "val x{i} = 0x; 1.é @@@ # $ 0b2_ \r var y{i} = 'ab;\n"
+
+def tokenize (lexer_class, source: str) -> tuple:
+  lexer = lexer_class()
+  lexer.setInput(source)
+  count = 0
+  kinds = {}
+  while True:
+    token = lexer.getToken()
+    count += 1
+    kinds[token.kind] = kinds.get(token.kind, 0) + 1
+    if token.kind == reader.TokenKind.EOF:
+      return count, kinds.get(reader.TokenKind.ERROR, 0), lexer.logger
+
+def main ():
+  line_counts = [int(arg) for arg in sys.argv[1:]] or [10000, 20000, 40000, 80000]
+  print(f"{'lines':>8}{'lexer':>12}{'seconds':>10}{'us/line':>9}{'tokens':>9}{'errors':>9}{'kept':>6}{'dropped':>9}")
+  for line_count in line_counts:
+    source = ''.join(BAD_LINE.format(i=i) for i in range(line_count))
+    for lexer_class in (reader.Lexer, reader.TableLexer):
+      gc.disable()
+      start = time.perf_counter()
+      count, errors, logger = tokenize(lexer_class, source)
+      elapsed = time.perf_counter() - start
+      gc.enable()
+      print(f"{line_count:>8}{lexer_class.__name__:>12}{elapsed:>10.3f}{elapsed / line_count * 1e6:>9.1f}"
+            f"{count:>9}{errors:>9}{len(logger.queue):>6}{logger.dropped:>9}")
+
+if __name__ == '__main__':
+  main()
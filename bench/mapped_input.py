@@ -0,0 +1,65 @@
+import hashlib
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from co import reader
+from bench.lexer_throughput import make_source
+
+# Purpose:
+
+# Compare peak memory and time for tokenizing a large source file that
+# is read into a string, as main.py used to do, with one that is
+# memory-mapped through Lexer.setInputFile. Each run happens in its own
+# process so that its peak resident set size can be read back. Both
+# runs must produce the same token buffer.
+
+# Usage:
+#
+#   python -m bench.mapped_input [line_count]
+
+def child (mode: str, path: str):
+  start = time.perf_counter()
+  lexer = reader.TableLexer()
+  if mode == 'read':
+    with open(path, 'rt', newline='') as file:
+      lexer.setInput(file.read())
+  else:
+    lexer.setInputFile(path)
+  buffer = lexer.tokenize_all()
+  elapsed = time.perf_counter() - start
+  digest = hashlib.sha1()
+  for column in (buffer.kinds, buffer.starts, buffer.ends, buffer.line_index.starts):
+    digest.update(column.tobytes())
+  peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+  print(f"{elapsed} {peak} {len(buffer)} {digest.hexdigest()}")
+
+def run (mode: str, path: str) -> list:
+  command = [sys.executable, '-m', 'bench.mapped_input', '--child', mode, path]
+  output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+  return output.split()
+
+def main ():
+  line_count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+  with tempfile.NamedTemporaryFile('w', suffix='.co', delete=False) as file:
+    file.write(make_source(line_count))
+    path = file.name
+  try:
+    size = os.path.getsize(path)
+    results = [(mode, run(mode, path)) for mode in ('read', 'mapped')]
+  finally:
+    os.remove(path)
+  print(f"source: {size / 2**20:.1f} MiB, {results[0][1][2]} tokens")
+  print(f"same token buffers: {results[0][1][3] == results[1][1][3]}")
+  print(f"{'input':<8}{'seconds':>10}{'peak RSS (MiB)':>16}")
+  for mode, (elapsed, peak, _, _) in results:
+    print(f"{mode:<8}{float(elapsed):>10.3f}{int(peak) / 1024:>16.1f}")
+
+if __name__ == '__main__':
+  if len(sys.argv) > 1 and sys.argv[1] == '--child':
+    child(sys.argv[2], sys.argv[3])
+  else:
+    main()
@@ -0,0 +1,58 @@
+import random
+import sys
+
+from co import reader
+from co.reader.NumberLiteral import NUMBER_KIND_SET
+from bench.lexer_throughput import measure
+
+# Purpose:
+
+# Measure lexing time for a source made mostly of numeric literals,
+# such as lookup tables and constant arrays, with and without the
+# Lexer's numeric literal fast path. Both must produce the same token
+# stream, and the fast path must attach the decoded values.
+
+# Usage:
+#
+#   python -m bench.number_literals [line_count]
+
+LITERALS = [
+  '{0}', '{0}L', '{0}u', '{0}uL', '{0}_000', '{0}.{1}', '{0}.{1}e-3', '{0}.5f', '{0}d',
+  '0x{0:X}', '0x{0:x}_ffL', '0b{0:b}', '0o{0:o}u', '0x1.{1}p{2}', '0x{0:x}p-2f',
+]
+
+def make_source (line_count: int, per_line: int = 12) -> str:
+  rng = random.Random(1)
+  lines = []
+  for i in range(line_count):
+    values = []
+    for _ in range(per_line):
+      template = rng.choice(LITERALS)
+      values.append(template.format(rng.randrange(1, 100000), rng.randrange(10), rng.randrange(8)))
+    lines.append(f"const val table{i}: int32[{per_line}] = {{ {', '.join(values)} }};\n")
+  return ''.join(lines)
+
+class StateMachineLexer (reader.Lexer):
+
+  # Scans every numeric literal with the state machines
+
+  def literal (self, regex, scan):
+    return scan()
+
+def main ():
+  line_count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+  source = make_source(line_count)
+  reference, reference_time = measure(StateMachineLexer, source)
+  candidate, candidate_time = measure(reader.Lexer, source)
+  identical = [repr(t) for t in reference] == [repr(t) for t in candidate]
+  numbers = [t for t in candidate if t.kind in NUMBER_KIND_SET]
+  decoded = all(t.value is not None for t in numbers)
+  print(f"tokens: {len(reference)} ({len(numbers)} numeric literals)")
+  print(f"identical token streams: {identical}, all values decoded: {decoded}")
+  print(f"{'engine':<16}{'seconds':>10}")
+  print(f"{'state machine':<16}{reference_time:>10.3f}")
+  print(f"{'fast path':<16}{candidate_time:>10.3f}")
+  print(f"speedup: {reference_time / candidate_time:.1f}x")
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,86 @@
+import gc
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+import time
+
+from co import reader
+from co.ast.AstCodec import encode_tree, decode_tree
+from co.reader.Lexer import keyword_lookup
+from co.reader.PackageParser import parse_source
+from bench.lexer_throughput import make_source
+
+# Purpose:
+
+# Measure how parsing a synthetic package scales with the number of
+# worker processes (see PackageParser), against parsing every file in
+# this process. Also compare the encoded trees that workers send back
+# with pickled node graphs, in size and in the time to rebuild them.
+# All runs must give the same package tree.
+
+# Usage:
+#
+#   python -m bench.package_parsing [file_count] [lines_per_file] [max_workers]
+
+def shape (root) -> list:
+  # Kinds, child counts and tokens in pre-order, for comparing trees
+  result = []
+  stack = [root]
+  while stack:
+    node = stack.pop()
+    token = node.token
+    result.append((node.kind, len(node.children), token and (token.kind, token.lexeme, token.position)))
+    stack.extend(reversed(node.children))
+  return result
+
+def timed (function):
+  gc.disable()
+  start = time.perf_counter()
+  result = function()
+  elapsed = time.perf_counter() - start
+  gc.enable()
+  return result, elapsed
+
+def main ():
+  file_count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+  lines_per_file = int(sys.argv[2]) if len(sys.argv) > 2 else 400
+  max_workers = int(sys.argv[3]) if len(sys.argv) > 3 else max(4, os.cpu_count() or 1)
+  directory = tempfile.mkdtemp()
+  try:
+    for i in range(file_count):
+      with open(os.path.join(directory, f"source{i:04}.co"), 'w') as file:
+        file.write(f"// Source {i}\n")
+        file.write(make_source(lines_per_file))
+    size = sum(entry.stat().st_size for entry in os.scandir(directory))
+    print(f"package: {file_count} files, {size / 2**20:.1f} MiB, {os.cpu_count()} processors")
+    reference, serial_time = timed(lambda: reader.PackageParser(directory, workers=1).process())
+    expected = shape(reference)
+    print(f"nodes: {len(expected)}")
+    print(f"{'workers':<10}{'seconds':>10}{'speedup':>10}{'same tree':>11}")
+    print(f"{'serial':<10}{serial_time:>10.3f}{1.0:>10.2f}{'yes':>11}")
+    for workers in range(2, max_workers + 1):
+      root, elapsed = timed(lambda: reader.PackageParser(directory, workers=workers).process())
+      same = 'yes' if shape(root) == expected else 'NO'
+      print(f"{workers:<10}{elapsed:>10.3f}{serial_time / elapsed:>10.2f}{same:>11}")
+    # Transfer formats, for the trees of all the files
+    parsed = [parse_source(path, None) for path in reader.PackageParser(directory).sources()]
+  finally:
+    shutil.rmtree(directory)
+  encoded, encode_time = timed(lambda: [encode_tree(root, line_index) for root, line_index in parsed])
+  pickled, pickle_time = timed(lambda: [pickle.dumps(root, pickle.HIGHEST_PROTOCOL) for root, _ in parsed])
+  pool = reader.StringPool(keyword_lookup)
+  decoded, decode_time = timed(lambda: [decode_tree(data, pool) for data in encoded])
+  _, unpickle_time = timed(lambda: [pickle.loads(data) for data in pickled])
+  same = all(shape(a) == shape(b) for (a, _), b in zip(parsed, decoded))
+  print(f"round trip gives the same trees: {same}")
+  print(f"{'format':<10}{'MiB':>10}{'write (s)':>11}{'read (s)':>10}")
+  for name, data, write_time, read_time in (
+    ('encoded', encoded, encode_time, decode_time),
+    ('pickle', pickled, pickle_time, unpickle_time),
+  ):
+    print(f"{name:<10}{sum(map(len, data)) / 2**20:>10.1f}{write_time:>11.3f}{read_time:>10.3f}")
+
+if __name__ == '__main__':
+  main()
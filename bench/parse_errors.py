@@ -0,0 +1,99 @@
+import gc
+import random
+import sys
+import time
+
+from co import reader
+from bench.generator import generate
+
+# Purpose:
+
+# Time the parser on a generated program with a growing number of
+# syntax errors, to show that one run reports all of them and that the
+# cost of the run does not depend on how many there are. Before the
+# parser recovered from errors, it stopped at the first one, so finding
+# N errors took N runs, each fixing one, about N times the time of a
+# run. That estimate is shown for comparison.
+
+# Each error is made by dropping the colon before the type in one
+# declaration of a variable, global or local, e.g.
+#
+#   var g1 int32 = 5;
+#
+# which the parser recovers from at the semicolon.
+
+# Usage:
+#
+#   python -m bench.parse_errors [tier] [error_count ...]
+#
+# The defaults are the medium tier and 0, 10, 100, 1000 and 5000 errors.
+
+# Constructs that the parser does not support yet, each of which must
+# be reported and skipped rather than crash or hang the parser, with
+# the number of errors expected. They are checked before the timing.
+
+CASES = [
+  ("const def f () { }\nvar x: int32 = ;\n", 2),
+  ("class A { var x: int32 = 1; }\nvar y: int32 = ;\n", 2),
+  ("class A { def f () { } val y: int32 = 2; }\n", 2),
+]
+
+def damage (source: str, count: int, seed: int = 0) -> str:
+  lines = source.split('\n')
+  candidates = [i for i, line in enumerate(lines) if line.lstrip().startswith('var ') and ': ' in line]
+  if count > len(candidates):
+    raise Exception(f"only {len(candidates)} declarations to damage")
+  for i in random.Random(seed).sample(candidates, count):
+    lines[i] = lines[i].replace(': ', ' ', 1)
+  return '\n'.join(lines)
+
+def parse (buffer) -> tuple:
+  parser = reader.BufferParser(buffer)
+  root = parser.process()
+  return root, parser.logger
+
+def timed (buffer, repeat: int = 3) -> tuple:
+  best = None
+  for _ in range(repeat):
+    gc.collect()
+    gc.disable()
+    try:
+      start = time.perf_counter()
+      root, logger = parse(buffer)
+      elapsed = time.perf_counter() - start
+    finally:
+      gc.enable()
+    best = elapsed if best is None else min(best, elapsed)
+  return root, logger, best
+
+def check_cases ():
+  for source, expected in CASES:
+    lexer = reader.TableLexer()
+    lexer.setInput(source)
+    root, logger = parse(lexer.tokenize_all())
+    status = 'ok' if len(logger.queue) == expected else f"expected {expected}"
+    print(f"{len(logger.queue):>3} reported  {status:<12}{source.splitlines()[0]}")
+
+def main ():
+  arguments = sys.argv[1:]
+  tier = arguments.pop(0) if arguments and not arguments[0].isdigit() else 'medium'
+  counts = [int(argument) for argument in arguments] or [0, 10, 100, 1000, 5000]
+  check_cases()
+  print()
+  source = generate(tier)
+  print(f"{'errors':>7}{'reported':>10}{'error nodes':>13}{'seconds':>9}{'one per run s':>15}")
+  for count in counts:
+    lexer = reader.TableLexer()
+    lexer.setInput(damage(source, count))
+    buffer = lexer.tokenize_all()
+    root, logger, elapsed = timed(buffer)
+    stack = [root]
+    error_nodes = 0
+    while stack:
+      node = stack.pop()
+      error_nodes += node.kind == 'Error'
+      stack.extend(node.children)
+    print(f"{count:>7}{len(logger.queue):>10}{error_nodes:>13}{elapsed:>9.3f}{max(count, 1) * elapsed:>15.1f}")
+
+if __name__ == '__main__':
+  main()
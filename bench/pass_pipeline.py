@@ -0,0 +1,112 @@
+import contextlib
+import gc
+import io
+import sys
+import time
+
+from co import reader
+
+# Purpose:
+
+# Compare running the semantic analysis passes one after another with
+# running them through the PassManager, which fuses the walkers of
+# each stage into a single traversal. Both are timed over a tree with
+# and without a node index, and must leave the trees annotated the
+# same way and print the same diagnostics.
+
+# The source only uses declaration statements, since Pass1 does not
+# yet set up scopes inside other kinds of statement.
+
+# Usage:
+#
+#   python -m bench.pass_pipeline [line_count]
+
+TEMPLATE = """\
+var g{i}: int32 = {i} + g{j} * 2;
+const val c{i}: int64 = {i} - 1;
+
+def f{i} (a: int32, b: int32) -> int32 {{
+  var t: int32 = a * {i} + (b - 1);
+  var s: bool = t >= {i} and b != c{j};
+  var u: int32 = -t << 2;
+}}
+
+"""
+
+def make_source (line_count: int) -> str:
+  lines_per_chunk = TEMPLATE.count('\n')
+  count = max(1, line_count // lines_per_chunk)
+  return ''.join(TEMPLATE.format(i=i, j=i // 2) for i in range(count))
+
+PASSES = [
+  reader.Pass1,
+  reader.Pass2,
+  reader.Pass3a,
+  reader.Pass3b,
+  reader.Pass5a,
+  reader.Pass5b,
+]
+
+def parse (buffer: reader.TokenBuffer, index: bool):
+  return reader.BufferParser(buffer).process(index=index)
+
+def run_passes (root, fuse: bool):
+  manager = reader.PassManager(root, fuse=fuse)
+  for pass_class in PASSES:
+    if pass_class is reader.Pass2:
+      manager.add(pass_class, lambda: reader.Pass2(root, manager.get('Pass1').builtin_scope))
+    else:
+      manager.add(pass_class)
+  manager.run()
+
+def run_sequential (root, fuse: bool):
+  # Each pass on its own, as main.py used to do it
+  pass1 = reader.Pass1(root)
+  pass1.process()
+  reader.Pass2(root, pass1.builtin_scope).process()
+  for pass_class in PASSES[2:]:
+    pass_class(root).process()
+
+def dump (root) -> list:
+  out = []
+  stack = [(root, 0)]
+  while stack:
+    node, depth = stack.pop()
+    out.append((depth, node.kind, node.is_constant, node.type is not None))
+    stack.extend((child, depth + 1) for child in reversed(node.children) if child is not None)
+  return out
+
+def measure (runner, buffer, index: bool, fuse: bool, repeat: int = 3):
+  best = None
+  for _ in range(repeat):
+    root = parse(buffer, index)
+    output = io.StringIO()
+    gc.collect()
+    gc.disable()
+    try:
+      with contextlib.redirect_stdout(output):
+        start = time.perf_counter()
+        runner(root, fuse)
+        elapsed = time.perf_counter() - start
+    finally:
+      gc.enable()
+    best = elapsed if best is None else min(best, elapsed)
+  return (dump(root), output.getvalue()), best
+
+def main ():
+  line_count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+  lexer = reader.TableLexer()
+  lexer.setInput(make_source(line_count))
+  buffer = lexer.tokenize_all()
+  print(f"{'tree':<10}{'sequential':>12}{'unfused':>10}{'fused':>10}{'speedup':>10}  same results")
+  for index in (False, True):
+    reference, sequential_time = measure(run_sequential, buffer, index, False)
+    unfused, unfused_time = measure(run_passes, buffer, index, False)
+    fused, fused_time = measure(run_passes, buffer, index, True)
+    same = reference == unfused == fused
+    name = 'indexed' if index else 'plain'
+    print(f"{name:<10}{sequential_time:>12.3f}{unfused_time:>10.3f}{fused_time:>10.3f}"
+          f"{unfused_time / fused_time:>9.2f}x  {same}")
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,83 @@
+import hashlib
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from array import array
+
+from co import reader
+from bench.lexer_throughput import make_source
+
+# Purpose:
+
+# Compare peak memory for scanning and parsing source files of growing
+# size that are either read into a string or streamed in chunks through
+# a StreamLexer. Each run happens in its own process so that its peak
+# resident set size can be read back. Tokens are hashed as they arrive
+# and then dropped, so that the token runs show the memory needed for
+# scanning alone, and the parse runs add the AST. Both inputs must give
+# the same token stream.
+
+# Usage:
+#
+#   python -m bench.streaming_input [line_count ...]
+
+def child (task: str, mode: str, path: str):
+  start = time.perf_counter()
+  if mode == 'read':
+    lexer = reader.TableLexer()
+    with open(path, 'rt', newline='') as file:
+      lexer.setInput(file.read())
+  else:
+    lexer = reader.StreamLexer()
+    lexer.setInputFile(path)
+  digest = hashlib.sha1()
+  count = 0
+  if task == 'tokens':
+    positions = array('i')
+    for token in iter(lexer.getToken, None):
+      positions.append(token.kind.value)
+      positions.append(token.position)
+      if len(positions) >= 8192 or token.kind == reader.TokenKind.EOF:
+        digest.update(positions.tobytes())
+        count += len(positions) // 2
+        del positions[:]
+        if token.kind == reader.TokenKind.EOF:
+          break
+  else:
+    root = reader.Parser(lexer).process()
+    count = len(root.children)
+  elapsed = time.perf_counter() - start
+  peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+  print(f"{elapsed} {peak} {count} {digest.hexdigest()}")
+
+def run (task: str, mode: str, path: str) -> list:
+  command = [sys.executable, '-m', 'bench.streaming_input', '--child', task, mode, path]
+  output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+  return output.split()
+
+def main ():
+  line_counts = [int(arg) for arg in sys.argv[1:]] or [50000, 200000, 800000]
+  print(f"{'lines':>8}{'MiB':>7}  {'task':<8}{'input':<8}{'seconds':>9}{'peak RSS (MiB)':>16}")
+  for line_count in line_counts:
+    with tempfile.NamedTemporaryFile('w', suffix='.co', delete=False) as file:
+      file.write(make_source(line_count))
+      path = file.name
+    try:
+      size = os.path.getsize(path)
+      for task in ('tokens', 'parse'):
+        results = [(mode, run(task, mode, path)) for mode in ('read', 'stream')]
+        if results[0][1][2:] != results[1][1][2:]:
+          print(f"{task}: results differ: {results}")
+        for mode, (elapsed, peak, _, _) in results:
+          print(f"{line_count:>8}{size / 2**20:>7.1f}  {task:<8}{mode:<8}{float(elapsed):>9.3f}{int(peak) / 1024:>16.1f}")
+    finally:
+      os.remove(path)
+
+if __name__ == '__main__':
+  if len(sys.argv) > 1 and sys.argv[1] == '--child':
+    child(sys.argv[2], sys.argv[3], sys.argv[4])
+  else:
+    main()
@@ -0,0 +1,66 @@
+import sys
+import time
+import tracemalloc
+
+from co import reader
+from bench.lexer_throughput import make_source, tokenize
+
+# Purpose:
+
+# Compare the memory held by a list of token objects with that of a
+# token buffer for the same source, and compare parse times when the
+# parser pulls tokens from the lexer versus reading the buffer.
+
+# Usage:
+#
+#   python -m bench.token_buffer [line_count]
+
+def traced (function):
+  tracemalloc.start()
+  result = function()
+  size, _ = tracemalloc.get_traced_memory()
+  tracemalloc.stop()
+  return result, size
+
+def timed (function):
+  start = time.perf_counter()
+  result = function()
+  return result, time.perf_counter() - start
+
+def buffer_of (source: str) -> reader.TokenBuffer:
+  lexer = reader.TableLexer()
+  lexer.setInput(source)
+  return lexer.tokenize_all()
+
+def parse_streaming (source: str):
+  lexer = reader.TableLexer()
+  lexer.setInput(source)
+  return reader.Parser(lexer).process()
+
+def parse_buffered (source: str):
+  return reader.BufferParser(buffer_of(source)).process()
+
+def main ():
+  line_count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+  source = make_source(line_count)
+  tokens, list_size = traced(lambda: tokenize(reader.TableLexer, source))
+  buffer, buffer_size = traced(lambda: buffer_of(source))
+  count = len(tokens)
+  print(f"tokens: {count}")
+  print(f"{'storage':<14}{'bytes':>14}{'bytes/token':>14}")
+  print(f"{'Token list':<14}{list_size:>14,}{list_size / count:>14.1f}")
+  print(f"{'TokenBuffer':<14}{buffer_size:>14,}{buffer_size / count:>14.1f}")
+  print(f"reduction: {list_size / buffer_size:.1f}x")
+  del tokens, buffer
+  _, tokenize_time = timed(lambda: tokenize(reader.TableLexer, source))
+  _, tokenize_all_time = timed(lambda: buffer_of(source))
+  _, streaming_time = timed(lambda: parse_streaming(source))
+  _, buffered_time = timed(lambda: parse_buffered(source))
+  print(f"{'operation':<28}{'seconds':>10}")
+  print(f"{'getToken() loop':<28}{tokenize_time:>10.3f}")
+  print(f"{'tokenize_all()':<28}{tokenize_all_time:>10.3f}")
+  print(f"{'Parser (lexer)':<28}{streaming_time:>10.3f}")
+  print(f"{'BufferParser (buffer)':<28}{buffered_time:>10.3f}")
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,76 @@
+import gc
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from co import reader
+from bench.lexer_throughput import make_source
+
+# Purpose:
+
+# Compare tokenizing a corpus of source files from scratch with loading
+# their token buffers from a token cache. The first cached run fills
+# the cache and the second loads every buffer from it. Every run starts
+# from the files on disk, so reading and hashing the sources are part
+# of the cached times, and all runs must give the same token buffers.
+
+# Usage:
+#
+#   python -m bench.token_cache [file_count] [lines_per_file]
+
+def tokenize_corpus (paths: list, cache: reader.TokenCache = None) -> list:
+  buffers = []
+  lexer = reader.TableLexer()
+  lexer.cache = cache
+  for path in paths:
+    lexer.setInputFile(path)
+    buffers.append(lexer.tokenize_all())
+  return buffers
+
+def columns (buffer: reader.TokenBuffer) -> tuple:
+  return (buffer.kinds, buffer.starts, buffer.ends)
+
+def timed (function, repeat: int = 3):
+  best = None
+  gc.disable()
+  for _ in range(repeat):
+    start = time.perf_counter()
+    result = function()
+    elapsed = time.perf_counter() - start
+    best = elapsed if best is None else min(best, elapsed)
+  gc.enable()
+  return result, best
+
+def main ():
+  file_count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+  lines_per_file = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+  directory = tempfile.mkdtemp()
+  try:
+    paths = []
+    for i in range(file_count):
+      path = os.path.join(directory, f"source{i}.co")
+      with open(path, 'w') as file:
+        # Distinct files, so that each needs its own cache entry
+        file.write(f"// Source {i}\n")
+        file.write(make_source(lines_per_file))
+      paths.append(path)
+    size = sum(os.path.getsize(path) for path in paths)
+    cache = reader.TokenCache(os.path.join(directory, 'cache'))
+    reference, scan_time = timed(lambda: tokenize_corpus(paths))
+    cold, cold_time = timed(lambda: tokenize_corpus(paths, cache), repeat=1)
+    warm, warm_time = timed(lambda: tokenize_corpus(paths, cache))
+    cache_size = sum(entry.stat().st_size for entry in os.scandir(cache.directory))
+  finally:
+    shutil.rmtree(directory)
+  same = [columns(b) for b in reference] == [columns(b) for b in cold] == [columns(b) for b in warm]
+  print(f"corpus: {file_count} files, {size / 2**20:.1f} MiB, {sum(map(len, reference))} tokens")
+  print(f"cache: {cache_size / 2**20:.1f} MiB, {cache}")
+  print(f"same token buffers: {same}")
+  print(f"{'run':<22}{'seconds':>10}{'speedup':>10}")
+  for name, elapsed in (('scan', scan_time), ('cache miss (store)', cold_time), ('cache hit (load)', warm_time)):
+    print(f"{name:<22}{elapsed:>10.3f}{scan_time / elapsed:>10.1f}")
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,95 @@
+from typing import List, Optional
+
+from co.ast.AstNode import FIELDS
+from co.reader import Token
+
+# Purpose:
+
+# View of one node of an AstArena, with the interface of AstNode, so
+# that passes can work on either kind of tree. A view holds just the
+# arena and the node's index. Views are made when asked for and
+# dropped after use; two views of the same node are equal and hash
+# alike, but need not be the same object.
+
+# Notes:
+#
+# 1. children builds a list of fresh views each time it is read. Code
+# that goes over many nodes should use the helpers in Traversal or a
+# Walker, which read the arena's columns.
+#
+# 2. Fields and attributes are stored in the arena, so whatever is set
+# through one view is seen through all others.
+
+class ArenaNode:
+
+  __slots__ = ('arena', 'index')
+
+  def __init__ (self, arena: 'AstArena', index: int):
+    self.arena = arena
+    self.index = index
+
+  def __repr__ (self):
+    return f"ArenaNode({self.kind},{self.token})"
+
+  def __eq__ (self, other) -> bool:
+    return type(other) is ArenaNode and other.index == self.index and other.arena is self.arena
+
+  def __hash__ (self) -> int:
+    return hash(self.index)
+
+  @property
+  def kind (self) -> str:
+    arena = self.arena
+    return arena.names[arena.kinds[self.index]]
+
+  @property
+  def children (self) -> List['ArenaNode']:
+    arena = self.arena
+    return [ArenaNode(arena, child) for child in arena.children(self.index)]
+
+  @property
+  def token (self) -> Optional[Token]:
+    return self.arena.token(self.index)
+
+  @property
+  def parent (self) -> Optional['ArenaNode']:
+    parent = self.arena.parent[self.index]
+    return None if parent == -1 else ArenaNode(self.arena, parent)
+
+  def child (self, index: int = 0) -> 'ArenaNode':
+    return ArenaNode(self.arena, self.arena.child(self.index, index))
+
+  def child_count (self) -> int:
+    return len(self.arena.children(self.index))
+
+  def add_child (self, node):
+    arena = self.arena
+    arena.append_child(self.index, arena.adopt(node))
+
+  def set_child (self, index: int, node):
+    self.arena.replace_child(self.index, index, node)
+
+  def set_kind (self, kind: str):
+    arena = self.arena
+    arena.kinds[self.index] = arena.kind_id(kind)
+
+  def set_token (self, token: Token):
+    arena = self.arena
+    arena.tokens[self.index] = -1 if token is None else arena.token_index(token)
+
+  def attribute (self, name: str):
+    return self.arena.value(name, self.index)
+
+  def set_attribute (self, name: str, value):
+    self.arena.set_value(name, self.index, value)
+
+def field_property (name: str) -> property:
+  def get (self):
+    values = self.arena.values.get(name)
+    return None if values is None else values[self.index]
+  def set (self, value):
+    self.arena.set_value(name, self.index, value)
+  return property(get, set)
+
+for name in FIELDS:
+  setattr(ArenaNode, name, field_property(name))
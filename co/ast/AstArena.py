@@ -0,0 +1,301 @@
+from array import array
+from bisect import bisect_left
+from typing import Dict, FrozenSet, List, Optional
+
+from co.ast.AstNode import AstNode, FIELDS
+from co.ast.ArenaNode import ArenaNode
+from co.reader import Token
+from co.reader.TokenBuffer import TokenBuffer
+
+# Purpose:
+
+# Syntax tree stored as parallel integer columns instead of one object
+# per node. A node is an index into the columns:
+#
+#   kinds          number of the node's kind in names
+#   tokens         index of the node's token in the token buffer
+#   first_child    first child, or -1
+#   next_sibling   next child of the same parent, or -1
+#   parent         parent, or -1
+#
+# That is twenty bytes per node, against well over a hundred for an
+# AstNode, and a traversal reads integers from a few arrays instead of
+# chasing objects. Passes see the nodes through ArenaNode views, which
+# look like AstNodes and are made on demand. The traversal helpers in
+# Traversal and the Walker read the columns directly, and only make
+# views of the nodes they hand to a pass.
+
+# Notes:
+#
+# 1. An arena is built from a tree parsed from a token buffer, with
+# from_tree(). The tree can be dropped afterwards; the arena refers to
+# tokens by their index in the buffer, and makes a Token the first time
+# each one is asked for.
+#
+# 2. Attributes that passes set are kept per name in a list with an
+# entry per node, made the first time the name is set. The fields of
+# AstNode (see FIELDS) are read and written as attributes of the views,
+# other names through attribute() and set_attribute().
+#
+# 3. Nodes added to a tree by passes, e.g. casts, may be AstNodes. When
+# one is made the child of a view, it is copied into the arena, with
+# its token, fields and children. Views of arena nodes among those
+# children must not have a parent any more, which is the case for a
+# node that the new node replaces.
+#
+# 4. Children that are None are left out, and so is a node index (see
+# NodeIndex) on the root of the tree, as it lists the tree's nodes.
+#
+# 5. from_tree() numbers the nodes in pre-order, so every subtree is a
+# run of consecutive indexes, and a walk can go over the columns in
+# order, jumping over the subtrees it skips (see end()). ordered tells
+# whether that still holds; adding nodes or changing children clears
+# it.
+
+class AstArena:
+
+  def __init__ (self, buffer: TokenBuffer):
+    self.buffer = buffer
+    # Kind names, and the number of each
+    self.names: List[str] = []
+    self.ids: Dict[str, int] = {}
+    self.kinds = array('i')
+    self.tokens = array('i')
+    self.first_child = array('i')
+    self.next_sibling = array('i')
+    self.parent = array('i')
+    # Attribute name to a list with an entry per node
+    self.values: Dict[str, list] = {}
+    # Tokens made so far, by buffer index
+    self.token_objects: Dict[int, Token] = {}
+    # Numbers of the kinds in a set of kind names, by set
+    self.id_sets: Dict[FrozenSet[str], FrozenSet[int]] = {}
+    # Whether the nodes are numbered in pre-order (see Note 5)
+    self.ordered = False
+
+  def __len__ (self) -> int:
+    return len(self.kinds)
+
+  def __repr__ (self):
+    return f"AstArena({len(self)} nodes)"
+
+  @property
+  def root (self) -> ArenaNode:
+    return ArenaNode(self, 0)
+
+  def node (self, index: int) -> ArenaNode:
+    return ArenaNode(self, index)
+
+  def nbytes (self) -> int:
+    # Size of the columns
+    return sum(column.itemsize * len(column) for column in (self.kinds, self.tokens, self.first_child, self.next_sibling, self.parent))
+
+  def kind_id (self, kind: str) -> int:
+    id = self.ids.get(kind)
+    if id is None:
+      id = self.ids[kind] = len(self.names)
+      self.names.append(kind)
+      self.id_sets.clear()
+    return id
+
+  def kind_ids (self, kinds: FrozenSet[str]) -> FrozenSet[int]:
+    ids = self.id_sets.get(kinds)
+    if ids is None:
+      ids = self.id_sets[kinds] = frozenset(self.ids[kind] for kind in kinds if kind in self.ids)
+    return ids
+
+  def add (self, kind: str, token: int = -1) -> int:
+    # New node without parent or children
+    index = len(self.kinds)
+    self.ordered = False
+    self.kinds.append(self.kind_id(kind))
+    self.tokens.append(token)
+    self.first_child.append(-1)
+    self.next_sibling.append(-1)
+    self.parent.append(-1)
+    for values in self.values.values():
+      values.append(None)
+    return index
+
+  # CHILDREN
+
+  def children (self, index: int) -> List[int]:
+    children = []
+    child = self.first_child[index]
+    next_sibling = self.next_sibling
+    while child != -1:
+      children.append(child)
+      child = next_sibling[child]
+    return children
+
+  def child (self, index: int, position: int) -> int:
+    child = self.first_child[index]
+    next_sibling = self.next_sibling
+    for _ in range(position):
+      if child == -1:
+        break
+      child = next_sibling[child]
+    if child == -1:
+      raise IndexError("child index out of range")
+    return child
+
+  def end (self, index: int) -> int:
+    # Index just past the subtree of a node, while ordered: that of the
+    # next sibling of the node or of its nearest ancestor with one
+    next_sibling = self.next_sibling
+    parent = self.parent
+    while next_sibling[index] == -1:
+      index = parent[index]
+      if index == -1:
+        return len(self.kinds)
+    return next_sibling[index]
+
+  def append_child (self, index: int, child: int):
+    self.ordered = False
+    self.parent[child] = index
+    last = self.first_child[index]
+    if last == -1:
+      self.first_child[index] = child
+      return
+    next_sibling = self.next_sibling
+    while next_sibling[last] != -1:
+      last = next_sibling[last]
+    next_sibling[last] = child
+
+  def replace_child (self, index: int, position: int, node) -> int:
+    # Put node, a view or an AstNode, in place of a child, and return
+    # its index. The old child is left without a parent.
+    self.ordered = False
+    previous = -1
+    old = self.first_child[index]
+    for _ in range(position):
+      if old == -1:
+        break
+      previous = old
+      old = self.next_sibling[old]
+    if old == -1:
+      raise IndexError("child index out of range")
+    following = self.next_sibling[old]
+    self.parent[old] = -1
+    self.next_sibling[old] = -1
+    # Unlinked before the new node is copied in, as it may hold the old
+    # child
+    if previous == -1:
+      self.first_child[index] = following
+    else:
+      self.next_sibling[previous] = following
+    new = self.adopt(node)
+    self.parent[new] = index
+    self.next_sibling[new] = following
+    if previous == -1:
+      self.first_child[index] = new
+    else:
+      self.next_sibling[previous] = new
+    return new
+
+  def adopt (self, node) -> int:
+    # Index of node in this arena, copying it in if it is an AstNode
+    if type(node) is ArenaNode:
+      if node.arena is not self:
+        raise Exception("node belongs to another arena")
+      if self.parent[node.index] != -1:
+        raise Exception("node already has a parent")
+      return node.index
+    index = self.add(node.kind, -1 if node.token is None else self.token_index(node.token))
+    for name in FIELDS:
+      value = getattr(node, name)
+      if value is not None:
+        self.set_value(name, index, value)
+    if node.extra is not None:
+      for name, value in node.extra.items():
+        self.set_value(name, index, value)
+    for child in node.children:
+      if child is not None:
+        self.append_child(index, self.adopt(child))
+    return index
+
+  # TOKENS AND ATTRIBUTES
+
+  def token (self, index: int) -> Optional[Token]:
+    token_index = self.tokens[index]
+    if token_index < 0:
+      return None
+    token = self.token_objects.get(token_index)
+    if token is None:
+      token = self.token_objects[token_index] = self.buffer.token(token_index)
+    return token
+
+  def token_index (self, token: Token) -> int:
+    # Index in the buffer of a token made from it. Tokens end at
+    # increasing offsets, except for the empty EOF token.
+    index = bisect_left(self.buffer.ends, token.position)
+    if index >= len(self.buffer) or self.buffer.kinds[index] != token.kind:
+      raise Exception(f"token {token} is not in the token buffer")
+    self.token_objects.setdefault(index, token)
+    return index
+
+  def value (self, name: str, index: int):
+    values = self.values.get(name)
+    return None if values is None else values[index]
+
+  def set_value (self, name: str, index: int, value):
+    values = self.values.get(name)
+    if values is None:
+      values = self.values[name] = [None] * len(self.kinds)
+    values[index] = value
+
+  # BUILDING
+
+  @staticmethod
+  def from_tree (root: AstNode, buffer: TokenBuffer) -> 'AstArena':
+    # Arena holding a copy of a tree parsed from buffer, with nodes
+    # numbered in pre-order
+    buffer.settle()
+    arena = AstArena(buffer)
+    ends = buffer.ends
+    kind_id = arena.kind_id
+    kinds = arena.kinds
+    tokens = arena.tokens
+    first_child = arena.first_child
+    next_sibling = arena.next_sibling
+    parent = arena.parent
+    # Last child added to each node so far
+    last_child = array('i')
+    # Attributes to set once the columns are complete, as (name, index,
+    # value)
+    values = []
+    # Entries are (node, parent index)
+    stack = [(root, -1)]
+    while stack:
+      node, up = stack.pop()
+      index = len(kinds)
+      kinds.append(kind_id(node.kind))
+      token = node.token
+      tokens.append(-1 if token is None else bisect_left(ends, token.position))
+      first_child.append(-1)
+      next_sibling.append(-1)
+      parent.append(up)
+      last_child.append(-1)
+      if up != -1:
+        if last_child[up] == -1:
+          first_child[up] = index
+        else:
+          next_sibling[last_child[up]] = index
+        last_child[up] = index
+      for name in FIELDS:
+        value = getattr(node, name)
+        if value is not None:
+          values.append((name, index, value))
+      if node.extra is not None:
+        for name, value in node.extra.items():
+          if name != 'node_index':
+            values.append((name, index, value))
+      children = node.children
+      for position in range(len(children) - 1, -1, -1):
+        child = children[position]
+        if child is not None:
+          stack.append((child, index))
+    for name, index, value in values:
+      arena.set_value(name, index, value)
+    arena.ordered = True
+    return arena
@@ -0,0 +1,170 @@
+import struct
+from array import array
+from typing import Dict, Optional
+
+from co.ast.AstNode import AstNode
+from co.reader import Token
+from co.reader.LineIndex import LineIndex
+from co.reader.NumberLiteral import NUMBER_KIND_SET, number_value
+from co.reader.StringPool import StringPool
+from co.reader.TokenKind import KINDS
+
+# Purpose:
+
+# Compact binary form of a tree as built by the Parser, for shipping
+# trees between processes and storing them, instead of pickling graphs
+# of node and token objects. Nodes are listed in pre-order as parallel
+# integer columns: kind, child count, the flags that the Parser sets on
+# declarations, and the kind, lexeme and position of the node's token.
+# Node kinds and lexemes are numbers into a table that holds each
+# distinct string once. The line starts of the source come along, so
+# that decoded tokens still know their lines and columns.
+
+# Notes:
+#
+# 1. Only what the Parser sets is encoded: kinds, children, tokens and
+# the is_constant, is_global and is_final fields, two bits each (see
+# FLAG_FIELDS). Other attributes, set by passes, including a node
+# index, are dropped.
+#
+# 2. A child that is None (see Walker) is encoded as kind -1, and a
+# node without a token as token kind -1.
+#
+# 3. Tokens are rebuilt with the same kind, lexeme and position. The
+# values of numeric literals are decoded again from their lexemes, and
+# identifiers and keywords are interned in the given string pool.
+#
+# 4. Integers are stored in native byte order, so encoded trees are
+# meant for the machine that made them.
+
+MAGIC = b'COAS'
+
+# Magic, node count, string count, text length, line count
+HEADER = struct.Struct('<4sIIII')
+
+# Fields encoded in the flags column, from the lowest bits up, each as
+# 0 for None, 1 for False and 2 for True
+FLAG_FIELDS = ('is_constant', 'is_global', 'is_final')
+
+FLAG_CODES = { None: 0, False: 1, True: 2 }
+
+FLAG_VALUES = (None, False, True)
+
+def node_flags (node: AstNode) -> int:
+  return FLAG_CODES[node.is_constant] | FLAG_CODES[node.is_global] << 2 | FLAG_CODES[node.is_final] << 4
+
+def encode_tree (root: AstNode, line_index: LineIndex) -> bytes:
+  strings: Dict[str, int] = {}
+  kinds = array('i')
+  counts = array('i')
+  flags = array('i')
+  token_kinds = array('i')
+  lexemes = array('i')
+  positions = array('i')
+  stack = [root]
+  while stack:
+    node = stack.pop()
+    if node is None:
+      kinds.append(-1)
+      counts.append(0)
+      flags.append(0)
+      token_kinds.append(-1)
+      lexemes.append(0)
+      positions.append(0)
+      continue
+    kinds.append(strings.setdefault(node.kind, len(strings)))
+    children = node.children
+    counts.append(len(children))
+    flags.append(node_flags(node))
+    token = node.token
+    if token is None:
+      token_kinds.append(-1)
+      lexemes.append(0)
+      positions.append(0)
+    else:
+      token_kinds.append(token.kind.value)
+      lexemes.append(strings.setdefault(token.lexeme, len(strings)))
+      positions.append(token.position)
+    stack.extend(reversed(children))
+  lengths = array('i', map(len, strings))
+  text = ''.join(strings).encode('utf-8', 'surrogatepass')
+  line_index.settle()
+  line_starts = line_index.starts
+  header = HEADER.pack(MAGIC, len(kinds), len(lengths), len(text), len(line_starts))
+  return b''.join([
+    header,
+    kinds.tobytes(),
+    counts.tobytes(),
+    flags.tobytes(),
+    token_kinds.tobytes(),
+    lexemes.tobytes(),
+    positions.tobytes(),
+    lengths.tobytes(),
+    line_starts.tobytes(),
+    text,
+  ])
+
+def decode_tree (data: bytes, pool: Optional[StringPool] = None) -> AstNode:
+  magic, count, string_count, text_length, line_count = HEADER.unpack_from(data)
+  if magic != MAGIC:
+    raise Exception("Not an encoded tree")
+  view = memoryview(data)
+  offset = HEADER.size
+  columns = []
+  for size in (count, count, count, count, count, count, string_count, line_count):
+    column = array('i')
+    column.frombytes(view[offset:offset + 4 * size])
+    columns.append(column)
+    offset += 4 * size
+  kinds, counts, flags, token_kinds, lexemes, positions, lengths, line_starts = columns
+  text = bytes(view[offset:offset + text_length]).decode('utf-8', 'surrogatepass')
+  strings = []
+  start = 0
+  for length in lengths:
+    strings.append(text[start:start + length])
+    start += length
+  line_index = LineIndex('')
+  line_index.starts = line_starts
+  pooled = pool.kinds if pool is not None else frozenset()
+  intern = pool.intern if pool is not None else None
+  # Children list of the node being filled, how many children it still
+  # needs, and the same for the nodes around it that still need some
+  root = None
+  children = None
+  remaining = 0
+  parents = []
+  for i in range(count):
+    kind = kinds[i]
+    if kind < 0:
+      node = None
+    else:
+      node = AstNode(strings[kind])
+      bits = flags[i]
+      if bits:
+        node.is_constant = FLAG_VALUES[bits & 3]
+        node.is_global = FLAG_VALUES[bits >> 2 & 3]
+        node.is_final = FLAG_VALUES[bits >> 4]
+      token_kind = token_kinds[i]
+      if token_kind >= 0:
+        token_kind = KINDS[token_kind]
+        lexeme = strings[lexemes[i]]
+        value = None
+        if token_kind in NUMBER_KIND_SET:
+          value = number_value(lexeme)
+        elif token_kind in pooled:
+          lexeme = intern(lexeme)
+        node.token = Token(token_kind, lexeme, positions[i], line_index, value)
+    if children is None:
+      root = node
+    else:
+      children.append(node)
+      remaining -= 1
+    child_count = counts[i]
+    if child_count:
+      if remaining:
+        parents.append((children, remaining))
+      node.children = children = []
+      remaining = child_count
+    elif remaining == 0 and parents:
+      children, remaining = parents.pop()
+  return root
@@ -1,13 +1,63 @@
-from typing import List
+from typing import List, Optional
 from co.reader import Token
 
+# Purpose:
+
+# Node of the abstract syntax tree. Nodes are compact: they use slots
+# instead of a per-instance dict, leaves share an empty children tuple
+# until a child is added, and the attributes that passes attach to
+# nodes are first-class fields rather than entries in a dict.
+
+# Notes:
+#
+# 1. attribute() and set_attribute() remain for existing callers. Names
+# listed in FIELDS map onto the fields. Any other name is kept in a
+# dict that is only created the first time such a name is set.
+#
+# 2. Unset fields read as None, which is what attribute() returned for
+# a missing key.
+
+# Names of the attribute fields
+FIELDS = frozenset([
+  'scope',
+  'type',
+  'symbol',
+  'dep_list',
+  'is_constant',
+  'is_global',
+  'is_final',
+])
+
 class AstNode:
 
+  __slots__ = (
+    'kind',
+    'children',
+    'token',
+    'scope',
+    'type',
+    'symbol',
+    'dep_list',
+    'is_constant',
+    'is_global',
+    'is_final',
+    'extra',
+  )
+
   def __init__ (self, kind: str = 'None'):
     self.kind = kind
-    self.children: List['AstNode'] = []
-    self.token = None
-    self.attributes: dict = {}
+    self.children: List['AstNode'] = ()
+    self.token: Optional[Token] = None
+    # Set by passes
+    self.scope: Optional['Scope'] = None
+    self.type: Optional['TypeNode'] = None
+    self.symbol: Optional['Symbol'] = None
+    self.dep_list: Optional[List['AstNode']] = None
+    self.is_constant: Optional[bool] = None
+    self.is_global: Optional[bool] = None
+    self.is_final: Optional[bool] = None
+    # Attributes without a field of their own
+    self.extra: Optional[dict] = None
 
   def __repr__ (self):
     return f"AstNode({self.kind},{self.token})"
@@ -19,7 +69,10 @@ class AstNode:
     return len(self.children)
 
   def add_child (self, node: 'AstNode'):
-    self.children.append(node)
+    if self.children:
+      self.children.append(node)
+    else:
+      self.children = [node]
 
   def set_child (self, index: int, node: 'AstNode'):
     self.children[index] = node
@@ -31,7 +84,16 @@ class AstNode:
     self.token = token
 
   def attribute (self, name: str):
-    return self.attributes.get(name)
+    if name in FIELDS:
+      return getattr(self, name)
+    if self.extra is None:
+      return None
+    return self.extra.get(name)
 
   def set_attribute (self, name: str, value):
-    self.attributes[name] = value
+    if name in FIELDS:
+      setattr(self, name, value)
+    else:
+      if self.extra is None:
+        self.extra = {}
+      self.extra[name] = value
@@ -0,0 +1,143 @@
+from typing import Dict, FrozenSet
+
+# Purpose:
+
+# Shape of the trees built by the Parser: for each node kind, the node
+# kinds that may appear as its children. From this, the kinds that may
+# appear anywhere below a node are derived, which lets a traversal
+# skip subtrees that cannot contain the node kinds it is looking for.
+
+# Notes:
+#
+# 1. This table must be kept in step with the Parser. A kind that is
+# missing from it is never skipped, so an omission costs time but not
+# correctness. A missing child kind, on the other hand, would hide
+# nodes, so when in doubt list it.
+#
+# 2. PromoteCast is inserted by the type passes rather than by the
+# Parser. It wraps a single expression.
+
+EXPRESSION_KINDS = frozenset([
+  'BinaryExpression',
+  'UnaryExpression',
+  'Name',
+  'FunctionCall',
+  'ArrayAccess',
+  'FieldAccess',
+  'IfExpression',
+  'NullLiteral',
+  'BooleanLiteral',
+  'FloatingPointLiteral',
+  'IntegerLiteral',
+  'StringLiteral',
+  'PromoteCast',
+])
+
+TYPE_KINDS = frozenset([
+  'PointerType',
+  'ArrayType',
+  'FunctionType',
+  'PrimitiveType',
+  'NominalType',
+])
+
+STATEMENT_KINDS = frozenset([
+  'BreakStatement',
+  'ContinueStatement',
+  'DoStatement',
+  'ForStatement',
+  'IfStatement',
+  'LoopStatement',
+  'ReturnStatement',
+  'WhileStatement',
+  'NullStatement',
+  'DeclarationStatement',
+  'ExpressionStatement',
+])
+
+DECLARATION_KINDS = frozenset([
+  'ClassDeclaration',
+  'FunctionDeclaration',
+  'StructureDeclaration',
+  'TypealiasDeclaration',
+  'UnionDeclaration',
+  'VariableDeclaration',
+])
+
+BODY_KINDS = frozenset(['Block']) | STATEMENT_KINDS
+
+CHILD_KINDS: Dict[str, FrozenSet[str]] = {
+  # Package, translation unit and declarations
+  'Package':              frozenset(['TranslationUnit']),
+  'TranslationUnit':      frozenset(['PackageClause', 'Error']) | DECLARATION_KINDS,
+  'PackageClause':        frozenset(['Name']),
+  'ClassDeclaration':     frozenset(['Name', 'Error']),
+  'VariableDeclaration':  frozenset(['Name', 'TypeRoot', 'ExpressionRoot']),
+  'FunctionDeclaration':  frozenset(['Name', 'ParameterList', 'TypeRoot', 'VoidType', 'FunctionBody']),
+  'ParameterList':        frozenset(['Parameter']),
+  'Parameter':            frozenset(['Name', 'TypeRoot']),
+  'FunctionBody':         frozenset(['TopBlock']),
+  'TopBlock':             STATEMENT_KINDS | frozenset(['Error']),
+  'Block':                STATEMENT_KINDS | frozenset(['Error']),
+  'StructureDeclaration': frozenset(['Name', 'StructureBody']),
+  'StructureBody':        frozenset(['StructureMember']),
+  'StructureMember':      frozenset(['Name', 'TypeRoot']),
+  'TypealiasDeclaration': frozenset(['Name', 'TypeRoot']),
+  'UnionDeclaration':     frozenset(['Name', 'UnionBody']),
+  'UnionBody':            frozenset(['UnionMember']),
+  'UnionMember':          frozenset(['Name', 'TypeRoot']),
+  # Stands in for a declaration or statement with a syntax error
+  'Error':                frozenset(),
+  # Statements
+  'BreakStatement':       frozenset(),
+  'ContinueStatement':    frozenset(),
+  'NullStatement':        frozenset(),
+  'DoStatement':          EXPRESSION_KINDS | BODY_KINDS,
+  'DeclarationStatement': frozenset(['VariableDeclaration']),
+  'ExpressionStatement':  frozenset(['ExpressionRoot']),
+  'ForStatement':         frozenset(['Name', 'ExpressionRoot']) | BODY_KINDS,
+  'IfStatement':          frozenset(['ExpressionRoot']) | BODY_KINDS,
+  'LoopStatement':        frozenset(['ExpressionRoot']) | BODY_KINDS,
+  'ReturnStatement':      frozenset(['ExpressionRoot']),
+  'WhileStatement':       frozenset(['ExpressionRoot']) | BODY_KINDS,
+  # Expressions
+  'ExpressionRoot':       EXPRESSION_KINDS,
+  'BinaryExpression':     EXPRESSION_KINDS,
+  'UnaryExpression':      EXPRESSION_KINDS,
+  'FunctionCall':         EXPRESSION_KINDS | frozenset(['ArgumentList']),
+  'ArgumentList':         EXPRESSION_KINDS,
+  'ArrayAccess':          EXPRESSION_KINDS,
+  'FieldAccess':          EXPRESSION_KINDS,
+  'IfExpression':         EXPRESSION_KINDS,
+  'PromoteCast':          EXPRESSION_KINDS,
+  'Name':                 frozenset(),
+  'NullLiteral':          frozenset(),
+  'BooleanLiteral':       frozenset(),
+  'FloatingPointLiteral': frozenset(),
+  'IntegerLiteral':       frozenset(),
+  'StringLiteral':        frozenset(),
+  # Types
+  'TypeRoot':             TYPE_KINDS,
+  'PointerType':          TYPE_KINDS,
+  'ArrayType':            TYPE_KINDS | frozenset(['ExpressionRoot']),
+  'FunctionType':         TYPE_KINDS,
+  'PrimitiveType':        frozenset(),
+  'NominalType':          frozenset(),
+  'VoidType':             frozenset(),
+}
+
+def descendant_kinds () -> Dict[str, FrozenSet[str]]:
+  # Transitive closure of CHILD_KINDS. Iterate until no set grows.
+  result = { kind: set(children) for kind, children in CHILD_KINDS.items() }
+  changed = True
+  while changed:
+    changed = False
+    for kind, below in result.items():
+      size = len(below)
+      for child in list(below):
+        below |= result.get(child, set())
+      if len(below) != size:
+        changed = True
+  return { kind: frozenset(below) for kind, below in result.items() }
+
+DESCENDANT_KINDS = descendant_kinds()
@@ -0,0 +1,81 @@
+from typing import Callable, List, Optional
+
+from co.ast.AstNode import AstNode
+
+# Purpose:
+
+# Node whose children are built the first time they are read. The
+# Parser uses it for function bodies when asked to parse lazily: it
+# skips over the body, and leaves a node that parses the body when a
+# pass first looks inside. Passes that only need declarations, such as
+# an outline of a package or the global dependency graph, then never
+# pay for the bodies.
+
+# Notes:
+#
+# 1. To any code that reads children, directly or through child() and
+# child_count(), the node looks like a plain AstNode. Reading them is
+# what builds them.
+#
+# 2. A pass that wants to visit the children without building them,
+# because it can do its work later, checks pending() and registers a
+# callback with when_built(). Callbacks run, in the order registered,
+# right after the children are built, i.e. in the middle of whatever
+# pass first reads them.
+#
+# 3. Errors in a body, e.g. syntax errors, are only found when it is
+# built.
+
+# Slot of the children in AstNode, which the property below hides
+CHILDREN = AstNode.children
+
+class LazyNode (AstNode):
+
+  __slots__ = (
+    'builder',
+    'listeners',
+  )
+
+  def __init__ (self, kind: str, builder: Callable[[], List[AstNode]]):
+    super().__init__(kind)
+    # Returns the children. Cleared once they are built.
+    self.builder: Optional[Callable[[], List[AstNode]]] = builder
+    self.listeners: Optional[List[Callable[[AstNode], None]]] = None
+
+  def __repr__ (self):
+    return f"LazyNode({self.kind},{'pending' if self.pending() else 'built'})"
+
+  @property
+  def children (self) -> List[AstNode]:
+    if self.builder is not None:
+      self.build()
+    return CHILDREN.__get__(self)
+
+  @children.setter
+  def children (self, children: List[AstNode]):
+    # Setting the children replaces whatever the builder would give
+    CHILDREN.__set__(self, children)
+    if hasattr(self, 'builder'):
+      self.builder = None
+
+  def pending (self) -> bool:
+    return self.builder is not None
+
+  def when_built (self, listener: Callable[[AstNode], None]):
+    if self.builder is None:
+      listener(self)
+    elif self.listeners is None:
+      self.listeners = [listener]
+    else:
+      self.listeners.append(listener)
+
+  def build (self):
+    # If the builder fails, the node stays pending
+    children = self.builder()
+    self.builder = None
+    CHILDREN.__set__(self, children)
+    listeners = self.listeners
+    self.listeners = None
+    if listeners is not None:
+      for listener in listeners:
+        listener(self)
@@ -0,0 +1,91 @@
+from array import array
+from heapq import merge
+from operator import itemgetter
+from typing import Dict, Iterator, List, Tuple
+
+from co.ast.AstNode import AstNode
+
+# Purpose:
+
+# Index of the nodes of a tree by kind. For each kind it holds the
+# nodes of that kind in source order (pre-order), together with the
+# pre-order number of each node and the number just past the end of
+# its subtree. A pass that only cares about a few kinds can iterate
+# those nodes directly instead of walking the whole tree.
+
+# Notes:
+#
+# 1. The Parser builds an index on request and stores it on the
+# TranslationUnit node as the 'node_index' attribute.
+#
+# 2. The index describes the tree as parsed. Nodes that passes insert
+# or replace later on (e.g. casts) are not in it.
+
+class NodeIndex:
+
+  def __init__ (self, root: AstNode):
+    self.nodes: Dict[str, List[AstNode]] = {}
+    # Pre-order number of each node, and the number just past its
+    # subtree. A node lies inside another if its number falls within
+    # the other's range.
+    self.starts: Dict[str, array] = {}
+    self.ends: Dict[str, array] = {}
+    self.build(root)
+
+  def __repr__ (self):
+    return f"NodeIndex({sum(len(nodes) for nodes in self.nodes.values())} nodes)"
+
+  def build (self, root: AstNode):
+    nodes_by_kind = self.nodes
+    starts_by_kind = self.starts
+    ends_by_kind = self.ends
+    count = 0
+    # Entries are nodes to enter, or (ends, slot) pairs whose subtree
+    # end is due
+    stack = [root]
+    while stack:
+      node = stack.pop()
+      if type(node) is tuple:
+        ends, slot = node
+        ends[slot] = count
+        continue
+      kind = node.kind
+      nodes = nodes_by_kind.get(kind)
+      if nodes is None:
+        nodes = nodes_by_kind[kind] = []
+        starts = starts_by_kind[kind] = array('i')
+        ends = ends_by_kind[kind] = array('i')
+      else:
+        starts = starts_by_kind[kind]
+        ends = ends_by_kind[kind]
+      nodes.append(node)
+      starts.append(count)
+      count += 1
+      children = node.children
+      if children:
+        ends.append(0)
+        stack.append((ends, len(ends) - 1))
+        for index in range(len(children) - 1, -1, -1):
+          child = children[index]
+          if child is not None:
+            stack.append(child)
+      else:
+        ends.append(count)
+
+  def count (self, kind: str) -> int:
+    return len(self.nodes.get(kind, ()))
+
+  def nodes_of (self, kind: str) -> List[AstNode]:
+    # Nodes of one kind, in source order
+    return self.nodes.get(kind, [])
+
+  def entries (self, *kinds: str) -> Iterator[Tuple[int, int, AstNode]]:
+    # (start, end, node) for the nodes of the given kinds, merged into
+    # source order
+    streams = [
+      zip(self.starts[kind], self.ends[kind], self.nodes[kind])
+      for kind in kinds if kind in self.nodes
+    ]
+    if len(streams) == 1:
+      return streams[0]
+    return merge(*streams, key=itemgetter(0))
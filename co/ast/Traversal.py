@@ -0,0 +1,144 @@
+from typing import FrozenSet, List
+
+from co.ast.AstNode import AstNode
+from co.ast.ArenaNode import ArenaNode
+
+# Purpose:
+
+# Traversal helpers for passes that visit expression trees on their
+# own rather than through a Walker. Expression trees can be as deep as
+# the source is long (a chain a + b + c + ... leans one level per
+# operator), so the helpers use an explicit stack instead of one
+# Python call per level.
+
+# Notes:
+#
+# 1. post_order() lists a subtree the way a recursive visitor that
+# handles a node after its operands, left to right, would reach the
+# nodes. It only enters nodes whose kind is given; other nodes are
+# listed as leaves. A pass that handled operators by recursing into
+# their operands can instead loop over this list and handle each node
+# without recursing.
+#
+# 2. operands() lists only the nodes that post_order() lists as leaves,
+# in the same order. It is the cheaper of the two, for passes that
+# only handle operands, e.g. names.
+#
+# 3. Nodes of the given kinds must have at least one child, as
+# operators do. A root that is None gives an empty list.
+#
+# 4. Both take a root that is an AstNode or a view of a node of an
+# AstArena. For a view, they go over the arena's columns, and make
+# views only of the nodes they return.
+#
+# 5. dependencies() is operands() as the dependency passes use it. It
+# needs the scopes that Pass1 attaches to names.
+
+# Node kinds whose children are operands
+OPERATOR_KINDS = frozenset(['BinaryExpression', 'UnaryExpression'])
+
+def post_order (root: AstNode, kinds: FrozenSet[str] = OPERATOR_KINDS) -> List[AstNode]:
+  if root is None or root.kind not in kinds:
+    # Most expressions are a single operand
+    return [root] if root is not None else []
+  if type(root) is ArenaNode:
+    return arena_post_order(root, kinds)
+  # Pre-order with the children taken right to left, reversed
+  nodes = []
+  append = nodes.append
+  stack = [root]
+  pop = stack.pop
+  extend = stack.extend
+  while stack:
+    node = pop()
+    append(node)
+    if node.kind in kinds:
+      extend(node.children)
+  nodes.reverse()
+  return nodes
+
+def operands (root: AstNode, kinds: FrozenSet[str] = OPERATOR_KINDS) -> List[AstNode]:
+  if root is None or root.kind not in kinds:
+    return [root] if root is not None else []
+  if type(root) is ArenaNode:
+    return arena_operands(root, kinds)
+  # Follow first children down to a leaf, leaving the other children
+  # of each node on the stack for later
+  leaves = []
+  append = leaves.append
+  stack = [root]
+  pop = stack.pop
+  push = stack.append
+  while stack:
+    node = pop()
+    while node.kind in kinds:
+      children = node.children
+      if len(children) == 2:
+        push(children[1])
+      elif len(children) > 2:
+        stack.extend(reversed(children[1:]))
+      node = children[0]
+    append(node)
+  return leaves
+
+def dependencies (root: AstNode) -> List[AstNode]:
+  # Declarations of the names in the expression, in source order.
+  # Undeclared names are skipped. Pass3a reports them.
+  dep_list = []
+  for node in operands(root):
+    if node.kind == 'Name':
+      symbol = node.scope.resolve(node.token.lexeme)
+      if symbol:
+        dep_list.append(symbol.declaration)
+  return dep_list
+
+def arena_post_order (root: ArenaNode, kinds: FrozenSet[str]) -> List[ArenaNode]:
+  arena = root.arena
+  ids = arena.kind_ids(kinds)
+  kind_column = arena.kinds
+  first_child = arena.first_child
+  next_sibling = arena.next_sibling
+  indexes = []
+  append = indexes.append
+  stack = [root.index]
+  pop = stack.pop
+  push = stack.append
+  while stack:
+    index = pop()
+    append(index)
+    if kind_column[index] in ids:
+      child = first_child[index]
+      while child != -1:
+        push(child)
+        child = next_sibling[child]
+  indexes.reverse()
+  return [ArenaNode(arena, index) for index in indexes]
+
+def arena_operands (root: ArenaNode, kinds: FrozenSet[str]) -> List[ArenaNode]:
+  arena = root.arena
+  ids = arena.kind_ids(kinds)
+  kind_column = arena.kinds
+  first_child = arena.first_child
+  next_sibling = arena.next_sibling
+  leaves = []
+  append = leaves.append
+  stack = [root.index]
+  pop = stack.pop
+  push = stack.append
+  while stack:
+    index = pop()
+    while kind_column[index] in ids:
+      child = first_child[index]
+      rest = next_sibling[child]
+      if rest != -1:
+        if next_sibling[rest] == -1:
+          push(rest)
+        else:
+          others = []
+          while rest != -1:
+            others.append(rest)
+            rest = next_sibling[rest]
+          stack.extend(reversed(others))
+      index = child
+    append(ArenaNode(arena, index))
+  return leaves
@@ -0,0 +1,293 @@
+from typing import Dict, FrozenSet, List, Optional
+
+from co.ast.AstNode import AstNode
+from co.ast.ArenaNode import ArenaNode
+from co.ast.NodeIndex import NodeIndex
+from co.ast.Grammar import CHILD_KINDS, DESCENDANT_KINDS
+
+# Purpose:
+
+# Shared traversal engine for passes. A pass derives from Walker and
+# declares, per node kind, the name of the method to call when the
+# walk reaches a node of that kind (pre_order) and when it has
+# finished the node's children (post_order). The tables are resolved
+# to functions once per pass class. The walk itself uses an explicit
+# stack, so tree depth is not limited by the recursion limit.
+
+# The declared kinds double as the set of kinds the pass cares about.
+# Using the tree shape in Grammar, the walk does not enter a subtree
+# that cannot contain any of those kinds.
+
+# Notes:
+#
+# 1. A pre-order handler may return Walker.SKIP to leave the node's
+# children unvisited. The node's post-order handler still runs.
+#
+# 2. Children are visited in source order. Children that are None,
+# which the Parser leaves behind on some errors, are ignored.
+#
+# 3. If a declared kind is not in Grammar, nothing is skipped.
+#
+# 4. If the root carries a node index (see NodeIndex) and the pass has
+# no post-order handlers, the walk takes the nodes of the declared
+# kinds straight from the index, in the same order, and does not
+# visit any other node. Walker.SKIP is still honored: nodes inside a
+# skipped subtree are passed over.
+#
+# 5. walk_all() runs several passes over the tree in one traversal,
+# as if each had walked it alone. A pass that returns Walker.SKIP only
+# skips the subtree for itself. begin() and finish() are hooks for
+# work a pass does before and after its walk, so that a caller that
+# fuses walks can still run them.
+#
+# 6. The root may also be a view of a node of an AstArena. walk() then
+# goes over the arena's columns, and makes views only of the nodes it
+# hands to handlers. walk_all() goes through the views. While the
+# arena's nodes are in pre-order (see AstArena) and the pass has no
+# post-order handlers, the walk goes over them in index order instead
+# of keeping a stack. A handler that changes children there must only
+# change those of nodes in its own subtree; the walk then goes on with
+# a stack.
+
+class Walker:
+
+  SKIP = object()
+
+  # Kind to method name
+  pre_order: Dict[str, str] = {}
+  post_order: Dict[str, str] = {}
+
+  def __init_subclass__ (cls, **kwargs):
+    super().__init_subclass__(**kwargs)
+    cls.pre_table = { kind: getattr(cls, name) for kind, name in cls.pre_order.items() }
+    cls.post_table = { kind: getattr(cls, name) for kind, name in cls.post_order.items() }
+    cls.skip_kinds = Walker.skippable(frozenset(cls.pre_order) | frozenset(cls.post_order))
+
+  @staticmethod
+  def skippable (kinds: FrozenSet[str]) -> FrozenSet[str]:
+    # Kinds whose subtrees hold none of the given kinds
+    if not kinds <= CHILD_KINDS.keys():
+      return frozenset()
+    return frozenset(
+      kind for kind, below in DESCENDANT_KINDS.items()
+      if kind not in kinds and not (below & kinds)
+    )
+
+  def begin (self):
+    pass
+
+  def finish (self):
+    pass
+
+  def walk (self, root: AstNode):
+    if root is not None and not self.post_table:
+      index = root.attribute('node_index')
+      if index is not None:
+        self.walk_index(index)
+        return
+    pre_table = self.pre_table
+    post_table = self.post_table
+    skip_kinds = self.skip_kinds
+    SKIP = Walker.SKIP
+    if root is None or root.kind in skip_kinds:
+      return
+    if type(root) is ArenaNode:
+      self.walk_arena(root)
+      return
+    # Entries are nodes still to be entered, or 1-tuples holding nodes
+    # whose post-order handler is due
+    stack = [root]
+    while stack:
+      node = stack.pop()
+      if type(node) is tuple:
+        node = node[0]
+        post_table[node.kind](self, node)
+        continue
+      kind = node.kind
+      handler = post_table.get(kind)
+      if handler is not None:
+        stack.append((node,))
+      handler = pre_table.get(kind)
+      if handler is not None and handler(self, node) is SKIP:
+        continue
+      children = node.children
+      for index in range(len(children) - 1, -1, -1):
+        child = children[index]
+        if child is not None and child.kind not in skip_kinds:
+          stack.append(child)
+
+  def walk_arena (self, root: ArenaNode):
+    pre_table = self.pre_table
+    post_table = self.post_table
+    SKIP = Walker.SKIP
+    arena = root.arena
+    names = arena.names
+    kinds = arena.kinds
+    first_child = arena.first_child
+    next_sibling = arena.next_sibling
+    # Entries are indexes of nodes still to be entered, or the
+    # complements (~index) of nodes whose post-order handler is due
+    if arena.ordered and not post_table:
+      stack = self.walk_ordered(root)
+      if stack is None:
+        return
+    else:
+      stack = [root.index]
+    skip_ids = arena.kind_ids(self.skip_kinds)
+    pop = stack.pop
+    push = stack.append
+    while stack:
+      index = pop()
+      if index < 0:
+        index = ~index
+        post_table[names[kinds[index]]](self, ArenaNode(arena, index))
+        skip_ids = arena.kind_ids(self.skip_kinds)
+        continue
+      kind = names[kinds[index]]
+      if kind in post_table:
+        push(~index)
+      handler = pre_table.get(kind)
+      if handler is not None:
+        if handler(self, ArenaNode(arena, index)) is SKIP:
+          continue
+        # A handler may have added node kinds to the arena
+        skip_ids = arena.kind_ids(self.skip_kinds)
+      mark = len(stack)
+      child = first_child[index]
+      while child != -1:
+        if kinds[child] not in skip_ids:
+          push(child)
+        child = next_sibling[child]
+      if len(stack) - mark > 1:
+        stack[mark:] = reversed(stack[mark:])
+
+  def walk_ordered (self, root: ArenaNode) -> Optional[List[int]]:
+    # Walk of the nodes of an ordered arena in index order. Returns
+    # None when done, or the stack of nodes still to be entered if a
+    # handler changed children.
+    SKIP = Walker.SKIP
+    arena = root.arena
+    kinds = arena.kinds
+    end = arena.end
+    skip_ids = arena.kind_ids(self.skip_kinds)
+    handlers = self.arena_handlers(arena)
+    kind_count = len(arena.names)
+    index = root.index
+    stop = end(index)
+    while index < stop:
+      kind = kinds[index]
+      if kind in skip_ids:
+        index = end(index)
+        continue
+      handler = handlers.get(kind)
+      if handler is not None:
+        skipped = handler(self, ArenaNode(arena, index)) is SKIP
+        if not arena.ordered:
+          return self.arena_stack(root, index, skipped)
+        if len(arena.names) != kind_count:
+          skip_ids = arena.kind_ids(self.skip_kinds)
+          handlers = self.arena_handlers(arena)
+          kind_count = len(arena.names)
+        if skipped:
+          index = end(index)
+          continue
+      index += 1
+    return None
+
+  def arena_handlers (self, arena: 'AstArena') -> Dict[int, object]:
+    # Pre-order handlers by the numbers of their kinds in arena
+    ids = arena.ids
+    return { ids[kind]: handler for kind, handler in self.pre_table.items() if kind in ids }
+
+  def arena_stack (self, root: ArenaNode, index: int, skipped: bool) -> List[int]:
+    # Stack of the nodes an ordered walk had yet to enter after
+    # handling a node: the children of the node, unless skipped, then
+    # the siblings following the node and each of its ancestors
+    arena = root.arena
+    kinds = arena.kinds
+    next_sibling = arena.next_sibling
+    parent = arena.parent
+    skip_ids = arena.kind_ids(self.skip_kinds)
+    levels = []
+    if not skipped:
+      levels.append(arena.first_child[index])
+    node = index
+    while node != root.index and node != -1:
+      levels.append(next_sibling[node])
+      node = parent[node]
+    stack = []
+    for child in reversed(levels):
+      mark = len(stack)
+      while child != -1:
+        if kinds[child] not in skip_ids:
+          stack.append(child)
+        child = next_sibling[child]
+      stack[mark:] = reversed(stack[mark:])
+    return stack
+
+  def walk_index (self, index: NodeIndex):
+    pre_table = self.pre_table
+    SKIP = Walker.SKIP
+    skip_end = 0
+    for start, end, node in index.entries(*pre_table):
+      if start < skip_end:
+        continue
+      if pre_table[node.kind](self, node) is SKIP:
+        skip_end = end
+
+  @staticmethod
+  def walk_all (walkers: List['Walker'], root: AstNode):
+    # Combined dispatch tables. Each entry is (slot, walker, function),
+    # where slot numbers the walker.
+    pre_table = {}
+    post_table = {}
+    for slot, walker in enumerate(walkers):
+      for kind, function in walker.pre_table.items():
+        pre_table.setdefault(kind, []).append((slot, walker, function))
+      for kind, function in walker.post_table.items():
+        post_table.setdefault(kind, []).append((slot, walker, function))
+    SKIP = Walker.SKIP
+    if root is None:
+      return
+    index = root.attribute('node_index')
+    if index is not None and not post_table:
+      skip_ends = [0] * len(walkers)
+      for start, end, node in index.entries(*pre_table):
+        for slot, walker, function in pre_table[node.kind]:
+          if start >= skip_ends[slot] and function(walker, node) is SKIP:
+            skip_ends[slot] = end
+      return
+    skip_kinds = Walker.skippable(frozenset(pre_table) | frozenset(post_table))
+    if root.kind in skip_kinds:
+      return
+    # Walkers that are inside a subtree they chose to skip
+    skipping = [False] * len(walkers)
+    # Entries are nodes to enter, 2-tuples holding nodes whose
+    # post-order handlers are due, or 1-tuples holding the slot of a
+    # walker whose skipped subtree ends there
+    stack = [root]
+    while stack:
+      node = stack.pop()
+      if type(node) is tuple:
+        if len(node) == 1:
+          skipping[node[0]] = False
+        else:
+          node = node[0]
+          for slot, walker, function in post_table[node.kind]:
+            if not skipping[slot]:
+              function(walker, node)
+        continue
+      kind = node.kind
+      if kind in post_table:
+        stack.append((node, None))
+      handlers = pre_table.get(kind)
+      if handlers is not None:
+        for slot, walker, function in handlers:
+          if not skipping[slot] and function(walker, node) is SKIP:
+            skipping[slot] = True
+            stack.append((slot,))
+      children = node.children
+      for index in range(len(children) - 1, -1, -1):
+        child = children[index]
+        if child is not None and child.kind not in skip_kinds:
+          stack.append(child)
@@ -1,4 +1,9 @@
 
 from co.ast.AstNode import AstNode
+from co.ast.LazyNode import LazyNode
+from co.ast.ArenaNode import ArenaNode
+from co.ast.AstArena import AstArena
 from co.ast.OpKind import OpKind
+from co.ast.NodeIndex import NodeIndex
+from co.ast.Walker import Walker
 
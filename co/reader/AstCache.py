@@ -0,0 +1,86 @@
+import hashlib
+import os
+import struct
+import sys
+from typing import Optional, Union
+
+from co.reader.TokenCache import LEXER_VERSION
+
+# Purpose:
+
+# On-disk cache of syntax trees, so that a source that has not changed
+# since it was last parsed is neither scanned nor parsed again. Each
+# entry holds the tree of one source in the binary form of AstCodec
+# (node kinds, child counts and token kinds, lexemes and positions in
+# pre-order, as integer columns), in a file named after a hash of the
+# source and the lexer and parser versions. Loading an entry is a file
+# read and a decode, which costs a fraction of scanning and parsing.
+# PackageParser uses a cache when given a cache directory.
+
+# Notes:
+#
+# 1. The key covers the source bytes, LEXER_VERSION and PARSER_VERSION.
+# PARSER_VERSION must be bumped whenever a change to the parser, or to
+# AstCodec, changes the encoded tree of any input. Entries for other
+# versions are then simply never found again.
+#
+# 2. Only trees of sources without lexical or syntax errors are stored,
+# so an entry carries no diagnostics. A source with errors is parsed
+# every time, and its errors reported every time.
+#
+# 3. As for the token cache, entries are written in native byte order,
+# and an entry written on a machine with the other byte order is
+# treated as missing. Entries are written to a temporary file and
+# renamed into place.
+#
+# 4. Entries may share a directory with a token cache.
+
+PARSER_VERSION = 1
+
+MAGIC = b'COAC'
+
+# Magic, byte order
+HEADER = struct.Struct('<4s1s')
+
+class AstCache:
+
+  def __init__ (self, directory: str):
+    self.directory = directory
+    os.makedirs(directory, exist_ok=True)
+    self.hits = 0
+    self.misses = 0
+
+  def __repr__ (self):
+    return f"AstCache({self.directory!r}, {self.hits} hits, {self.misses} misses)"
+
+  def key (self, data: Union[str, bytes]) -> str:
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(f"{LEXER_VERSION}:{PARSER_VERSION}:".encode('ascii'))
+    digest.update(data.encode('utf-8', 'surrogatepass') if isinstance(data, str) else data)
+    return digest.hexdigest()
+
+  def path (self, key: str) -> str:
+    return os.path.join(self.directory, key + '.ast')
+
+  def load (self, key: str) -> Optional[bytes]:
+    # Encoded tree stored under key, or None
+    try:
+      with open(self.path(key), 'rb') as file:
+        data = file.read()
+    except FileNotFoundError:
+      self.misses += 1
+      return None
+    magic, order = HEADER.unpack_from(data)
+    if magic != MAGIC or order != sys.byteorder[0].encode('ascii'):
+      self.misses += 1
+      return None
+    self.hits += 1
+    return data[HEADER.size:]
+
+  def store (self, key: str, data: bytes):
+    path = self.path(key)
+    temporary = f"{path}.{os.getpid()}"
+    with open(temporary, 'wb') as file:
+      file.write(HEADER.pack(MAGIC, sys.byteorder[0].encode('ascii')))
+      file.write(data)
+    os.replace(temporary, path)
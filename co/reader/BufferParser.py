@@ -0,0 +1,109 @@
+from functools import partial
+from typing import List, Optional
+
+from co import ast
+from co.reader import Token
+from co.reader import Parser
+from co.reader.TokenBuffer import TokenBuffer
+from co.reader.TokenKind import TokenKind, KINDS
+
+# Purpose:
+
+# Parser that reads from a token buffer produced by
+# Lexer.tokenize_all() instead of pulling tokens from the lexer one at
+# a time. The grammar is inherited unchanged. Only the lookahead
+# machinery differs: the parser walks an index over the buffer and
+# keeps just the kind of the lookahead current, so no token object is
+# created per token. A full token is built only for the tokens that
+# get attached to AST nodes.
+
+# Notes:
+#
+# 1. With lazy set, function bodies are not parsed along with the rest.
+# The parser finds the brace that closes each body and leaves a
+# LazyNode in its place, which parses the body from its first token
+# the first time its children are read. Finding the brace takes a
+# search of the token kinds per closing brace in the body, so a lazy
+# parse costs time and memory in proportion to the declarations rather
+# than to the code in the bodies. A body whose braces do not balance is
+# parsed right away, so that the error is found where it is.
+
+class Lookahead:
+
+  # Stands in for the lookahead token. Productions only ever read its
+  # kind; they call Parser.token() when they need the whole token.
+
+  def __init__ (self, kind: TokenKind):
+    self.kind = kind
+
+  def __repr__ (self):
+    return f"Lookahead({self.kind.name})"
+
+class BufferParser (Parser):
+
+  def __init__ (self, input: TokenBuffer, lazy: bool = False):
+    self.lazy = lazy
+    super().__init__(input)
+
+  def prime (self):
+    # The buffer always ends with an EOF token, and the index stops
+    # there.
+    self.index: int = 0
+    self.last: int = len(self.input) - 1
+    self.kinds = self.input.kinds
+    self.lookahead = Lookahead(KINDS[self.kinds[0]])
+
+  def consume (self):
+    if self.index < self.last:
+      self.index += 1
+    self.lookahead.kind = KINDS[self.kinds[self.index]]
+
+  def peekahead (self, index: int) -> Token:
+    return self.input.token(min(self.index + index, self.last))
+
+  def token (self) -> Token:
+    return self.input.token(self.index)
+
+  def mark (self):
+    return self.index
+
+  def lazyFunctionBody (self) -> ast.AstNode:
+    start = self.index
+    end = self.closingBrace(start)
+    if end is None:
+      n = ast.AstNode('FunctionBody')
+      n.add_child(self.topBlock())
+      return n
+    self.index = end
+    self.consume()
+    return ast.LazyNode('FunctionBody', partial(self.bodyAt, start))
+
+  def closingBrace (self, start: int) -> Optional[int]:
+    # Index of the brace that closes the one at start, if any. Each
+    # step jumps to the next closing brace and counts the braces opened
+    # on the way.
+    kinds = self.kinds
+    depth = 1
+    index = start + 1
+    while True:
+      try:
+        end = kinds.index(TokenKind.R_BRACE, index, self.last)
+      except ValueError:
+        return None
+      depth += kinds[index:end].count(TokenKind.L_BRACE) - 1
+      if depth == 0:
+        return end
+      index = end + 1
+
+  def bodyAt (self, start: int) -> List[ast.AstNode]:
+    # Parse the body that starts at the given index, putting the
+    # parser back where it was afterwards
+    index = self.index
+    kind = self.lookahead.kind
+    self.index = start
+    self.lookahead.kind = KINDS[self.kinds[start]]
+    try:
+      return [self.topBlock()]
+    finally:
+      self.index = index
+      self.lookahead.kind = kind
@@ -1,6 +1,19 @@
+import json
+import re
+from array import array
 from enum import Enum
-from typing import List
+from typing import Callable, List
 from co import reader
+from co.reader.TokenBuffer import TokenBuffer
+from co.reader.TokenKind import TokenKind
+from co.reader.NumberLiteral import BINARY_REGEX, OCTAL_REGEX, HEXADECIMAL_REGEX, DECIMAL_REGEX
+from co.reader.NumberLiteral import BYTE_REGEXES, decode_number
+from co.reader.MappedSource import MappedSource
+from co.reader.LineIndex import LineIndex
+from co.reader.Logger import Logger
+from co.reader.Message import Message
+from co.reader.StringPool import StringPool
+from co.reader.TokenCache import TokenCache
 
 class State (Enum):
 
@@ -63,79 +76,261 @@ class State (Enum):
 
 
 keyword_lookup = {
-  'and': 'AND',
-  'break': 'BREAK',
-  'case': 'CASE',
-  'catch': 'CATCH',
-  'class': 'CLASS',
-  'const': 'CONST',
-  'continue': 'CONTINUE',
-  'def': 'DEF',
-  'default': 'DEFAULT',
-  'delete': 'DELETE',
-  'do': 'DO',
-  'else': 'ELSE',
-  'end': 'END',
-  'enum': 'ENUM',
-  'extends': 'EXTENDS',
-  'false': 'FALSE',
-  'for': 'FOR',
-  'foreach': 'FOREACH',
-  'fun': 'FUN',
-  'if': 'IF',
-  'in': 'IN',
-  'loop': 'LOOP',
-  'null': 'NULL',
-  'or': 'OR',
-  'package': 'PACKAGE',
-  'return': 'RETURN',
-  'struct': 'STRUCT',
-  'then': 'THEN',
-  'true': 'TRUE',
-  'typealias': 'TYPEALIAS',
-  'union': 'UNION',
-  'val': 'VAL',
-  'var': 'VAR',
-  'while': 'WHILE',
-
-  'bool': 'BOOL',
-  'float32': 'FLOAT32',
-  'float64': 'FLOAT64',
-  'int8': 'INT8',
-  'int16': 'INT16',
-  'int32': 'INT32',
-  'int64': 'INT64',
-  'null_t': 'NULL_T',
-  'uint8': 'UINT8',
-  'uint16': 'UINT16',
-  'uint32': 'UINT32',
-  'uint64': 'UINT64',
-  'void': 'VOID'
+  'and': TokenKind.AND,
+  'break': TokenKind.BREAK,
+  'case': TokenKind.CASE,
+  'catch': TokenKind.CATCH,
+  'class': TokenKind.CLASS,
+  'const': TokenKind.CONST,
+  'continue': TokenKind.CONTINUE,
+  'def': TokenKind.DEF,
+  'default': TokenKind.DEFAULT,
+  'delete': TokenKind.DELETE,
+  'do': TokenKind.DO,
+  'else': TokenKind.ELSE,
+  'end': TokenKind.END,
+  'enum': TokenKind.ENUM,
+  'extends': TokenKind.EXTENDS,
+  'false': TokenKind.FALSE,
+  'for': TokenKind.FOR,
+  'foreach': TokenKind.FOREACH,
+  'fun': TokenKind.FUN,
+  'if': TokenKind.IF,
+  'in': TokenKind.IN,
+  'loop': TokenKind.LOOP,
+  'null': TokenKind.NULL,
+  'or': TokenKind.OR,
+  'package': TokenKind.PACKAGE,
+  'return': TokenKind.RETURN,
+  'struct': TokenKind.STRUCT,
+  'then': TokenKind.THEN,
+  'true': TokenKind.TRUE,
+  'typealias': TokenKind.TYPEALIAS,
+  'union': TokenKind.UNION,
+  'val': TokenKind.VAL,
+  'var': TokenKind.VAR,
+  'while': TokenKind.WHILE,
+
+  'bool': TokenKind.BOOL,
+  'float32': TokenKind.FLOAT32,
+  'float64': TokenKind.FLOAT64,
+  'int8': TokenKind.INT8,
+  'int16': TokenKind.INT16,
+  'int32': TokenKind.INT32,
+  'int64': TokenKind.INT64,
+  'null_t': TokenKind.NULL_T,
+  'uint8': TokenKind.UINT8,
+  'uint16': TokenKind.UINT16,
+  'uint32': TokenKind.UINT32,
+  'uint64': TokenKind.UINT64,
+  'void': TokenKind.VOID
+}
+
+# Error recovery skips the rest of a malformed number up to the next
+# character that cannot be part of a word, and a run of characters
+# that cannot start a token up to the next one that can
+
+WORD_PATTERN = re.compile(r'\w*')
+INVALID_PATTERN = re.compile(r'[^\w \t\r\n"\'=|^&><+\-*/%!~:;.,{}\[\]()]*')
+
+BYTE_PATTERNS = {
+  pattern: re.compile(pattern.pattern.encode('ascii'))
+  for pattern in (WORD_PATTERN, INVALID_PATTERN)
 }
 
+# Most lexical errors to keep per lexer (see Logger)
+MESSAGE_LIMIT = 100
+
+BIN_DIGITS = frozenset('01')
+OCT_DIGITS = frozenset('01234567')
+DEC_DIGITS = frozenset('0123456789')
+HEX_DIGITS = frozenset('0123456789ABCDEFabcdef')
+
 class Lexer:
 
   def __init__ (self):
     self.input: str = ""
+    # What the patterns scan: the input itself, or the bytes behind a
+    # MappedSource
+    self.data = ""
     self.current: str = 'EOF'
     self.position: int = 0
     self.start: int = 0
     self.end: int = 0
-    self.line: int = 1
-    self.column: int = 0
+    # Line starts of the input, for line and column lookups
+    self.line_index = LineIndex("")
+    # Interned identifiers and keywords, shared by all its inputs
+    self.pool = StringPool(keyword_lookup)
+    # Lexical errors, for the caller to print or inspect
+    self.logger = Logger(limit=MESSAGE_LIMIT, unique=True)
+    # Where tokenize_all() looks for token buffers of inputs it has
+    # scanned before, if anywhere
+    self.cache: TokenCache = None
 
-  def setInput (self, input: str):
+  def setInput (self, input: str, line_index: LineIndex = None):
     self.input = input
-    if len(self.input) > 0:
-      self.current = self.input[self.position]
+    self.data = input.data if isinstance(input, MappedSource) else input
+    self.line_index = LineIndex(self.data) if line_index is None else line_index
+    self.setPosition(0)
+
+  def setPosition (self, position: int):
+    # Continue scanning from position, which must be between tokens
+    self.position = position
+    self.current = self.input[position] if position < len(self.input) else 'EOF'
+
+  def setInputFile (self, path: str):
+    # Scan a file without reading it into a string. ASCII files are
+    # memory-mapped (see MappedSource); others are decoded.
+    self.setInput(MappedSource.open(path))
+
+  def tokenize_all (self) -> TokenBuffer:
+    # Scan the whole input in one pass and return the token stream as
+    # a compact token buffer, ending with the EOF token. With a token
+    # cache, an input scanned before is loaded instead.
+    if self.cache is None or self.position != 0:
+      return self.scan_all()
+    key = self.cache.key(self.data)
+    entry = self.cache.load(key, self.input, self.line_index, self.pool)
+    if entry is None:
+      # Keep the errors with the tokens, to report them again on a hit.
+      # They are collected apart, so that the cached ones do not depend
+      # on what the logger already holds.
+      logger = self.logger
+      self.logger = Logger()
+      buffer = self.scan_all()
+      errors = [(message.offset, message.text) for message in self.logger.queue]
+      self.logger = logger
+      self.cache.store(key, buffer, json.dumps(errors))
+    else:
+      buffer, diagnostics = entry
+      errors = json.loads(diagnostics)
+      # Leave the lexer at the end of its input, as scanning does
+      self.setPosition(buffer.end(len(buffer) - 1))
+    for offset, text in errors:
+      self.report(offset, text)
+    return buffer
+
+  def scan_all (self) -> TokenBuffer:
+    # Fill a token buffer one getToken() call at a time
+    buffer = TokenBuffer(self.input, self.line_index, self.pool)
+    while True:
+      token = self.getToken()
+      buffer.append(token.kind, token.position - len(token.lexeme), token.position)
+      if token.kind == TokenKind.EOF:
+        return buffer
+
+  def relex (self, buffer: TokenBuffer, offset: int, removed: int, inserted: str) -> range:
+    # Update a token buffer made by tokenize_all() for an edit of its
+    # input that replaces removed characters at offset with inserted.
+    # Only tokens near the edit are scanned again: scanning restarts
+    # at a token boundary before the edit and stops as soon as it
+    # produces a token that the old stream also has past the edit,
+    # shifted by the change in length. From there on, both streams
+    # are the same. Returns the indices of the tokens scanned again.
+    # Queued errors are updated to match (see requeue).
+    input = buffer.input
+    text = input[:offset] + inserted + input[offset + removed:]
+    delta = len(inserted) - removed
+    buffer.line_index.edit(offset, removed, inserted)
+    kinds = buffer.kinds
+    # Back up one token further than needed, in case the token that
+    # ends before the edit was decided by looking past its end
+    first = max(buffer.search(buffer.ends, offset) - 1, 0)
+    self.setInput(text, buffer.line_index)
+    self.setPosition(buffer.end(first - 1) if first > 0 else 0)
+    begin = self.position
+    # Errors found by the scan are collected apart, to replace those
+    # queued for the part of the old input that it covers
+    logger = self.logger
+    self.logger = Logger()
+    # Old tokens that start past the edit, where the streams can meet
+    # again. The EOF tokens usually match, but error recovery can run
+    # past the end of the input, so stop at the new EOF token anyway.
+    count = len(kinds)
+    last = buffer.search(buffer.starts, offset + removed, first)
+    new_kinds = array('i')
+    new_starts = array('i')
+    new_ends = array('i')
+    while True:
+      token = self.getToken()
+      end = token.position
+      start = end - len(token.lexeme)
+      while last < count and buffer.start(last) + delta < start:
+        last += 1
+      if last < count and buffer.start(last) + delta == start and buffer.end(last) + delta == end and kinds[last] == token.kind:
+        break
+      new_kinds.append(token.kind)
+      new_starts.append(start)
+      new_ends.append(end)
+      if token.kind == TokenKind.EOF:
+        last = count
+        break
+    scanned = self.logger.queue
+    self.logger = logger
+    self.requeue(begin, end, delta, scanned)
+    buffer.splice(first, last, new_kinds, new_starts, new_ends, delta)
+    buffer.input = text
+    return range(first, first + len(new_kinds))
+
+  def requeue (self, begin: int, end: int, delta: int, scanned: List[Message]):
+    # After relex() has scanned the new input from begin to the end of
+    # its last token, drop the queued errors from the same part of the
+    # old input, which ended at end - delta, queue the scanned ones in
+    # their place, and move the errors past it by delta. Messages the
+    # logger dropped stay counted, as where they were is not known, so
+    # one that the edit would bring back is not queued again.
+    queue = self.logger.queue
+    self.logger.queue = []
+    self.logger.keys = set()
+    for message in queue:
+      if message.offset < begin:
+        self.logger.add_message(message)
+    for message in scanned:
+      self.logger.add_message(message)
+    for message in queue:
+      if message.offset >= end - delta:
+        # Its line may have moved too
+        self.report(message.offset + delta, message.text)
+
+  def error (self, message: str):
+    self.report(self.position, message)
+
+  def report (self, offset: int, text: str):
+    # Queue a lexical error at offset in the logger
+    message = Message('error', text)
+    line = self.line_index.line(offset)
+    message.set_line(line)
+    message.set_column(offset - self.line_index.line_start(line))
+    message.set_offset(offset)
+    self.logger.add_message(message)
 
-  def error (self, message):
-    coords = f"({self.line},{self.column})"
-    print(f"{coords}: error: {message}")
+  def invalid_number (self, begin: int, message: str) -> reader.Token:
+    # Report a malformed numeric literal at the current character and
+    # skip the rest of its word in one step, making it an error token
+    self.error(message)
+    self.skip(WORD_PATTERN)
+    return reader.Token(TokenKind.ERROR, self.input[begin:self.position], self.position, self.line_index)
+
+  def invalid_characters (self) -> reader.Token:
+    # Report a character that cannot start a token and skip it, with
+    # any others like it that follow, as one error token
+    begin = self.position
+    self.error(f"invalid character '{self.current}'")
+    self.consume()
+    self.skip(INVALID_PATTERN)
+    return reader.Token(TokenKind.ERROR, self.input[begin:self.position], self.position, self.line_index)
+
+  def skip (self, pattern: re.Pattern):
+    # Skip whatever pattern matches at the current position
+    if self.data is self.input:
+      end = pattern.match(self.input, self.position).end()
+    else:
+      end = BYTE_PATTERNS[pattern].match(self.data, self.position).end()
+    self.position = end
+    self.current = self.input[end] if end < len(self.input) else 'EOF'
 
   def consume (self):
     self.position += 1
-    self.column += 1
     if self.position < len(self.input):
       self.current = self.input[self.position]
     else:
@@ -143,23 +338,18 @@ class Lexer:
 
   def backup (self):
     self.position -= 1
-    self.column -=1
     self.current = self.input[self.position]
 
   def is_bin_digit (self, char: str) -> bool:
-    return (char == '0' or char == '1')
+    return (char in BIN_DIGITS)
 
   def is_oct_digit (self, char: str) -> bool:
-    OCT_DIGITS = [ '0', '1', '2', '3', '4', '5', '6', '7' ]
     return (char in OCT_DIGITS)
 
   def is_dec_digit (self, char: str) -> bool:
-    DEC_DIGITS = [ '0', '1', '2', '3', '4', '5', '6', '7', '8', '9' ]
     return (char in DEC_DIGITS)
 
   def is_hex_digit (self, char: str) -> bool:
-    HEX_DIGITS = [ '0', '1', '2', '3', '4', '5', '6', '7', '8', '9', 
-                   'A', 'B', 'C', 'D', 'E', 'F', 'a', 'b', 'c', 'd', 'e', 'f' ]
     return (char in HEX_DIGITS)
 
   def getToken (self) -> reader.Token:
@@ -170,39 +360,39 @@ class Lexer:
           self.consume()
           if self.current == '=':
             self.consume()
-            return reader.Token('EQUAL_EQUAL', '==', self.position, self.line, self.column)
+            return reader.Token(TokenKind.EQUAL_EQUAL, '==', self.position, self.line_index)
           else:
-            return reader.Token('EQUAL', '=', self.position, self.line, self.column)
+            return reader.Token(TokenKind.EQUAL, '=', self.position, self.line_index)
 
         case '|':
           self.consume()
           if self.current == '|':
             self.consume()
-            return reader.Token('BAR_BAR', '||', self.position, self.line, self.column)
+            return reader.Token(TokenKind.BAR_BAR, '||', self.position, self.line_index)
           elif self.current == '=':
             self.consume()
-            return reader.Token('BAR_EQUAL', '|=', self.position, self.line, self.column)
+            return reader.Token(TokenKind.BAR_EQUAL, '|=', self.position, self.line_index)
           else:
-            return reader.Token('BAR', '|', self.position, self.line, self.column)
+            return reader.Token(TokenKind.BAR, '|', self.position, self.line_index)
 
         case '^':
           self.consume()
           if self.current == '=':
             self.consume()
-            return reader.Token('CARET_EQUAL', '^=', self.position, self.line, self.column)
+            return reader.Token(TokenKind.CARET_EQUAL, '^=', self.position, self.line_index)
           else:
-            return reader.Token('CARET', '^', self.position, self.line, self.column)
+            return reader.Token(TokenKind.CARET, '^', self.position, self.line_index)
 
         case '&':
           self.consume()
           if self.current == '&':
             self.consume()
-            return reader.Token('AMPERSAND_AMPERSAND', '&&', self.position, self.line, self.column)
+            return reader.Token(TokenKind.AMPERSAND_AMPERSAND, '&&', self.position, self.line_index)
           elif self.current == '=':
             self.consume()
-            return reader.Token('AMPERSAND_EQUAL', '&=', self.position, self.line, self.column)
+            return reader.Token(TokenKind.AMPERSAND_EQUAL, '&=', self.position, self.line_index)
           else:
-            return reader.Token('AMPERSAND', '&', self.position, self.line, self.column)
+            return reader.Token(TokenKind.AMPERSAND, '&', self.position, self.line_index)
 
         case '>':
           self.consume()
@@ -210,82 +400,77 @@ class Lexer:
             self.consume()
             if self.current == '=':
               self.consume()
-              return reader.Token('GREATER_GREATER_EQUAL', '>>=', self.position, self.line, self.column)
+              return reader.Token(TokenKind.GREATER_GREATER_EQUAL, '>>=', self.position, self.line_index)
             else:
-              return reader.Token('GREATER_GREATER', '>>', self.position, self.line, self.column)
+              return reader.Token(TokenKind.GREATER_GREATER, '>>', self.position, self.line_index)
           elif self.current == '=':
             self.consume()
-            return reader.Token('GREATER_EQUAL', '>=', self.position, self.line, self.column)
+            return reader.Token(TokenKind.GREATER_EQUAL, '>=', self.position, self.line_index)
           else:
-            return reader.Token('GREATER', '>', self.position, self.line, self.column)
+            return reader.Token(TokenKind.GREATER, '>', self.position, self.line_index)
 
         case '<':
           self.consume()
           if self.current == '<':
             self.consume()
             if self.current == '=':
-              return reader.Token('LESS_LESS_EQUAL', '<<=', self.position, self.line, self.column)
+              self.consume()
+              return reader.Token(TokenKind.LESS_LESS_EQUAL, '<<=', self.position, self.line_index)
             else:
-              return reader.Token('LESS_LESS', '<<', self.position, self.line, self.column)
+              return reader.Token(TokenKind.LESS_LESS, '<<', self.position, self.line_index)
           elif self.current == '=':
             self.consume()
-            return reader.Token('LESS_EQUAL', '<=', self.position, self.line, self.column)
+            return reader.Token(TokenKind.LESS_EQUAL, '<=', self.position, self.line_index)
           else:
-            return reader.Token('LESS', '<', self.position, self.line, self.column)
+            return reader.Token(TokenKind.LESS, '<', self.position, self.line_index)
 
         case '+':
           self.consume()
           if self.current == '=':
             self.consume()
-            return reader.Token('PLUS_EQUAL', '+=', self.position, self.line, self.column)
+            return reader.Token(TokenKind.PLUS_EQUAL, '+=', self.position, self.line_index)
           else:
-            return reader.Token('PLUS', '+', self.position, self.line, self.column)
+            return reader.Token(TokenKind.PLUS, '+', self.position, self.line_index)
 
         case '-':
           self.consume()
           if self.current == '>':
             self.consume()
-            return reader.Token('MINUS_GREATER', '->', self.position, self.line, self.column)
+            return reader.Token(TokenKind.MINUS_GREATER, '->', self.position, self.line_index)
           elif self.current == '=':
             self.consume()
-            return reader.Token('MINUS_EQUAL', '-=', self.position, self.line, self.column)
+            return reader.Token(TokenKind.MINUS_EQUAL, '-=', self.position, self.line_index)
           else:
-            return reader.Token('MINUS', '-', self.position, self.line, self.column)
+            return reader.Token(TokenKind.MINUS, '-', self.position, self.line_index)
 
         case '*':
           self.consume()
           if self.current == '=':
             self.consume()
-            return reader.Token('ASTERISK_EQUAL', '*=', self.position, self.line, self.column)
+            return reader.Token(TokenKind.ASTERISK_EQUAL, '*=', self.position, self.line_index)
           else:
-            return reader.Token('ASTERISK', '*', self.position, self.line, self.column)
+            return reader.Token(TokenKind.ASTERISK, '*', self.position, self.line_index)
 
         case '/':
           self.consume()
           if self.current == '=':
             self.consume()
-            return reader.Token('SLASH_EQUAL', '/=', self.position, self.line, self.column)
+            return reader.Token(TokenKind.SLASH_EQUAL, '/=', self.position, self.line_index)
           elif self.current == '*':
             # Block comment
+            begin = self.position - 1
             self.consume()
             comment_done = False
             while not comment_done:
               while self.current != '*' and self.current != 'EOF':
-                if self.current == '\n':
-                  # Skip line feeds (LF)
-                  self.consume()
-                  self.line += 1
-                  self.column = 0
-                elif self.current == '\r':
+                if self.current == '\r':
                   # Skip carriage return + line feed (CR+LF) pairs
                   self.consume()
                   if self.current == '\n':
                     self.consume()
-                    self.line += 1
-                    self.column = 0
                   else:
                     # Found carriage return (CR) by itself, which is invalid
-                    print("error: invalid line ending")
+                    self.report(self.position - 1, "invalid line ending")
                 else:
                   self.consume()
               while self.current == '*':
@@ -295,7 +480,7 @@ class Lexer:
                 comment_done = True
               elif self.current == 'EOF':
                 # Error - comment not closed
-                print("error: comment not closed")
+                self.report(begin, "comment not closed")
                 comment_done = True
           elif self.current == '/':
             # Line comment
@@ -303,31 +488,31 @@ class Lexer:
             while self.current != '\n' and self.current != '\r' and self.current != 'EOF':
               self.consume()
           else:
-            return reader.Token('SLASH', '/', self.position, self.line, self.column)
+            return reader.Token(TokenKind.SLASH, '/', self.position, self.line_index)
 
         case '%':
           self.consume()
           if self.current == '=':
             self.consume()
-            return reader.Token('PERCENT_EQUAL', '%=', self.position, self.line, self.column)
+            return reader.Token(TokenKind.PERCENT_EQUAL, '%=', self.position, self.line_index)
           else:
-            return reader.Token('PERCENT', '%', self.position, self.line, self.column)
+            return reader.Token(TokenKind.PERCENT, '%', self.position, self.line_index)
 
         case '!':
           self.consume()
           if self.current == '=':
             self.consume()
-            return reader.Token('EXCLAMATION_EQUAL', '!=', self.position, self.line, self.column)
+            return reader.Token(TokenKind.EXCLAMATION_EQUAL, '!=', self.position, self.line_index)
           else:
-            return reader.Token('EXCLAMATION', '!', self.position, self.line, self.column)
+            return reader.Token(TokenKind.EXCLAMATION, '!', self.position, self.line_index)
 
         case '~':
           self.consume()
           if self.current == '=':
             self.consume()
-            return reader.Token('TILDE_EQUAL', '~=', self.position, self.line, self.column)
+            return reader.Token(TokenKind.TILDE_EQUAL, '~=', self.position, self.line_index)
           else:
-            return reader.Token('TILDE', '~', self.position, self.line, self.column)
+            return reader.Token(TokenKind.TILDE, '~', self.position, self.line_index)
 
         case '"':
           # String
@@ -339,10 +524,11 @@ class Lexer:
             self.consume()
             end = self.position
             value = self.input[begin:end]
-            return reader.Token('STRING_LITERAL', value, self.position, self.line, self.column)
+            return reader.Token(TokenKind.STRING_LITERAL, value, self.position, self.line_index)
           elif self.current == 'EOF':
             # Todo: Probably should pretend the terminator is there and return token
-            print("error: missing string terminator")
+            self.report(begin, "missing string terminator")
+            return reader.Token(TokenKind.ERROR, self.input[begin:self.position], self.position, self.line_index)
 
         case '\'':
           # Character
@@ -354,71 +540,72 @@ class Lexer:
             self.consume()
             end = self.position
             value = self.input[begin:end]
-            return reader.Token('CHARACTER_LITERAL', value, self.position, self.line, self.column)
+            return reader.Token(TokenKind.CHARACTER_LITERAL, value, self.position, self.line_index)
           elif self.current == 'EOF':
             # Todo: Probably should pretend the terminator is there and return token
-            print("error: missing character terminator")
+            self.report(begin, "missing character terminator")
+            return reader.Token(TokenKind.ERROR, self.input[begin:self.position], self.position, self.line_index)
 
         case ':':
           self.consume()
-          return reader.Token('COLON', ':', self.position, self.line, self.column)
+          return reader.Token(TokenKind.COLON, ':', self.position, self.line_index)
 
         case ';':
           self.consume()
-          return reader.Token('SEMICOLON', ';', self.position, self.line, self.column)
+          return reader.Token(TokenKind.SEMICOLON, ';', self.position, self.line_index)
 
         case '.':
           self.consume()
           if self.current == '.':
             self.consume()
-            return reader.Token('PERIOD_PERIOD', '..', self.position, self.line, self.column)
+            return reader.Token(TokenKind.PERIOD_PERIOD, '..', self.position, self.line_index)
           elif self.is_dec_digit(self.current):
-            return self.number() 
+            return self.literal(DECIMAL_REGEX, self.number)
           else:
-            return reader.Token('PERIOD', '.', self.position, self.line, self.column)
+            return reader.Token(TokenKind.PERIOD, '.', self.position, self.line_index)
 
         case ',':
           self.consume()
-          return reader.Token('COMMA', ',', self.position, self.line, self.column)
+          return reader.Token(TokenKind.COMMA, ',', self.position, self.line_index)
 
         case '{':
           self.consume()
-          return reader.Token('L_BRACE', '{', self.position, self.line, self.column)
+          return reader.Token(TokenKind.L_BRACE, '{', self.position, self.line_index)
 
         case '}':
           self.consume()
-          return reader.Token('R_BRACE', '}', self.position, self.line, self.column)
+          return reader.Token(TokenKind.R_BRACE, '}', self.position, self.line_index)
 
         case '[':
           self.consume()
-          return reader.Token('L_BRACKET', '[', self.position, self.line, self.column)
+          return reader.Token(TokenKind.L_BRACKET, '[', self.position, self.line_index)
 
         case ']':
           self.consume()
-          return reader.Token('R_BRACKET', ']', self.position, self.line, self.column)
+          return reader.Token(TokenKind.R_BRACKET, ']', self.position, self.line_index)
 
         case '(':
           self.consume()
-          return reader.Token('L_PARENTHESIS', '(', self.position, self.line, self.column)
+          return reader.Token(TokenKind.L_PARENTHESIS, '(', self.position, self.line_index)
 
         case ')':
           self.consume()
-          return reader.Token('R_PARENTHESIS', ')', self.position, self.line, self.column)
+          return reader.Token(TokenKind.R_PARENTHESIS, ')', self.position, self.line_index)
 
         case '0':
           self.consume()
           if self.current == 'b':
             self.backup()
-            return self.binary_integer()
+            return self.literal(BINARY_REGEX, self.binary_integer)
           elif self.current == 'o':
             self.backup()
-            return self.octal_integer()
+            return self.literal(OCTAL_REGEX, self.octal_integer)
           elif self.current == 'x':
             self.backup()
-            return self.hexadecimal_number()
+            return self.literal(HEXADECIMAL_REGEX, self.hexadecimal_number)
           else:
             self.backup()
-            return self.number()
+            return self.literal(DECIMAL_REGEX, self.number)
 
         case ' ' | '\t':
           # Skip spaces and tabs
@@ -429,8 +616,6 @@ class Lexer:
           # Skip line feeds (LF)
           while self.current == '\n':
             self.consume()
-            self.line += 1
-            self.column = 0
 
         case '\r':
           # Skip carriage return + line feed (CR+LF) pairs
@@ -438,32 +623,45 @@ class Lexer:
             self.consume()
             if self.current == '\n':
               self.consume()
-              self.line += 1
-              self.column = 0
             else:
-              # Should return an error token here maybe
               # Found carriage return (CR) by itself, which is invalid
-              print("error: invalid line ending")
+              self.report(self.position - 1, "invalid line ending")
 
         case _:
           if self.current.isalpha() or self.current == '_':
             begin = self.position
             self.consume()
             # Todo: The end should occur before the consume
-            while self.current.isalpha() or self.current.isdigit() or self.current == '_':
+            # Note: 'EOF' is alphabetic too, so check for it first
+            while self.current != 'EOF' and (self.current.isalpha() or self.current.isdigit() or self.current == '_'):
               self.consume()
             end = self.position
-            id = self.input[begin:end]
-            if id in keyword_lookup.keys():
-              return reader.Token(keyword_lookup[id], id, self.position, self.line, self.column)
-            else:
-              return reader.Token('IDENTIFIER', id, self.position, self.line, self.column)
+            id, kind = self.pool.classify(self.input[begin:end])
+            return reader.Token(kind, id, self.position, self.line_index)
           elif self.current.isdigit():
-            return self.number()
+            return self.literal(DECIMAL_REGEX, self.number)
           else:
-            print("ERROR")
+            return self.invalid_characters()
+
+    return reader.Token(TokenKind.EOF, '', self.position, self.line_index)
 
-    return reader.Token('EOF', '', self.position, self.line, self.column)
+  def literal (self, regex: re.Pattern, scan: Callable[[], reader.Token]) -> reader.Token:
+    # Fast path for numeric literals. A well-formed literal is matched
+    # as a whole, and its kind and value are decoded from its prefix
+    # and suffix (see NumberLiteral). Anything else is scanned by the
+    # state machine, which reports the error.
+    if self.data is self.input:
+      m = regex.match(self.input, self.position)
+    else:
+      m = BYTE_REGEXES[regex].match(self.data, self.position)
+    if m is None:
+      return scan()
+    end = m.end()
+    lexeme = self.input[self.position:end]
+    kind, value = decode_number(lexeme)
+    self.position = end
+    self.current = self.input[end] if end < len(self.input) else 'EOF'
+    return reader.Token(kind, lexeme, self.position, self.line_index, value)
 
   def binary_integer (self) -> reader.Token:
     # Note: We arrive at this function after lookahead or
@@ -493,19 +691,13 @@ class Lexer:
             self.consume()
             state = State.BIN_300
           else:
-            # Pretend we got an underscore or digit for error recovery purposes
-            self.error(f"invalid number: found '{self.current}', expected underscore or binary digit")
-            self.consume()
-            state = State.BIN_400
+            return self.invalid_number(begin, f"invalid number: found '{self.current}', expected underscore or binary digit")
         case State.BIN_300:
           if self.is_bin_digit(self.current):
             self.consume()
             state = State.BIN_400
           else:
-            # Pretend we got a digit for error recovery purposes
-            self.error(f"invalid number: found '{self.current}', expected binary digit")
-            self.consume()
-            state = State.BIN_400
+            return self.invalid_number(begin, f"invalid number: found '{self.current}', expected binary digit")
         case State.BIN_400:
           if self.is_bin_digit(self.current):
             self.consume()
@@ -522,7 +714,7 @@ class Lexer:
             # Accept
             end = self.position
             value = self.input[begin:end]
-            return reader.Token('BINARY_INT32_LITERAL', value, self.position, self.line, self.column)
+            return reader.Token(TokenKind.BINARY_INT32_LITERAL, value, self.position, self.line_index)
         case State.BIN_500:
           if self.is_bin_digit(self.current):
             self.consume()
@@ -534,10 +726,7 @@ class Lexer:
             self.consume()
             state = State.BIN_700            
           else:
-            # Pretend we got a digit for error recovery purposes
-            self.error(f"invalid number: found '{self.current}', expected binary digit")
-            self.consume()
-            state = State.BIN_400
+            return self.invalid_number(begin, f"invalid number: found '{self.current}', expected binary digit")
         case State.BIN_600:
           if self.current == 'u':
             self.consume()
@@ -546,7 +735,7 @@ class Lexer:
             # Accept
             end = self.position
             value = self.input[begin:end]
-            return reader.Token('BINARY_INT64_LITERAL', value, self.position, self.line, self.column)
+            return reader.Token(TokenKind.BINARY_INT64_LITERAL, value, self.position, self.line_index)
         case State.BIN_700:
           if self.current == 'L':
             self.consume()
@@ -555,15 +744,15 @@ class Lexer:
             # Accept
             end = self.position
             value = self.input[begin:end]
-            return reader.Token('BINARY_UINT32_LITERAL', value, self.position, self.line, self.column)
+            return reader.Token(TokenKind.BINARY_UINT32_LITERAL, value, self.position, self.line_index)
         case State.BIN_800:
             # Accept
             end = self.position
             value = self.input[begin:end]
-            return reader.Token('BINARY_UINT64_LITERAL', value, self.position, self.line, self.column)
+            return reader.Token(TokenKind.BINARY_UINT64_LITERAL, value, self.position, self.line_index)
         case _:
           # Invalid state. Can only be reached through a lexer bug.
-          print("error: Invalid state.")
+          return self.invalid_number(begin, "invalid state")
 
   def octal_integer (self) -> reader.Token:
     # Note: We arrive at this function after lookahead or
@@ -593,19 +782,13 @@ class Lexer:
             self.consume()
             state = State.OCT_300
           else:
-            # Pretend we got an underscore or digit for error recovery purposes
-            self.error(f"invalid number: found '{self.current}', expected underscore or octal digit")
-            self.consume()
-            state = State.OCT_400
+            return self.invalid_number(begin, f"invalid number: found '{self.current}', expected underscore or octal digit")
         case State.OCT_300:
           if self.is_oct_digit(self.current):
             self.consume()
             state = State.OCT_400
           else:
-            # Pretend we got a digit for error recovery purposes
-            self.error(f"invalid number: found '{self.current}', expected octal digit")
-            self.consume()
-            state = State.OCT_400
+            return self.invalid_number(begin, f"invalid number: found '{self.current}', expected octal digit")
         case State.OCT_400:
           if self.is_oct_digit(self.current):
             self.consume()
@@ -622,7 +805,7 @@ class Lexer:
             # Accept
             end = self.position
             value = self.input[begin:end]
-            return reader.Token('OCTAL_INT32_LITERAL', value, self.position, self.line, self.column)
+            return reader.Token(TokenKind.OCTAL_INT32_LITERAL, value, self.position, self.line_index)
         case State.OCT_500:
           if self.is_oct_digit(self.current):
             self.consume()
@@ -634,10 +817,7 @@ class Lexer:
             self.consume()
             state = State.OCT_700            
           else:
-            # Pretend we got a digit for error recovery purposes
-            self.error(f"invalid number: found '{self.current}', expected octal digit")
-            self.consume()
-            state = State.OCT_400
+            return self.invalid_number(begin, f"invalid number: found '{self.current}', expected octal digit")
         case State.OCT_600:
           if self.current == 'u':
             self.consume()
@@ -646,7 +826,7 @@ class Lexer:
             # Accept
             end = self.position
             value = self.input[begin:end]
-            return reader.Token('OCTAL_INT64_LITERAL', value, self.position, self.line, self.column)
+            return reader.Token(TokenKind.OCTAL_INT64_LITERAL, value, self.position, self.line_index)
         case State.OCT_700:
           if self.current == 'L':
             self.consume()
@@ -655,15 +835,15 @@ class Lexer:
             # Accept
             end = self.position
             value = self.input[begin:end]
-            return reader.Token('OCTAL_UINT32_LITERAL', value, self.position, self.line, self.column)
+            return reader.Token(TokenKind.OCTAL_UINT32_LITERAL, value, self.position, self.line_index)
         case State.OCT_800:
             # Accept
             end = self.position
             value = self.input[begin:end]
-            return reader.Token('OCTAL_UINT64', value, self.position, self.line, self.column)
+            return reader.Token(TokenKind.OCTAL_UINT64_LITERAL, value, self.position, self.line_index)
         case _:
           # Invalid state. Can only be reached through a lexer bug.
-          print("error: Invalid state.")
+          return self.invalid_number(begin, "invalid state")
 
   def hexadecimal_number (self) -> reader.Token:
     # This scans for a hexadecimal integer or floating point number.
@@ -694,19 +874,13 @@ class Lexer:
             self.consume()
             state = State.HEX_300
           else:
-            # Pretend we got a digit for error recovery purposes
-            self.error(f"invalid number: found '{self.current}', expected dot, underscore, or hexadecimal digit")
-            self.consume()
-            state = State.HEX_100
+            return self.invalid_number(begin, f"invalid number: found '{self.current}', expected dot, underscore, or hexadecimal digit")
         case State.HEX_30:
           if self.is_hex_digit(self.current):
             self.consume()
             state = State.HEX_100
           else:
-            # Pretend we got a digit for error recovery purposes
-            self.error(f"invalid number: found '{self.current}', expected hexadecimal digit")
-            self.consume()
-            state = State.HEX_100
+            return self.invalid_number(begin, f"invalid number: found '{self.current}', expected hexadecimal digit")
         case State.HEX_100:
           if self.is_hex_digit(self.current):
             self.consume()
@@ -729,7 +903,7 @@ class Lexer:
             # Accept
             end = self.position
             value = self.input[begin:end]
-            return reader.Token('HEXADECIMAL_INT32_LITERAL', value, self.position, self.line, self.column)
+            return reader.Token(TokenKind.HEXADECIMAL_INT32_LITERAL, value, self.position, self.line_index)
         case State.HEX_200:
           if self.is_hex_digit(self.current):
             self.consume()
@@ -744,10 +918,7 @@ class Lexer:
             self.consume()
             state = State.HEX_600
           else:
-            # Pretend we got a digit for error recovery purposes
-            self.error(f"invalid number: found '{self.current}', expected 'L', 'u', 'p', or hexadecimal digit")
-            self.consume()
-            state = State.HEX_100
+            return self.invalid_number(begin, f"invalid number: found '{self.current}', expected 'L', 'u', 'p', or hexadecimal digit")
         case State.HEX_210:
           if self.current == 'u':
             self.consume()
@@ -755,7 +926,7 @@ class Lexer:
           else:
             end = self.position
             value = self.input[begin:end]
-            return reader.Token('HEXADECIMAL_INT64_LITERAL', value, self.position, self.line, self.column)
+            return reader.Token(TokenKind.HEXADECIMAL_INT64_LITERAL, value, self.position, self.line_index)
         case State.HEX_220:
           if self.current == 'L':
             self.consume()
@@ -763,19 +934,17 @@ class Lexer:
           else:
             end = self.position
             value = self.input[begin:end]
-            return reader.Token('HEXADECIMAL_UINT32_LITERAL', value, self.position, self.line, self.column)
+            return reader.Token(TokenKind.HEXADECIMAL_UINT32_LITERAL, value, self.position, self.line_index)
         case State.HEX_230:
           end = self.position
           value = self.input[begin:end]
-          return reader.Token('HEXADECIMAL_UINT64_LITERAL', value, self.position, self.line, self.column)
+          return reader.Token(TokenKind.HEXADECIMAL_UINT64_LITERAL, value, self.position, self.line_index)
         case State.HEX_300:
           if self.is_hex_digit(self.current):
             self.consume()
             state = State.HEX_400
           else:
-            # Pretend we got a digit for error recovery purposes
-            self.error(f"invalid number: found '{self.current}', expected decimal digit")
-            self.consume()
+            return self.invalid_number(begin, f"invalid number: found '{self.current}', expected decimal digit")
         case State.HEX_400:
           if self.is_hex_digit(self.current):
             self.consume()
@@ -788,7 +957,7 @@ class Lexer:
           else:
             end = self.position
             value = self.input[begin:end]
-            return reader.Token('HEXADECIMAL_FLOAT64', value, self.position, self.line, self.column)
+            return reader.Token(TokenKind.HEXADECIMAL_FLOAT64, value, self.position, self.line_index)
         case State.HEX_500:
           if self.is_hex_digit(self.current):
             self.consume()
@@ -797,10 +966,7 @@ class Lexer:
             self.consume()
             state = State.HEX_600
           else:
-            # Pretend we got a digit for error recovery purposes
-            self.error(f"invalid number: found '{self.current}', expected 'p' or hexadecimal digit")
-            self.consume()
-            state = State.HEX_400
+            return self.invalid_number(begin, f"invalid number: found '{self.current}', expected 'p' or hexadecimal digit")
         case State.HEX_600:
           if self.is_dec_digit(self.current):
             self.consume()
@@ -809,19 +975,13 @@ class Lexer:
             self.consume()
             state = State.HEX_700
           else:
-            # Pretend we got a digit for error recovery purposes
-            self.error(f"invalid number: found '{self.current}', expected '+', '-', or decimal digit")
-            self.consume()
-            state = State.HEX_800
+            return self.invalid_number(begin, f"invalid number: found '{self.current}', expected '+', '-', or decimal digit")
         case State.HEX_700:
           if self.is_dec_digit(self.current):
             self.consume()
             state = State.HEX_800
           else:
-            # Pretend we got a digit for error recovery purposes
-            self.error(f"invalid number: found '{self.current}', expected decimal digit")
-            self.consume()
-            state = State.HEX_800
+            return self.invalid_number(begin, f"invalid number: found '{self.current}', expected decimal digit")
         case State.HEX_800:
           if self.is_dec_digit(self.current):
             self.consume()
@@ -834,15 +994,15 @@ class Lexer:
           else:
             end = self.position
             value = self.input[begin:end]
-            return reader.Token('HEXADECIMAL_FLOAT64', value, self.position, self.line, self.column)
+            return reader.Token(TokenKind.HEXADECIMAL_FLOAT64, value, self.position, self.line_index)
         case State.HEX_810:
           end = self.position
           value = self.input[begin:end]
-          return reader.Token('HEXADECIMAL_FLOAT64', value, self.position, self.line, self.column)
+          return reader.Token(TokenKind.HEXADECIMAL_FLOAT64, value, self.position, self.line_index)
         case State.HEX_820:
           end = self.position
           value = self.input[begin:end]
-          return reader.Token('HEXADECIMAL_FLOAT32', value, self.position, self.line, self.column)
+          return reader.Token(TokenKind.HEXADECIMAL_FLOAT32, value, self.position, self.line_index)
         case _:
           # Error - shouldn't be able to get here
           pass
@@ -891,7 +1051,7 @@ class Lexer:
           else:
             end = self.position
             value = self.input[begin:end]
-            return reader.Token('INT32_LITERAL', value, self.position, self.line, self.column)
+            return reader.Token(TokenKind.INT32_LITERAL, value, self.position, self.line_index)
         case State.NUM_200:
           if self.is_dec_digit(self.current):
             self.consume()
@@ -912,10 +1072,7 @@ class Lexer:
             self.consume()
             state = State.NUM_220
           else:
-            # Pretend we got a digit for error recovery purposes
-            self.error(f"invalid number: found '{self.current}', expected 'd', 'f', 'e', 'L', 'u', or decimal digit")
-            self.consume()
-            state = State.NUM_100
+            return self.invalid_number(begin, f"invalid number: found '{self.current}', expected 'd', 'f', 'e', 'L', 'u', or decimal digit")
         case State.NUM_210:
           if self.current == 'u':
             self.consume()
@@ -923,7 +1080,7 @@ class Lexer:
           else:
             end = self.position
             value = self.input[begin:end]
-            return reader.Token('INT64_LITERAL', value, self.position, self.line, self.column)
+            return reader.Token(TokenKind.INT64_LITERAL, value, self.position, self.line_index)
         case State.NUM_220:
           if self.current == 'L':
             self.consume()
@@ -931,19 +1088,17 @@ class Lexer:
           else:
             end = self.position
             value = self.input[begin:end]
-            return reader.Token('UINT32_LITERAL', value, self.position, self.line, self.column)
+            return reader.Token(TokenKind.UINT32_LITERAL, value, self.position, self.line_index)
         case State.NUM_230:
           end = self.position
           value = self.input[begin:end]
-          return reader.Token('UINT64_LITERAL', value, self.position, self.line, self.column)
+          return reader.Token(TokenKind.UINT64_LITERAL, value, self.position, self.line_index)
         case State.NUM_300:
           if self.is_dec_digit(self.current):
             self.consume()
             state = State.NUM_400
           else:
-            # Pretend we got a digit for error recovery purposes
-            self.error(f"invalid number: found '{self.current}', expected decimal digit")
-            self.consume()
+            return self.invalid_number(begin, f"invalid number: found '{self.current}', expected decimal digit")
         case State.NUM_400:
           if self.is_dec_digit(self.current):
             self.consume()
@@ -962,7 +1117,7 @@ class Lexer:
           else:
             end = self.position
             value = self.input[begin:end]
-            return reader.Token('FLOAT64_LITERAL', value, self.position, self.line, self.column)
+            return reader.Token(TokenKind.FLOAT64_LITERAL, value, self.position, self.line_index)
         case State.NUM_500:
           if self.is_dec_digit(self.current):
             self.consume()
@@ -977,10 +1132,7 @@ class Lexer:
             self.consume()
             state = State.NUM_820
           else:
-            # Pretend we got a digit for error recovery purposes
-            self.error(f"invalid number: found '{self.current}', expected decimal digit")
-            self.consume()
-            state = State.NUM_400
+            return self.invalid_number(begin, f"invalid number: found '{self.current}', expected decimal digit")
         case State.NUM_600:
           if self.is_dec_digit(self.current):
             self.consume()
@@ -989,19 +1141,13 @@ class Lexer:
             self.consume()
             state = State.NUM_700
           else:
-            # Pretend we got a digit for error recovery purposes
-            self.error(f"invalid number: found '{self.current}', expected '+', '-', or decimal digit")
-            self.consume()
-            state = State.NUM_800
+            return self.invalid_number(begin, f"invalid number: found '{self.current}', expected '+', '-', or decimal digit")
         case State.NUM_700:
           if self.is_dec_digit(self.current):
             self.consume()
             state = State.NUM_800
           else:
-            # Pretend we got a digit for error recovery purposes
-            self.error(f"invalid number: found '{self.current}', expected decimal digit")
-            self.consume()
-            state = State.NUM_800
+            return self.invalid_number(begin, f"invalid number: found '{self.current}', expected decimal digit")
         case State.NUM_800:
           if self.is_dec_digit(self.current):
             self.consume()
@@ -1014,15 +1160,15 @@ class Lexer:
           else:
             end = self.position
             value = self.input[begin:end]
-            return reader.Token('FLOAT64_LITERAL', value, self.position, self.line, self.column)
+            return reader.Token(TokenKind.FLOAT64_LITERAL, value, self.position, self.line_index)
         case State.NUM_810:
           end = self.position
           value = self.input[begin:end]
-          return reader.Token('FLOAT64_LITERAL', value, self.position, self.line, self.column)
+          return reader.Token(TokenKind.FLOAT64_LITERAL, value, self.position, self.line_index)
         case State.NUM_820:
           end = self.position
           value = self.input[begin:end]
-          return reader.Token('FLOAT32_LITERAL', value, self.position, self.line, self.column)
+          return reader.Token(TokenKind.FLOAT32_LITERAL, value, self.position, self.line_index)
         case _:
           # Error - shouldn't be able to get here
           pass
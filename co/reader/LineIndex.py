@@ -0,0 +1,89 @@
+import re
+from array import array
+from bisect import bisect_right
+from typing import Union
+
+# Purpose:
+
+# Offsets of the line starts in one source, found with a single bulk
+# scan for line feeds. Tokens only record their offsets; the line and
+# column of a token are looked up here, by binary search, when a
+# diagnostic needs them. The lexers therefore do not count lines and
+# columns as they scan.
+
+# Notes:
+#
+# 1. Lines are numbered from 1. Columns follow the lexers' original
+# convention: the column of a token is the number of characters from
+# the start of its line to just past its last character.
+#
+# 2. Every line feed starts a new line, including one inside a string
+# or character literal. (The character-at-a-time engine used to skip
+# those when counting.) A carriage return on its own does not.
+#
+# 3. The index accepts a string or the bytes behind a MappedSource.
+# Since mapped sources are ASCII, the offsets are the same either way.
+#
+# 4. An edit to the source updates the index in place (see edit()), so
+# that tokens already made with it stay valid. As in TokenBuffer, the
+# change in length is kept as a pending shift for the line starts past
+# the edit, and settle() applies it.
+
+NEWLINE = re.compile('\n')
+BYTE_NEWLINE = re.compile(b'\n')
+
+class LineIndex:
+
+  def __init__ (self, data: Union[str, bytes]):
+    # Offset of the first character of each line
+    self.starts = array('i', [0])
+    newline = NEWLINE if isinstance(data, str) else BYTE_NEWLINE
+    self.starts.extend(m.end() for m in newline.finditer(data))
+    # Entries from shift_index on are stored shift less than their
+    # offsets
+    self.shift_index = 0
+    self.shift = 0
+
+  def __len__ (self) -> int:
+    return len(self.starts)
+
+  def __repr__ (self):
+    return f"LineIndex({len(self.starts)} lines)"
+
+  def line (self, offset: int) -> int:
+    # Line holding the character at offset
+    starts = self.starts
+    split = self.shift_index
+    if split < len(starts) and offset >= starts[split] + self.shift:
+      return bisect_right(starts, offset - self.shift, split)
+    return bisect_right(starts, offset, 0, split)
+
+  def line_start (self, line: int) -> int:
+    return self.starts[line - 1] + (self.shift if line > self.shift_index else 0)
+
+  def extend (self, text: str, offset: int):
+    # Add the line starts in text, which follows the indexed source at
+    # offset (see StreamLexer)
+    self.starts.extend(offset + m.end() for m in NEWLINE.finditer(text))
+
+  def settle (self, index: int = None):
+    # Move the pending shift to start at index (by default, the end),
+    # rewriting the entries in between
+    if index is None:
+      index = len(self.starts)
+    if self.shift and index != self.shift_index:
+      low, high = sorted((index, self.shift_index))
+      amount = self.shift if index > self.shift_index else -self.shift
+      self.starts[low:high] = array('i', [offset + amount for offset in self.starts[low:high]])
+    self.shift_index = index
+
+  def edit (self, offset: int, removed: int, inserted: str):
+    # Replace the line starts within the removed text with those of the
+    # inserted text, and shift the ones after it
+    first = self.line(offset)
+    last = self.line(offset + removed)
+    self.settle(last)
+    added = array('i', (offset + m.end() for m in NEWLINE.finditer(inserted)))
+    self.starts[first:last] = added
+    self.shift_index = first + len(added)
+    self.shift += len(inserted) - removed
@@ -1,15 +1,44 @@
-from typing import List
+from typing import List, Optional, Set
 
-from co.reader import Message
+from co.reader.Message import Message
+
+# Purpose:
+
+# Queue of diagnostics, printed when the caller chooses rather than as
+# they are found.
+
+# Notes:
+#
+# 1. With a limit, messages past it are not queued, and with unique,
+# neither are messages of the same kind and text on the same line as
+# one already queued. Both are only counted, in dropped, so that a
+# pathological input costs constant time and space per message past
+# the first few.
 
 class Logger:
 
-  def __init__ (self):
+  def __init__ (self, limit: Optional[int] = None, unique: bool = False):
     self.queue: List[Message] = []
+    self.limit = limit
+    self.unique = unique
+    # Kind, text and line of each queued message, if unique
+    self.keys: Set[tuple] = set()
+    self.dropped = 0
 
   def add_message (self, message: Message):
+    if self.limit is not None and len(self.queue) >= self.limit:
+      self.dropped += 1
+      return
+    if self.unique:
+      key = (message.kind, message.text, message.line)
+      if key in self.keys:
+        self.dropped += 1
+        return
+      self.keys.add(key)
     self.queue.append(message)
 
   def print (self):
     for message in self.queue:
       print(f"{message.kind}({message.line}): {message.text}")
+    if self.dropped:
+      print(f"({self.dropped} more not shown)")
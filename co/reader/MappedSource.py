@@ -0,0 +1,55 @@
+import mmap
+import re
+from typing import Union
+
+# Purpose:
+
+# Source text backed by a memory-mapped file instead of a decoded
+# string. The lexers scan the mapped bytes directly (see data), and
+# everything else reads the text through indexing and slicing, which
+# decode just the characters asked for. Pages of the file are read in
+# by the operating system as they are scanned and can be dropped again
+# under memory pressure, so a large source is never held as a whole in
+# the process's own memory.
+
+# Notes:
+#
+# 1. Only ASCII files are mapped. Offsets into the bytes then equal
+# offsets into the text, so positions and columns are the same as for
+# the decoded string. Lexer.setInputFile decodes other files instead.
+#
+# 2. Line endings are left as they are in the file, as when a file is
+# opened with newline=''.
+
+NON_ASCII = re.compile(rb'[\x80-\xff]')
+
+class MappedSource:
+
+  def __init__ (self, data: Union[mmap.mmap, bytes]):
+    self.data = data
+
+  def __len__ (self) -> int:
+    return len(self.data)
+
+  def __getitem__ (self, index: Union[int, slice]) -> str:
+    if type(index) is slice:
+      return self.data[index].decode('ascii')
+    return chr(self.data[index])
+
+  def __repr__ (self):
+    return f"MappedSource({len(self.data)} bytes)"
+
+  @staticmethod
+  def open (path: str) -> Union['MappedSource', str]:
+    # Map the file, or decode it if it is not plain ASCII
+    with open(path, 'rb') as file:
+      try:
+        data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+      except ValueError:
+        # Empty files cannot be mapped
+        return ''
+    if NON_ASCII.search(data):
+      text = str(data, 'utf-8')
+      data.close()
+      return text
+    return MappedSource(data)
@@ -5,9 +5,16 @@ class Message:
     self.kind = kind
     # Information to be conveyed
     self.text = text
+    # Where it applies, if known
+    self.line = None
+    self.column = None
+    self.offset = None
 
   def set_column (self, column: int):
     self.column = column
 
   def set_line (self, line: int):
     self.line = line
+
+  def set_offset (self, offset: int):
+    self.offset = offset
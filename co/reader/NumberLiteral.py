@@ -0,0 +1,164 @@
+import re
+from typing import Optional, Tuple, Union
+
+from co.reader.TokenKind import TokenKind
+
+# Purpose:
+
+# Recognize, classify and decode numeric literals. Each pattern below
+# mirrors the accepting paths through the corresponding number state
+# machine in the Lexer, so that a well-formed literal is matched in one
+# call instead of one state transition per character. The kind of a
+# literal follows from its prefix and suffix by table lookup, and its
+# value is decoded once, when the token is made.
+
+# Notes:
+#
+# 1. The negative lookaheads reject any prefix after which the state
+# machine would have kept going into an error state. Such inputs do
+# not match, and are left to the state machines, which report them.
+#
+# 2. Digit separators ('_') are dropped before decoding.
+#
+# 3. A literal that does not decode (which can only happen for one
+# that went through error recovery) has the value None.
+
+DEC_DIGITS = r'[0-9](?:_?[0-9])*'
+HEX_DIGITS = r'[0-9A-Fa-f](?:_?[0-9A-Fa-f])*'
+DEC_EXPONENT = r'[+\-]?[0-9]+[df]?'
+
+BINARY_PATTERN = r'0b_?[01](?:_?[01])*(?:_?(?:Lu?|uL?)|(?![01_]))'
+
+OCTAL_PATTERN = r'0o_?[0-7](?:_?[0-7])*(?:_?(?:Lu?|uL?)|(?![0-7_]))'
+
+HEXADECIMAL_PATTERN = (
+  rf'0x(?:_?{HEX_DIGITS}(?:_?(?:Lu?|uL?)|_?p{DEC_EXPONENT}'
+  rf'|\.{HEX_DIGITS}(?:_?p{DEC_EXPONENT}|(?![0-9A-Fa-f_p]))'
+  rf'|(?![0-9A-Fa-f_.p]))'
+  rf'|\.{HEX_DIGITS}(?:_?p{DEC_EXPONENT}|(?![0-9A-Fa-f_p])))'
+)
+
+DECIMAL_PATTERN = (
+  rf'{DEC_DIGITS}(?:\.{DEC_DIGITS}(?:_?e{DEC_EXPONENT}|_?[df]|(?![0-9_edf]))'
+  rf'|_?(?:e{DEC_EXPONENT}|[df]|Lu?|uL?)'
+  rf'|(?![0-9_Lu.edf]))'
+)
+
+# Any numeric literal. A decimal literal cannot start with a prefix.
+
+NUMBER_PATTERN = (
+  f'{BINARY_PATTERN}|{OCTAL_PATTERN}|{HEXADECIMAL_PATTERN}'
+  f'|(?!0[box]){DECIMAL_PATTERN}'
+)
+
+BINARY_REGEX      = re.compile(BINARY_PATTERN)
+OCTAL_REGEX       = re.compile(OCTAL_PATTERN)
+HEXADECIMAL_REGEX = re.compile(HEXADECIMAL_PATTERN)
+DECIMAL_REGEX     = re.compile(DECIMAL_PATTERN)
+
+# The same patterns, for scanning mapped sources (see MappedSource)
+
+BYTE_REGEXES = {
+  regex: re.compile(regex.pattern.encode('ascii'))
+  for regex in (BINARY_REGEX, OCTAL_REGEX, HEXADECIMAL_REGEX, DECIMAL_REGEX)
+}
+
+RADIX = {
+  '0b': 2,
+  '0o': 8,
+  '0x': 16,
+  '':   10,
+}
+
+# Kinds keyed by prefix and then by suffix. Floating point literals are
+# keyed by '.' followed by their suffix, if any.
+
+NUMBER_KINDS = {
+  '0b': {
+    '':   TokenKind.BINARY_INT32_LITERAL,
+    'L':  TokenKind.BINARY_INT64_LITERAL,
+    'u':  TokenKind.BINARY_UINT32_LITERAL,
+    'Lu': TokenKind.BINARY_UINT64_LITERAL,
+    'uL': TokenKind.BINARY_UINT64_LITERAL,
+  },
+  '0o': {
+    '':   TokenKind.OCTAL_INT32_LITERAL,
+    'L':  TokenKind.OCTAL_INT64_LITERAL,
+    'u':  TokenKind.OCTAL_UINT32_LITERAL,
+    'Lu': TokenKind.OCTAL_UINT64_LITERAL,
+    'uL': TokenKind.OCTAL_UINT64_LITERAL,
+  },
+  '0x': {
+    '':   TokenKind.HEXADECIMAL_INT32_LITERAL,
+    'L':  TokenKind.HEXADECIMAL_INT64_LITERAL,
+    'u':  TokenKind.HEXADECIMAL_UINT32_LITERAL,
+    'Lu': TokenKind.HEXADECIMAL_UINT64_LITERAL,
+    'uL': TokenKind.HEXADECIMAL_UINT64_LITERAL,
+    '.':  TokenKind.HEXADECIMAL_FLOAT64,
+    '.d': TokenKind.HEXADECIMAL_FLOAT64,
+    '.f': TokenKind.HEXADECIMAL_FLOAT32,
+  },
+  '': {
+    '':   TokenKind.INT32_LITERAL,
+    'L':  TokenKind.INT64_LITERAL,
+    'u':  TokenKind.UINT32_LITERAL,
+    'Lu': TokenKind.UINT64_LITERAL,
+    'uL': TokenKind.UINT64_LITERAL,
+    '.':  TokenKind.FLOAT64_LITERAL,
+    '.d': TokenKind.FLOAT64_LITERAL,
+    '.f': TokenKind.FLOAT32_LITERAL,
+  },
+}
+
+NUMBER_KIND_SET = frozenset(
+  kind for kinds in NUMBER_KINDS.values() for kind in kinds.values()
+)
+
+def split_number (lexeme: str) -> Tuple[str, str, str]:
+  # Split a well-formed literal into its prefix, its digits (including
+  # any separators, fraction and exponent) and its suffix key
+  prefix = lexeme[:2]
+  last = lexeme[-1]
+  if prefix == '0x':
+    floating = '.' in lexeme or 'p' in lexeme
+    # Hexadecimal digits include 'd' and 'f', so these only act as a
+    # suffix after an exponent
+    suffixed = floating and (last == 'd' or last == 'f') and 'p' in lexeme
+  elif prefix == '0b' or prefix == '0o':
+    floating = False
+  else:
+    prefix = ''
+    suffixed = last == 'd' or last == 'f'
+    floating = suffixed or '.' in lexeme or 'e' in lexeme
+  if floating:
+    end = len(lexeme) - 1 if suffixed else len(lexeme)
+    return prefix, lexeme[len(prefix):end], '.' + lexeme[end:]
+  end = len(lexeme)
+  while last == 'L' or last == 'u':
+    end -= 1
+    last = lexeme[end - 1]
+  return prefix, lexeme[len(prefix):end], lexeme[end:]
+
+def number_kind (lexeme: str) -> TokenKind:
+  prefix, _, suffix = split_number(lexeme)
+  return NUMBER_KINDS[prefix][suffix]
+
+def number_value (lexeme: str) -> Optional[Union[int, float]]:
+  prefix, digits, suffix = split_number(lexeme)
+  digits = digits.replace('_', '')
+  try:
+    if suffix[:1] == '.':
+      return float.fromhex(digits) if prefix == '0x' else float(digits)
+    return int(digits, RADIX[prefix])
+  except ValueError:
+    return None
+
+def decode_number (lexeme: str) -> Tuple[TokenKind, Optional[Union[int, float]]]:
+  # Kind and value of a well-formed literal, splitting it only once
+  prefix, digits, suffix = split_number(lexeme)
+  digits = digits.replace('_', '')
+  if suffix[:1] == '.':
+    value = float.fromhex(digits) if prefix == '0x' else float(digits)
+  else:
+    value = int(digits, RADIX[prefix])
+  return NUMBER_KINDS[prefix][suffix], value
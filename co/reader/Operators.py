@@ -0,0 +1,47 @@
+from co.reader.TokenKind import TokenKind
+
+# Purpose:
+
+# Sets of operator token kinds, grouped by precedence level, shared by
+# the Parser, which selects productions with them, and the type
+# passes, which select conversion rules with them. They are built once
+# here instead of on every call.
+
+ASSIGNMENT_OPERATORS = frozenset([
+  TokenKind.EQUAL,
+  TokenKind.ASTERISK_EQUAL,
+  TokenKind.SLASH_EQUAL,
+  TokenKind.PERCENT_EQUAL,
+  TokenKind.PLUS_EQUAL,
+  TokenKind.MINUS_EQUAL,
+  TokenKind.LESS_LESS_EQUAL,
+  TokenKind.GREATER_GREATER_EQUAL,
+  TokenKind.AMPERSAND_EQUAL,
+  TokenKind.CARET_EQUAL,
+  TokenKind.BAR_EQUAL
+])
+
+BITWISE_OPERATORS = frozenset([TokenKind.AMPERSAND, TokenKind.CARET, TokenKind.BAR])
+
+EQUALITY_OPERATORS = frozenset([TokenKind.EQUAL_EQUAL, TokenKind.EXCLAMATION_EQUAL])
+
+RELATIONAL_OPERATORS = frozenset([
+  TokenKind.GREATER,
+  TokenKind.LESS,
+  TokenKind.GREATER_EQUAL,
+  TokenKind.LESS_EQUAL
+])
+
+SHIFT_OPERATORS = frozenset([TokenKind.GREATER_GREATER, TokenKind.LESS_LESS])
+
+ADDITIVE_OPERATORS = frozenset([TokenKind.PLUS, TokenKind.MINUS])
+
+MULTIPLICATIVE_OPERATORS = frozenset([TokenKind.ASTERISK, TokenKind.SLASH, TokenKind.PERCENT])
+
+# Need to add tilde
+UNARY_OPERATORS = frozenset([
+  TokenKind.ASTERISK,
+  TokenKind.MINUS,
+  TokenKind.PLUS,
+  TokenKind.EXCLAMATION
+])
@@ -0,0 +1,121 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+
+from co import ast
+from co.ast.AstCodec import encode_tree, decode_tree
+from co.reader import AstCache, BufferParser, LineIndex, StringPool, TableLexer, TokenCache
+from co.reader.Lexer import keyword_lookup
+
+# Purpose:
+
+# Parse a package: a directory of source files. Each file is lexed and
+# parsed into its own translation unit, in a pool of worker processes,
+# and the units are gathered under one Package node in the order of
+# their file names. Workers send their trees back in the compact form
+# of AstCodec, which is far smaller and quicker to rebuild than a
+# pickled graph of node and token objects.
+
+# Notes:
+#
+# 1. Source files are the files in the directory, not its
+# subdirectories, whose names end in one of the suffixes (by default
+# '.co'). Each translation unit gets the path of its file as its
+# 'path' attribute.
+#
+# 2. With one worker, or a single file, the files are parsed in this
+# process and no trees are encoded.
+#
+# 3. Decoded trees intern their identifiers in the parser's string
+# pool, so all the units share one string per name, as if a single
+# lexer had read them all.
+#
+# 4. With a cache directory, the trees of unchanged files are loaded
+# from an AST cache there (see AstCache) instead of being parsed. A
+# worker sends a cached tree back as it was stored, without decoding
+# it. Files that do need parsing load their token buffers from a token
+# cache in the same directory, if they are there (see TokenCache).
+#
+# 5. A file with lexical or syntax errors raises an exception that
+# lists all of them, in process(). So does a worker that fails for any
+# other reason.
+
+class PackageParser:
+
+  def __init__ (self, directory: str, workers: Optional[int] = None, suffixes: Tuple[str, ...] = ('.co',), cache_directory: Optional[str] = None):
+    self.directory = directory
+    # Worker processes; by default, one per processor
+    self.workers = workers if workers is not None else os.cpu_count() or 1
+    self.suffixes = suffixes
+    self.cache_directory = cache_directory
+    self.pool = StringPool(keyword_lookup)
+
+  def __repr__ (self):
+    return f"PackageParser({self.directory!r}, {self.workers} workers)"
+
+  def sources (self) -> List[str]:
+    paths = []
+    for entry in os.scandir(self.directory):
+      if entry.is_file() and entry.name.endswith(self.suffixes):
+        paths.append(entry.path)
+    return sorted(paths)
+
+  def process (self) -> ast.AstNode:
+    paths = self.sources()
+    if self.workers <= 1 or len(paths) <= 1:
+      units = [load_source(path, self.cache_directory, self.pool) for path in paths]
+    else:
+      # Several files per task, to spread the cost of sending tasks
+      chunk_size = max(1, len(paths) // (4 * self.workers))
+      with ProcessPoolExecutor(max_workers=self.workers) as executor:
+        encoded = executor.map(encode_source, paths, [self.cache_directory] * len(paths), chunksize=chunk_size)
+        units = [decode_tree(data, self.pool) for data in encoded]
+    n = ast.AstNode('Package')
+    for path, unit in zip(paths, units):
+      unit.set_attribute('path', path)
+      n.add_child(unit)
+    return n
+
+def parse_source (path: str, cache_directory: Optional[str], pool: Optional[StringPool] = None) -> Tuple[ast.AstNode, LineIndex]:
+  lexer = TableLexer()
+  if pool is not None:
+    lexer.pool = pool
+  if cache_directory is not None:
+    lexer.cache = TokenCache(cache_directory)
+  lexer.setInputFile(path)
+  parser = BufferParser(lexer.tokenize_all())
+  root = parser.process()
+  messages = lexer.logger.queue + parser.logger.queue
+  if messages:
+    raise Exception('\n'.join(f"{path}({message.line}): {message.text}" for message in messages))
+  return root, lexer.line_index
+
+def load_source (path: str, cache_directory: Optional[str], pool: Optional[StringPool] = None) -> ast.AstNode:
+  # Tree of the file at path, from the AST cache if it holds the file as
+  # it is now, else parsed, and then stored in the cache
+  if cache_directory is None:
+    return parse_source(path, None, pool)[0]
+  cache = AstCache(cache_directory)
+  key = cache.key(read_source(path))
+  data = cache.load(key)
+  if data is not None:
+    return decode_tree(data, pool)
+  root, line_index = parse_source(path, cache_directory, pool)
+  cache.store(key, encode_tree(root, line_index))
+  return root
+
+def encode_source (path: str, cache_directory: Optional[str]) -> bytes:
+  # Runs in a worker process
+  if cache_directory is None:
+    return encode_tree(*parse_source(path, None))
+  cache = AstCache(cache_directory)
+  key = cache.key(read_source(path))
+  data = cache.load(key)
+  if data is None:
+    data = encode_tree(*parse_source(path, cache_directory))
+    cache.store(key, data)
+  return data
+
+def read_source (path: str) -> bytes:
+  with open(path, 'rb') as file:
+    return file.read()
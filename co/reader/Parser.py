@@ -1,39 +1,211 @@
 from enum import Enum
-from typing import List
+from typing import Iterable, List, Union
 from collections import deque
 
 from co import ast
 from co.reader import Token
 from co.reader import Lexer
+from co.reader.Logger import Logger
+from co.reader.Message import Message
+from co.reader.TokenKind import TokenKind
+from co.reader.Operators import ASSIGNMENT_OPERATORS, EQUALITY_OPERATORS, RELATIONAL_OPERATORS
+from co.reader.Operators import SHIFT_OPERATORS, ADDITIVE_OPERATORS, MULTIPLICATIVE_OPERATORS
+from co.reader.Operators import UNARY_OPERATORS
 from co import st
 
+# FIRST sets
+
+# Lookahead sets that select between productions, built once here
+# instead of on every call.
+
+# To do: 'this' belongs in the expression first sets once it becomes a
+# keyword. The lexer has no token kind for it yet.
+
+EXPRESSION_STATEMENT_FIRST_SET = frozenset([
+  TokenKind.IDENTIFIER,
+  TokenKind.NULL,
+  TokenKind.FALSE,
+  TokenKind.TRUE,
+  TokenKind.INT32_LITERAL,
+  TokenKind.INT64_LITERAL,
+  TokenKind.UINT32_LITERAL,
+  TokenKind.UINT64_LITERAL,
+  TokenKind.FLOAT32_LITERAL,
+  TokenKind.FLOAT64_LITERAL
+])
+
+DECLARATION_STATEMENT_FIRST_SET = frozenset([TokenKind.VAL, TokenKind.VAR])
+
+DECLARATION_FIRST_SET = frozenset([
+  TokenKind.CLASS,
+  TokenKind.CONST,
+  TokenKind.DEF,
+  TokenKind.STRUCT,
+  TokenKind.TYPEALIAS,
+  TokenKind.UNION,
+  TokenKind.VAL,
+  TokenKind.VAR
+])
+
+LITERAL_FIRST_SET = frozenset([
+  TokenKind.NULL,
+  TokenKind.FALSE,
+  TokenKind.TRUE,
+  TokenKind.FLOAT32_LITERAL,
+  TokenKind.FLOAT64_LITERAL,
+  TokenKind.INT32_LITERAL,
+  TokenKind.INT64_LITERAL,
+  TokenKind.UINT32_LITERAL,
+  TokenKind.UINT64_LITERAL,
+  TokenKind.STRING_LITERAL
+])
+
+POSTFIX_FIRST_SET = frozenset([
+  TokenKind.L_PARENTHESIS,
+  TokenKind.L_BRACKET,
+  TokenKind.MINUS_GREATER,
+  TokenKind.PERIOD
+])
+
+# To do: void might not be a primitive type - verify
+PRIMITIVE_TYPE_FIRST_SET = frozenset([
+  TokenKind.NULL_T,
+  TokenKind.BOOL,
+  TokenKind.INT8,
+  TokenKind.INT16,
+  TokenKind.INT32,
+  TokenKind.INT64,
+  TokenKind.UINT8,
+  TokenKind.UINT16,
+  TokenKind.UINT32,
+  TokenKind.UINT64,
+  TokenKind.FLOAT32,
+  TokenKind.FLOAT64,
+  TokenKind.VOID
+])
+
+# Binary operators
+
+# Operator table for the precedence climbing expression parser. Each
+# row gives a binding power, an associativity, the kind of AST node to
+# build and the tokens that spell the operator. Higher powers bind
+# more tightly. The rows follow the levels of the recursive descent
+# cascade that came before it, from assignment down to multiplication,
+# so both produce the same trees. The cascade is kept as a baseline in
+# bench/expression_parser.py.
+
+# Note: The cascade treats assignment as left associative, so the table
+# does too.
+
+class Associativity (Enum):
+  LEFT  = 0
+  RIGHT = 1
+
+BINARY_OPERATOR_TABLE = [
+  (1,  Associativity.LEFT, 'BinaryExpression', ASSIGNMENT_OPERATORS),
+  (2,  Associativity.LEFT, 'BinaryExpression', [TokenKind.OR]),
+  (3,  Associativity.LEFT, 'BinaryExpression', [TokenKind.AND]),
+  (4,  Associativity.LEFT, 'BinaryExpression', [TokenKind.BAR]),
+  (5,  Associativity.LEFT, 'BinaryExpression', [TokenKind.CARET]),
+  (6,  Associativity.LEFT, 'BinaryExpression', [TokenKind.AMPERSAND]),
+  (7,  Associativity.LEFT, 'BinaryExpression', EQUALITY_OPERATORS),
+  (8,  Associativity.LEFT, 'BinaryExpression', RELATIONAL_OPERATORS),
+  (9,  Associativity.LEFT, 'BinaryExpression', SHIFT_OPERATORS),
+  (10, Associativity.LEFT, 'BinaryExpression', ADDITIVE_OPERATORS),
+  (11, Associativity.LEFT, 'BinaryExpression', MULTIPLICATIVE_OPERATORS),
+]
+
+# Tokens that may come before the operand of an expression: prefix
+# operators and open parentheses
+PREFIX_FIRST_SET = UNARY_OPERATORS | frozenset([TokenKind.L_PARENTHESIS])
+
+# Entries on the operator stack of Parser.expression() other than
+# binary operators: a prefix operator waiting for its operand, and an
+# open parenthesis
+UNARY_ENTRY = -1
+GROUP_ENTRY = (0, None)
+
+# Lookup from token kind to (binding power, binding power required of
+# operators in the right operand, node kind). A left associative
+# operator requires its right operand to bind more tightly than itself.
+
+BINARY_OPERATORS = {
+  kind: (power, power + 1 if associativity == Associativity.LEFT else power, node_kind)
+  for power, associativity, node_kind, kinds in BINARY_OPERATOR_TABLE
+  for kind in kinds
+}
+
+# ERROR RECOVERY
+
+# Syntax errors are queued in the parser's logger, and parsing goes on
+# in panic mode: the production that found the error raises ParseError,
+# which unwinds to the declaration or statement being parsed. That is
+# replaced by an Error node, and tokens are skipped up to one that a
+# declaration or statement can follow or start with:
+#
+#   ;             consumed, ending the skip
+#   }             left to close the enclosing block, or skipped if at
+#                 the top level, where no block is open
+#   declaration   keyword, left to start the next declaration
+#
+# A group in braces met while skipping is skipped whole, and ends the
+# skip, so that an error in the header of a function or of an if
+# statement skips its body too. Every token is skipped at most once,
+# so a source with many errors is still parsed in one linear pass.
+
+# Notes:
+#
+# 1. ERROR tokens, made by the lexer from malformed input, have been
+# reported by the lexer already. The parser recovers from them without
+# reporting them again. Nor does it report a second error at the token
+# of the last one.
+#
+# 2. A declaration or statement cut short by an error is dropped
+# whole. Passes see only complete nodes and Error nodes, which they
+# ignore. Callers should still check the logger before running passes.
+
+class ParseError (Exception):
+  pass
+
 class Parser:
 
-  def __init__ (self, input: Lexer):
+  # Whether to skip function bodies and build them on demand. Only a
+  # BufferParser can go back to the tokens of a body it skipped.
+  lazy: bool = False
+
+  def __init__ (self, input: Union[Lexer, Iterable[Token]]):
+    # A lexer, or any token iterator that yields EOF tokens once the
+    # input is exhausted, such as a StreamLexer
     self.input: Lexer = input
+    # Syntax errors, for the caller to print or inspect
+    self.logger = Logger()
+    # Where the last syntax error was found
+    self.error_mark = None
     self.k: int = 3
     self.p: int = 0
+    self.prime()
+
+  def prime (self):
     # Create and prime lookahead buffer for LL(k) parser
     # To do: We are assuming there is at least k tokens available.
     # What if that is not the case?
+    self.next_token = self.input.getToken if isinstance(self.input, Lexer) else iter(self.input).__next__
     self.buffer: list[Token] = []
     for i in range(self.k):
-      t = self.input.getToken()
+      t = self.next_token()
       self.buffer.append(t)
     self.lookahead = self.peekahead(0)
     # Old, remove once predictive parser works
     # self.lookahead: Token = self.input.getToken()
 
-  def match (self, kind: str):
+  def match (self, kind: TokenKind):
     if self.lookahead.kind == kind:
       self.consume()
     else:
-      msg = f"Invalid token. Expected {kind}, got {self.lookahead.kind}."
-      # Should this really be an exception, or should we do sync recovery?
-      raise Exception(msg)
+      self.error(kind.name)
 
   def consume (self):
-    self.buffer[self.p] = self.input.getToken()
+    self.buffer[self.p] = self.next_token()
     self.p = (self.p + 1) % self.k
     self.lookahead = self.peekahead(0)
     # Old, remove once predictive parser works
@@ -42,8 +214,78 @@ class Parser:
   def peekahead (self, index: int):
     return self.buffer[(self.p + index) % self.k]
 
-  def process (self):
+  def token (self) -> Token:
+    # Lookahead token, for attaching to a node
+    return self.lookahead
+
+  def mark (self):
+    # Something that changes whenever a token is consumed
+    return self.lookahead
+
+  def error (self, expected: str):
+    # Only the first of the errors found at one token is reported. The
+    # others follow from it, e.g. a block cut short by the end of the
+    # input, right after the statement in it.
+    mark = self.mark()
+    if mark != self.error_mark:
+      self.error_mark = mark
+      token = self.token()
+      if token.kind != TokenKind.ERROR:
+        self.report(f"Invalid token. Expected {expected}, got {token.kind.name}.", token)
+    raise ParseError()
+
+  def report (self, text: str, token: Token):
+    # Located at the start of the token, as lexical errors are
+    offset = token.position - len(token.lexeme)
+    line = token.line
+    message = Message('error', text)
+    message.set_line(line)
+    message.set_column(offset - token.line_index.line_start(line))
+    message.set_offset(offset)
+    self.logger.add_message(message)
+
+  def synchronize (self, start, top: bool) -> ast.AstNode:
+    # Skip ahead after an error in the declaration (if top) or the
+    # statement that began at start, and return the Error node that
+    # stands in for it
+    n = ast.AstNode('Error')
+    n.set_token(self.token())
+    kind = self.lookahead.kind
+    if self.mark() == start and kind in DECLARATION_FIRST_SET:
+      # Failed at its first token, which must go, or parsing would
+      # start over there
+      self.consume()
+      kind = self.lookahead.kind
+    depth = 0
+    while kind != TokenKind.EOF:
+      if kind == TokenKind.L_BRACE:
+        depth += 1
+      elif kind == TokenKind.R_BRACE:
+        if depth == 0:
+          if top:
+            self.consume()
+          break
+        depth -= 1
+        if depth == 0:
+          self.consume()
+          break
+      elif depth == 0:
+        if kind == TokenKind.SEMICOLON:
+          self.consume()
+          break
+        if kind in DECLARATION_FIRST_SET:
+          break
+      self.consume()
+      kind = self.lookahead.kind
+    return n
+
+  def process (self, index: bool = False) -> ast.AstNode:
     n = self.translationUnit()
+    # Optionally index the nodes by kind, so that passes interested in
+    # only a few kinds need not search the whole tree. The index covers
+    # the whole tree, so it builds any bodies skipped by lazy parsing.
+    if index:
+      n.set_attribute('node_index', ast.NodeIndex(n))
     return n
 
   # BEGIN
@@ -58,18 +300,26 @@ class Parser:
     # possible. A package will just be a directory full of source
     # files. The name of the package is the directory name in which
     # the source file(s) are located.
-    if self.lookahead.kind == 'PACKAGE':
-      n.add_child(self.packageClause())
-    while self.lookahead.kind != 'EOF':
-      n.add_child(self.declaration())
+    if self.lookahead.kind == TokenKind.PACKAGE:
+      start = self.mark()
+      try:
+        n.add_child(self.packageClause())
+      except ParseError:
+        n.add_child(self.synchronize(start, True))
+    while self.lookahead.kind != TokenKind.EOF:
+      start = self.mark()
+      try:
+        n.add_child(self.declaration())
+      except ParseError:
+        n.add_child(self.synchronize(start, True))
     return n
 
   def packageClause (self) -> ast.AstNode:
     n = ast.AstNode('PackageClause')
-    self.match('PACKAGE')
+    self.match(TokenKind.PACKAGE)
     # For now, ignore any package name nesting
     n.add_child(self.name())
-    self.match('SEMICOLON')
+    self.match(TokenKind.SEMICOLON)
     return n
 
   # DECLARATIONS
@@ -83,27 +333,26 @@ class Parser:
     # if self.lookahead.kind in [ 'PRIVATE', 'PUBLIC', 'STATIC' ]:
     #   p = self.modifierList()
     match self.lookahead.kind:
-      case 'CLASS':
+      case TokenKind.CLASS:
         n = self.classDeclaration()
-      case 'CONST':
+      case TokenKind.CONST:
         n = self.constantDeclaration()
-      case 'DEF':
+      case TokenKind.DEF:
         n = self.functionDeclaration()
-      case 'STRUCT':
+      case TokenKind.STRUCT:
         n = self.structureDeclaration()
-      case 'TYPEALIAS':
+      case TokenKind.TYPEALIAS:
         n = self.typealiasDeclaration()
-      case 'UNION':
+      case TokenKind.UNION:
         n = self.unionDeclaration()
-      case 'VAL':
+      case TokenKind.VAL:
         n = self.variableDeclarationFinal()
-        n.set_attribute('is_global', True)
-      case 'VAR':
+        n.is_global = True
+      case TokenKind.VAR:
         n = self.variableDeclaration()
-        n.set_attribute('is_global', True)
+        n.is_global = True
       case _:
-        # Replace with exception
-        print("error: invalid declaration" + self.lookahead.kind)
+        self.error('a declaration')
     return n
 
   # def modifierList (self) -> ast.AstNode:
@@ -113,71 +362,74 @@ class Parser:
 
   def classDeclaration (self) -> ast.AstNode:
     n = ast.AstNode('ClassDeclaration')
-    self.match('CLASS')
+    self.match(TokenKind.CLASS)
     n.add_child(self.name())
-    self.match('L_BRACE')
-    while self.lookahead.kind != 'R_BRACE':
-      n.add_child(self.classMember())
-    self.match('R_BRACE')
+    self.match(TokenKind.L_BRACE)
+    while self.lookahead.kind != TokenKind.R_BRACE and self.lookahead.kind != TokenKind.EOF:
+      start = self.mark()
+      try:
+        n.add_child(self.classMember())
+      except ParseError:
+        n.add_child(self.synchronize(start, False))
+    self.match(TokenKind.R_BRACE)
     return n
 
   def classMember (self) -> ast.AstNode:
-    pass
+    # Class members are not supported yet
+    self.error('R_BRACE')
     # match self.lookahead.kind:
-    #   case 'DEF':
+    #   case TokenKind.DEF:
     #     n = self.methodDeclaration()
-    #   case 'VAL':
+    #   case TokenKind.VAL:
     #     n = self.memberVariableDeclaration()
-    #   case 'VAR':
+    #   case TokenKind.VAR:
     #     n = self.memberConstantDeclaration()
     #   case _:
     #     pass
     # return n
 
   def constantDeclaration (self) -> ast.AstNode:
-    self.match('CONST')
+    self.match(TokenKind.CONST)
     match self.lookahead.kind:
-      case 'DEF':
-        n = self.functionDeclarationConstant()
-      case 'VAL':
+      case TokenKind.DEF:
+        # Constant functions are not supported yet
+        self.error('VAL or VAR')
+      case TokenKind.VAL:
         n = self.variableDeclarationConstant()
-        n.set_attribute('is_global', True)
-      case 'VAR':
+        n.is_global = True
+      case TokenKind.VAR:
         n = self.variableDeclarationConstant()
-        n.set_attribute('is_global', True)
+        n.is_global = True
       case _:
-        # How to handle this... create error node? Enter panic mode
-        # and look for synchronizing token?
-        print("error: No match in constant declaration")
-        n = None
+        self.error('VAL or VAR')
     return n
 
   def variableDeclarationConstant (self) -> ast.AstNode:
     n = ast.AstNode('VariableDeclaration')
     # Do we need to set tokens on every node?
-    # n.set_token(self.lookahead)
+    # n.set_token(self.token())
     # We might only allow constant objects to be vals in the future.
     # For now, allow val or var.
-    if self.lookahead.kind == 'VAL':
-      self.match('VAL')
+    if self.lookahead.kind == TokenKind.VAL:
+      self.match(TokenKind.VAL)
     else:
-      self.match('VAR')
-    n.set_attribute('is_constant', True)
+      self.match(TokenKind.VAR)
+    n.is_constant = True
     n.add_child(self.name())
     # Optional type specifier
     # In rust, const declaration requires the type specifier.
-    if self.lookahead.kind == 'COLON':
-      self.match('COLON')
+    if self.lookahead.kind == TokenKind.COLON:
+      self.match(TokenKind.COLON)
       n.add_child(self.typeRoot())
     else:
       n.add_child(self.typeRootEmpty())
     # Required initializer
-    if self.lookahead.kind == 'EQUAL':
-      self.match('EQUAL')
+    if self.lookahead.kind == TokenKind.EQUAL:
+      self.match(TokenKind.EQUAL)
       n.add_child(self.expressionRoot())
     else:
-      print("Error - missing initializer in constant variable definition")
-    self.match('SEMICOLON')
+      self.report("Missing initializer in constant variable definition", self.token())
+    self.match(TokenKind.SEMICOLON)
     return n
 
   # Unlike java, final variables must be initialized at the time of
@@ -185,59 +437,59 @@ class Parser:
 
   def variableDeclarationFinal (self) -> ast.AstNode:
     n = ast.AstNode('VariableDeclaration')
-    self.match('VAL')
-    n.set_attribute('is_final', True)
-    if self.lookahead.kind == 'IDENTIFIER':
+    self.match(TokenKind.VAL)
+    n.is_final = True
+    if self.lookahead.kind == TokenKind.IDENTIFIER:
       n.add_child(self.name())
     else:
-      self.error('IDENTIFIER')
+      self.error(TokenKind.IDENTIFIER.name)
     # Optional type specifier
-    if self.lookahead.kind == 'COLON':
-      self.match('COLON')
+    if self.lookahead.kind == TokenKind.COLON:
+      self.match(TokenKind.COLON)
       n.add_child(self.typeRoot())
     else:
       n.add_child(self.typeRootEmpty())
     # Required initializer
-    if self.lookahead.kind == 'EQUAL':
-      self.match('EQUAL')
+    if self.lookahead.kind == TokenKind.EQUAL:
+      self.match(TokenKind.EQUAL)
       n.add_child(self.expressionRoot())
     else:
-      print("Error - missing initializer in final variable definition")
-    self.match('SEMICOLON')
+      self.report("Missing initializer in final variable definition", self.token())
+    self.match(TokenKind.SEMICOLON)
     return n
 
   def variableDeclaration (self) -> ast.AstNode:
     n = ast.AstNode('VariableDeclaration')
-    self.match('VAR')
-    n.set_attribute('is_constant', False)
-    n.set_attribute('is_final', False)
-    if self.lookahead.kind == 'IDENTIFIER':
+    self.match(TokenKind.VAR)
+    n.is_constant = False
+    n.is_final = False
+    if self.lookahead.kind == TokenKind.IDENTIFIER:
       n.add_child(self.name())
     else:
-      self.error('IDENTIFIER')
+      self.error(TokenKind.IDENTIFIER.name)
     # Optional type specifier
-    if self.lookahead.kind == 'COLON':
-      self.match('COLON')
+    if self.lookahead.kind == TokenKind.COLON:
+      self.match(TokenKind.COLON)
       n.add_child(self.typeRoot())
     else:
       n.add_child(self.typeRootEmpty())
     # Optional initializer
-    if self.lookahead.kind == 'EQUAL':
-      self.match('EQUAL')
+    if self.lookahead.kind == TokenKind.EQUAL:
+      self.match(TokenKind.EQUAL)
       n.add_child(self.expressionRoot())
-    self.match('SEMICOLON')
+    self.match(TokenKind.SEMICOLON)
     return n
 
   def functionDeclaration (self) -> ast.AstNode:
     n = ast.AstNode('FunctionDeclaration')
-    self.match('DEF')
-    if self.lookahead.kind == 'IDENTIFIER':
+    self.match(TokenKind.DEF)
+    if self.lookahead.kind == TokenKind.IDENTIFIER:
       n.add_child(self.name())
     else:
-      self.error('ID')
+      self.error(TokenKind.IDENTIFIER.name)
     n.add_child(self.parameterList())
-    if self.lookahead.kind == 'MINUS_GREATER':
-      self.match('MINUS_GREATER')
+    if self.lookahead.kind == TokenKind.MINUS_GREATER:
+      self.match(TokenKind.MINUS_GREATER)
       n.add_child(self.typeRoot())
     else:
       # To do: Need to add a type root parent
@@ -248,26 +500,28 @@ class Parser:
 
   def parameterList (self) -> ast.AstNode:
     n = ast.AstNode('ParameterList')
-    self.match('L_PARENTHESIS')
-    if self.lookahead.kind != 'R_PARENTHESIS':
+    self.match(TokenKind.L_PARENTHESIS)
+    if self.lookahead.kind != TokenKind.R_PARENTHESIS:
       n.add_child(self.parameter())
-      while self.lookahead.kind == 'COMMA':
-        self.match('COMMA')
+      while self.lookahead.kind == TokenKind.COMMA:
+        self.match(TokenKind.COMMA)
         n.add_child(self.parameter())
-    self.match('R_PARENTHESIS')
+    self.match(TokenKind.R_PARENTHESIS)
     return n
 
   def parameter (self) -> ast.AstNode:
     n = ast.AstNode('Parameter')
     n.add_child(self.name())
-    self.match('COLON')
+    self.match(TokenKind.COLON)
     n.add_child(self.typeRoot())
     return n
 
   def functionBody (self) -> ast.AstNode:
+    if self.lazy and self.lookahead.kind == TokenKind.L_BRACE:
+      return self.lazyFunctionBody()
     n = ast.AstNode('FunctionBody')
-    if self.lookahead.kind == 'SEMICOLON':
-      self.match('SEMICOLON')
+    if self.lookahead.kind == TokenKind.SEMICOLON:
+      self.match(TokenKind.SEMICOLON)
     else:
       n.add_child(self.topBlock())
     return n
@@ -278,22 +532,30 @@ class Parser:
 
   def topBlock (self) -> ast.AstNode:
     n = ast.AstNode('TopBlock')
-    self.match('L_BRACE')
-    while self.lookahead.kind != 'R_BRACE':
+    self.match(TokenKind.L_BRACE)
+    while self.lookahead.kind != TokenKind.R_BRACE and self.lookahead.kind != TokenKind.EOF:
       # Blocks only contain statements? If so, then we can get rid of
       # blockElement
-      n.add_child(self.blockElement())
-    self.match('R_BRACE')
+      start = self.mark()
+      try:
+        n.add_child(self.blockElement())
+      except ParseError:
+        n.add_child(self.synchronize(start, False))
+    self.match(TokenKind.R_BRACE)
     return n
 
   def block (self) -> ast.AstNode:
     n = ast.AstNode('Block')
-    self.match('L_BRACE')
-    while self.lookahead.kind != 'R_BRACE':
+    self.match(TokenKind.L_BRACE)
+    while self.lookahead.kind != TokenKind.R_BRACE and self.lookahead.kind != TokenKind.EOF:
       # Blocks only contain statements? If so, then we can get rid of
       # blockElement
-      n.add_child(self.blockElement())
-    self.match('R_BRACE')
+      start = self.mark()
+      try:
+        n.add_child(self.blockElement())
+      except ParseError:
+        n.add_child(self.synchronize(start, False))
+    self.match(TokenKind.R_BRACE)
     return n
 
   def blockElement (self) -> ast.AstNode:
@@ -305,130 +567,116 @@ class Parser:
   # symbol table entry. Or do we just handle that in another pass?
   def name (self) -> ast.AstNode:
     n = ast.AstNode('Name')
-    n.set_token(self.lookahead)
-    self.match('IDENTIFIER')
+    n.set_token(self.token())
+    self.match(TokenKind.IDENTIFIER)
     return n
 
   def structureDeclaration (self) -> ast.AstNode:
     n = ast.AstNode('StructureDeclaration')
-    self.match('STRUCT')
+    self.match(TokenKind.STRUCT)
     n.add_child(self.name())
     n.add_child(self.structureBody())
     return n
 
   def structureBody (self) -> ast.AstNode:
     n = ast.AstNode('StructureBody')
-    self.match('L_BRACE')
-    while self.lookahead.kind != 'R_BRACE':
+    self.match(TokenKind.L_BRACE)
+    while self.lookahead.kind != TokenKind.R_BRACE:
       n.add_child(self.structureMember())
-    self.match('R_BRACE')
+    self.match(TokenKind.R_BRACE)
     return n
 
   def structureMember (self) -> ast.AstNode:
     n = ast.AstNode('StructureMember')
     n.add_child(self.name())
-    self.match('COLON')
+    self.match(TokenKind.COLON)
     n.add_child(self.typeRoot())
-    self.match('SEMICOLON')
+    self.match(TokenKind.SEMICOLON)
     return n
 
   def typealiasDeclaration (self) -> ast.AstNode:
     n = ast.AstNode('TypealiasDeclaration')
-    self.match('TYPEALIAS')
+    self.match(TokenKind.TYPEALIAS)
     n.add_child(self.name())
-    self.match('EQUAL')
+    self.match(TokenKind.EQUAL)
     n.add_child(self.typeRoot())
-    self.match('SEMICOLON')
+    self.match(TokenKind.SEMICOLON)
     return n
 
   def unionDeclaration (self) -> ast.AstNode:
     n = ast.AstNode('UnionDeclaration')
-    self.match('UNION')
+    self.match(TokenKind.UNION)
     n.add_child(self.name())
     n.add_child(self.unionBody())
     return n
 
   def unionBody (self) -> ast.AstNode:
     n = ast.AstNode('UnionBody')
-    self.match('L_BRACE')
-    while self.lookahead.kind != 'R_BRACE':
+    self.match(TokenKind.L_BRACE)
+    while self.lookahead.kind != TokenKind.R_BRACE:
       n.add_child(self.unionMember())
-    self.match('R_BRACE')
+    self.match(TokenKind.R_BRACE)
     return n
 
   def unionMember (self) -> ast.AstNode:
     n = ast.AstNode('UnionMember')
     n.add_child(self.name())
-    self.match('COLON')
+    self.match(TokenKind.COLON)
     n.add_child(self.typeRoot())
-    self.match('SEMICOLON')
+    self.match(TokenKind.SEMICOLON)
     return n
 
   # STATEMENTS
 
   def statement (self) -> ast.AstNode:
     n: ast.AstNode = None
-    # Lookahead set for expression statements
-    expressionFirstSet = [
-      'IDENTIFIER',
-      'NULL',
-      'FALSE',
-      'THIS',
-      'TRUE',
-      'INT32_LITERAL',
-      'INT64_LITERAL',
-      'UINT32_LITERAL',
-      'UINT64_LITERAL',
-      'FLOAT32_LITERAL',
-      'FLOAT64_LITERAL'
-    ]
     match self.lookahead.kind:
-      case 'BREAK':
+      case TokenKind.BREAK:
         n = self.breakStatement()
-      case 'CONTINUE':
+      case TokenKind.CONTINUE:
         n = self.continueStatement()
-      case 'DO':
+      case TokenKind.DO:
         n = self.doStatement()
-      case 'FOR':
+      case TokenKind.FOR:
         n = self.forStatement()
-      case 'IF':
+      case TokenKind.IF:
         n = self.ifStatement()
-      case 'LOOP':
+      case TokenKind.LOOP:
         n = self.loopStatement()
-      case 'RETURN':
+      case TokenKind.RETURN:
         n = self.returnStatement()
-      case 'WHILE':
+      case TokenKind.WHILE:
         n = self.whileStatement()
-      case 'SEMICOLON':
+      case TokenKind.SEMICOLON:
         n = self.nullStatement()
-      case item if item in [ 'VAL', 'VAR' ]:
+      case item if item in DECLARATION_STATEMENT_FIRST_SET:
         n = self.declarationStatement()
-      case item if item in expressionFirstSet:
+      case item if item in EXPRESSION_STATEMENT_FIRST_SET:
         n = self.expressionStatement()
       case _:
-        print("ERROR - INVALID STATEMENT")
+        self.error('a statement')
     return n
 
   def breakStatement (self) -> ast.AstNode:
     n = ast.AstNode('BreakStatement')
-    self.match('BREAK')
-    self.match('SEMICOLON')
+    self.match(TokenKind.BREAK)
+    self.match(TokenKind.SEMICOLON)
     return n
 
   def continueStatement (self) -> ast.AstNode:
     n = ast.AstNode('ContinueStatement')
-    self.match('CONTINUE')
-    self.match('SEMICOLON')
+    self.match(TokenKind.CONTINUE)
+    self.match(TokenKind.SEMICOLON)
     return n
 
   def doStatement (self) -> ast.AstNode:
     n = ast.AstNode('DoStatement')
-    self.match('DO')
-    self.match('WHILE')
-    self.match('L_PARENTHESIS')
+    self.match(TokenKind.DO)
+    self.match(TokenKind.WHILE)
+    self.match(TokenKind.L_PARENTHESIS)
     n.add_child(self.expression())
-    self.match('R_PARENTHESIS')
-    if self.lookahead.kind == 'L_BRACE':
+    self.match(TokenKind.R_PARENTHESIS)
+    if self.lookahead.kind == TokenKind.L_BRACE:
       n.add_child(self.block())
     else:
       n.add_child(self.blockElement())
@@ -436,27 +684,27 @@ class Parser:
 
   def declarationStatement (self) -> ast.AstNode:
     n = ast.AstNode('DeclarationStatement')
-    if self.lookahead.kind == 'VAL':
+    if self.lookahead.kind == TokenKind.VAL:
       n.add_child(self.constantDeclaration())
-    elif self.lookahead.kind == 'VAR':
+    elif self.lookahead.kind == TokenKind.VAR:
       n.add_child(self.variableDeclaration())
     return n
 
   def expressionStatement (self) -> ast.AstNode:
     n = ast.AstNode('ExpressionStatement')
     n.add_child(self.expressionRoot())
-    self.match('SEMICOLON')
+    self.match(TokenKind.SEMICOLON)
     return n
 
   def forStatement (self) -> ast.AstNode:
     n = ast.AstNode('ForStatement')
-    self.match('FOR')
-    self.match('L_PARENTHESIS')
+    self.match(TokenKind.FOR)
+    self.match(TokenKind.L_PARENTHESIS)
     n.add_child(self.name())
-    self.match('IN')
+    self.match(TokenKind.IN)
     n.add_child(self.expressionRoot())
-    self.match('R_PARENTHESIS')
-    if self.lookahead.kind == 'L_BRACE':
+    self.match(TokenKind.R_PARENTHESIS)
+    if self.lookahead.kind == TokenKind.L_BRACE:
       n.add_child(self.block())
     else:
       n.add_child(self.blockElement())
@@ -464,11 +712,11 @@ class Parser:
 
   def ifStatement (self) -> ast.AstNode:
     n = ast.AstNode('IfStatement')
-    self.match('IF')
-    self.match('L_PARENTHESIS')
+    self.match(TokenKind.IF)
+    self.match(TokenKind.L_PARENTHESIS)
     n.add_child(self.expressionRoot())
-    self.match('R_PARENTHESIS')
-    if self.lookahead.kind == 'L_BRACE':
+    self.match(TokenKind.R_PARENTHESIS)
+    if self.lookahead.kind == TokenKind.L_BRACE:
       n.add_child(self.block())
     else:
       n.add_child(self.blockElement())
@@ -476,19 +724,19 @@ class Parser:
 
   def loopStatement (self) -> ast.AstNode:
     n = ast.AstNode('LoopStatement')
-    self.match('LOOP')
-    if self.lookahead.kind == 'L_PARENTHESIS':
-      self.match('L_PARENTHESIS')
+    self.match(TokenKind.LOOP)
+    if self.lookahead.kind == TokenKind.L_PARENTHESIS:
+      self.match(TokenKind.L_PARENTHESIS)
       # Init expression
       n.add_child(self.expressionRoot())
-      self.match('SEMICOLON')
+      self.match(TokenKind.SEMICOLON)
       # Cond expression
       n.add_child(self.expressionRoot())
-      self.match('SEMICOLON')
+      self.match(TokenKind.SEMICOLON)
       # Loop expression
       n.add_child(self.expressionRoot())
-      self.match('R_PARENTHESIS')
-    if self.lookahead.kind == 'L_BRACE':
+      self.match(TokenKind.R_PARENTHESIS)
+    if self.lookahead.kind == TokenKind.L_BRACE:
       n.add_child(self.block())
     else:
       n.add_child(self.blockElement())
@@ -497,23 +745,23 @@ class Parser:
   def nullStatement (self) -> ast.AstNode:
     # This is known as an "empty" statement in Java
     n = ast.AstNode('NullStatement')
-    self.match('SEMICOLON')
+    self.match(TokenKind.SEMICOLON)
     return n
 
   def returnStatement (self) -> ast.AstNode:
     n = ast.AstNode('ReturnStatement')
-    self.match('RETURN')
+    self.match(TokenKind.RETURN)
     n.add_child(self.expressionRoot())
-    self.match('SEMICOLON')
+    self.match(TokenKind.SEMICOLON)
     return n
 
   def whileStatement (self) -> ast.AstNode:
     n = ast.AstNode('WhileStatement')
-    self.match('WHILE')
-    self.match('L_PARENTHESIS')
+    self.match(TokenKind.WHILE)
+    self.match(TokenKind.L_PARENTHESIS)
     n.add_child(self.expressionRoot())
-    self.match('R_PARENTHESIS')
-    if self.lookahead.kind == 'L_BRACE':
+    self.match(TokenKind.R_PARENTHESIS)
+    if self.lookahead.kind == TokenKind.L_BRACE:
       n.add_child(self.block())
     else:
       n.add_child(self.blockElement())
@@ -528,186 +776,76 @@ class Parser:
     return n
 
   def expression (self) -> ast.AstNode:
-    n = self.assignmentExpression()
-    return n
-
-  def assignmentExpression (self) -> ast.AstNode:
-    n = self.logicalOrExpression()
-    firstSet = [
-      'EQUAL',
-      'ASTERISK_EQUAL',
-      'SLASH_EQUAL',
-      'PERCENT_EQUAL',
-      'PLUS_EQUAL',
-      'MINUS_EQUAL',
-      'LESS_LESS_EQUAL',
-      'GREATER_GREATER_EQUAL',
-      'AMPERSAND_EQUAL',
-      'CARET_EQUAL',
-      'BAR_EQUAL'
-    ]
-    while self.lookahead.kind in firstSet:
-      p = n
-      n = ast.AstNode('BinaryExpression')
-      n.set_token(self.lookahead)
-      n.add_child(p)
-      self.match(self.lookahead.kind)
-      p = self.logicalOrExpression()
-      n.add_child(p)
-    return n
-
-  def logicalOrExpression (self) -> ast.AstNode:
-    n = self.logicalAndExpression()
-    while self.lookahead.kind == 'OR':
-      p = n
-      n = ast.AstNode('BinaryExpression')
-      n.set_token(self.lookahead)
-      n.add_child(p)
-      self.match('OR')
-      n.add_child(self.logicalAndExpression())
-    return n
-
-  def logicalAndExpression (self) -> ast.AstNode:
-    n = self.inclusiveOrExpression()
-    while self.lookahead.kind == 'AND':
-      p = n
-      n = ast.AstNode('BinaryExpression')
-      n.set_token(self.lookahead)
-      n.add_child(p)
-      self.match('AND')
-      n.add_child(self.inclusiveOrExpression())
-    return n
-  
-  def inclusiveOrExpression (self) -> ast.AstNode:
-    n = self.exclusiveOrExpression()
-    while self.lookahead.kind == 'BAR':
-      p = n
-      n = ast.AstNode('BinaryExpression')
-      n.set_token(self.lookahead)
-      n.add_child(p)
-      self.match('BAR')
-      n.add_child(self.exclusiveOrExpression())
-    return n
-
-  def exclusiveOrExpression (self) -> ast.AstNode:
-    n = self.andExpression()
-    while self.lookahead.kind == 'CARET':
-      p = n
-      n = ast.AstNode('BinaryExpression')
-      n.set_token(self.lookahead)
-      n.add_child(p)
-      self.match('CARET')
-      n.add_child(self.andExpression())
-    return n
-  
-  def andExpression (self) -> ast.AstNode:
-    n = self.equalityExpression()
-    while self.lookahead.kind == 'AMPERSAND':
-      p = n
-      n = ast.AstNode('BinaryExpression')
-      n.set_token(self.lookahead)
-      n.add_child(p)
-      self.match('AMPERSAND')
-      n.add_child(self.equalityExpression())
-    return n
-
-  def equalityExpression (self) -> ast.AstNode:
-    n = self.relationalExpression()
-    firstSet = ['EQUAL_EQUAL', 'EXCLAMATION_EQUAL']
-    while self.lookahead.kind in firstSet:
-      p = n
-      n = ast.AstNode('BinaryExpression')
-      n.set_token(self.lookahead)
-      n.add_child(p)
-      self.match(self.lookahead.kind)
-      n.add_child(self.relationalExpression())
-    return n
-
-  def relationalExpression (self) -> ast.AstNode:
-    n = self.shiftExpression()
-    firstSet = ['GREATER', 'LESS', 'GREATER_EQUAL', 'LESS_EQUAL']
-    while self.lookahead.kind in firstSet:
-      p = n
-      n = ast.AstNode('BinaryExpression')
-      n.set_token(self.lookahead)
-      n.add_child(p)
-      self.match(self.lookahead.kind)
-      n.add_child(self.shiftExpression())
-    return n
-
-  def shiftExpression (self) -> ast.AstNode:
-    n = self.additiveExpression()
-    firstSet = ['GREATER_GREATER', 'LESS_LESS']
-    while self.lookahead.kind in firstSet:
-      p = n
-      n = ast.AstNode('BinaryExpression')
-      n.set_token(self.lookahead)
-      n.add_child(p)
-      self.match(self.lookahead.kind)
-      n.add_child(self.additiveExpression())
-    return n
-
-  def additiveExpression (self) -> ast.AstNode:
-    n = self.multiplicativeExpression()
-    firstSet = ['PLUS', 'MINUS']
-    while self.lookahead.kind in firstSet:
-      p = n
-      n = ast.AstNode('BinaryExpression')
-      n.set_token(self.lookahead)
-      n.add_child(p)
-      self.match(self.lookahead.kind)
-      n.add_child(self.multiplicativeExpression())
-    return n
-
-  def multiplicativeExpression (self) -> ast.AstNode:
-    n = self.unaryExpression()
-    firstSet = ['ASTERISK', 'SLASH', 'PERCENT']
-    while self.lookahead.kind in firstSet:
-      p = n
-      n = ast.AstNode('BinaryExpression')
-      n.set_token(self.lookahead)
-      n.add_child(p)
-      self.match(self.lookahead.kind)
-      n.add_child(self.unaryExpression())
-    return n
-  
-  def unaryExpression (self) -> ast.AstNode:
-    # Need to add tilde
-    firstSet = ['ASTERISK', 'MINUS', 'PLUS', 'EXCLAMATION']
-    if self.lookahead.kind in firstSet:
-      n = ast.AstNode('UnaryExpression')
-      n.set_token(self.lookahead)
-      self.match(self.lookahead.kind)
-      n.add_child(self.unaryExpression())
-    else:
+    # Precedence climbing over the operator table, with an explicit
+    # stack of pending operators instead of a call per operand, prefix
+    # operator and parenthesis, so that long operator chains, long runs
+    # of prefix operators and deeply nested parentheses are parsed
+    # without recursion. Function arguments, array indexes and if expressions
+    # are still parsed by calling back into expression().
+    # Entries on the stack are (power, node) pairs. A binary node waits
+    # for its right operand, which takes in operators of at least the
+    # given power. A unary node waits for its operand (UNARY_ENTRY). An
+    # open parenthesis waits for its closing one (GROUP_ENTRY).
+    operators = []
+    groups = 0
+    while True:
+      kind = self.lookahead.kind
+      while kind in PREFIX_FIRST_SET:
+        if kind == TokenKind.L_PARENTHESIS:
+          operators.append(GROUP_ENTRY)
+          groups += 1
+        else:
+          n = ast.AstNode('UnaryExpression')
+          n.set_token(self.token())
+          operators.append((UNARY_ENTRY, n))
+        self.consume()
+        kind = self.lookahead.kind
       n = self.primaryExpression()
-    return n
+      while True:
+        # Prefix operators bind more tightly than any binary operator
+        while operators and operators[-1][0] == UNARY_ENTRY:
+          p = operators.pop()[1]
+          p.add_child(n)
+          n = p
+        operator = BINARY_OPERATORS.get(self.lookahead.kind)
+        if operator is not None:
+          # Complete the pending operators that may not take this one
+          # into their right operand
+          power = operator[0]
+          while operators and power < operators[-1][0]:
+            p = operators.pop()[1]
+            p.add_child(n)
+            n = p
+          p = n
+          n = ast.AstNode(operator[2])
+          n.set_token(self.token())
+          n.add_child(p)
+          self.consume()
+          operators.append((operator[1], n))
+          break
+        # End of the operand: complete the pending operators back to
+        # the innermost open parenthesis, if any
+        while operators and operators[-1][1] is not None:
+          p = operators.pop()[1]
+          p.add_child(n)
+          n = p
+        if groups == 0:
+          return n
+        operators.pop()
+        groups -= 1
+        self.match(TokenKind.R_PARENTHESIS)
+        n = self.postfixExpression(n)
 
   def primaryExpression (self) -> ast.AstNode:
-    firstSet = [
-      'NULL',
-      'THIS',
-      'FALSE',
-      'TRUE',
-      'FLOAT32_LITERAL',
-      'FLOAT64_LITERAL',
-      'INT32_LITERAL',
-      'INT64_LITERAL',
-      'UINT32_LITERAL',
-      'UINT64_LITERAL',
-      'STRING_LITERAL'
-    ]
     match self.lookahead.kind:
-      case 'IDENTIFIER':
+      case TokenKind.IDENTIFIER:
         n = self.nameExpression()
-      case 'IF':
+      case TokenKind.IF:
         n = self.ifExpression()
-      case 'L_PARENTHESIS':
-        n = self.parenthesizedExpression()
-      case item if item in firstSet:
+      case item if item in LITERAL_FIRST_SET:
         n = self.literal()
       case _:
-        print("ERROR - INVALID PRIMARY EXPRESSION")
+        self.error('an expression')
     return n
 
   def nameExpression (self) -> ast.AstNode:
@@ -716,24 +854,27 @@ class Parser:
     # elements. An alternative is to use a form of tree pattern
     # matching.
     n = self.name()
-    firstSet = ['L_PARENTHESIS', 'L_BRACKET', 'MINUS_GREATER', 'PERIOD']
-    while self.lookahead.kind in firstSet:
+    return self.postfixExpression(n)
+
+  def postfixExpression (self, n: ast.AstNode) -> ast.AstNode:
+    # Calls, indexes and field accesses applied to n
+    while self.lookahead.kind in POSTFIX_FIRST_SET:
       p = n
       match self.lookahead.kind:
-        case 'L_PARENTHESIS':
+        case TokenKind.L_PARENTHESIS:
           n = self.functionCall(p)
-        case 'L_BRACKET':
+        case TokenKind.L_BRACKET:
           n = self.arrayAccess(p)
-        case 'MINUS_GREATER':
+        case TokenKind.MINUS_GREATER:
           n = self.derefAccess(p)
-        case 'PERIOD':
+        case TokenKind.PERIOD:
           n = self.fieldAccess(p)
     return n
 
   # def identifier (self) -> ast.AstNode:
   #   n = ast.AstNode('Identifier')
-  #   n.set_token(self.lookahead)
-  #   self.match('IDENTIFIER')
+  #   n.set_token(self.token())
+  #   self.match(TokenKind.IDENTIFIER)
   #   return n
   
   def functionCall (self, p: ast.AstNode) -> ast.AstNode:
@@ -744,114 +885,96 @@ class Parser:
 
   def argumentList (self) -> ast.AstNode:
     n = ast.AstNode('ArgumentList')
-    self.match('L_PARENTHESIS')
-    if self.lookahead.kind != 'R_PARENTHESIS':
+    self.match(TokenKind.L_PARENTHESIS)
+    if self.lookahead.kind != TokenKind.R_PARENTHESIS:
       n.add_child(self.expression())
-      while self.lookahead.kind == 'COMMA':
-        self.match('COMMA')
+      while self.lookahead.kind == TokenKind.COMMA:
+        self.match(TokenKind.COMMA)
         n.add_child(self.expression())
-    self.match('R_PARENTHESIS')
+    self.match(TokenKind.R_PARENTHESIS)
     return n
 
   def arrayAccess (self, p: ast.AstNode) -> ast.AstNode:
     n = ast.AstNode('ArrayAccess')
     n.add_child(p)
-    self.match('L_BRACKET')
+    self.match(TokenKind.L_BRACKET)
     n.add_child(self.expression())
-    self.match('R_BRACKET')
+    self.match(TokenKind.R_BRACKET)
     return n
 
   def derefAccess (self, p: ast.AstNode) -> ast.AstNode:
     n = ast.AstNode('FieldAccess')
     n.add_child(p)
-    self.match('MINUS_GREATER')
+    self.match(TokenKind.MINUS_GREATER)
     n.add_child(self.name())
     return n
 
   def fieldAccess (self, p: ast.AstNode) -> ast.AstNode:
     n = ast.AstNode('FieldAccess')
     n.add_child(p)
-    self.match('PERIOD')
+    self.match(TokenKind.PERIOD)
     n.add_child(self.name())
     return n
 
   def ifExpression (self) -> ast.AstNode:
     n = ast.AstNode('IfExpression')
-    self.match('IF')
-    if self.lookahead.kind == 'L_PARENTHESIS':
-      self.match('L_PARENTHESIS')
+    self.match(TokenKind.IF)
+    if self.lookahead.kind == TokenKind.L_PARENTHESIS:
+      self.match(TokenKind.L_PARENTHESIS)
       n.add_child(self.expression())
-      self.match('R_PARENTHESIS')
+      self.match(TokenKind.R_PARENTHESIS)
     else:
       n.add_child(self.expression())
-      self.match('THEN')
+      self.match(TokenKind.THEN)
     n.add_child(self.expression())
-    self.match('ELSE')
+    self.match(TokenKind.ELSE)
     n.add_child(self.expression())
     return n
 
-  def parenthesizedExpression (self) -> ast.AstNode:
-    self.match('L_PARENTHESIS')
-    n = self.expression()
-    self.match('R_PARENTHESIS')
-    firstSet = ['L_PARENTHESIS', 'L_BRACKET', 'MINUS_GREATER', 'PERIOD']
-    while self.lookahead.kind in firstSet:
-      p = n
-      match self.lookahead.kind:
-        case 'L_PARENTHESIS':
-          n = self.functionCall(p)
-        case 'L_BRACKET':
-          n = self.arrayAccess(p)
-        case 'MINUS_GREATER':
-          n = self.derefAccess(p)
-        case 'PERIOD':
-          n = self.fieldAccess(p)
-    return n
-
   def literal (self) -> ast.AstNode:
     match self.lookahead.kind:
-      case 'NULL':
+      case TokenKind.NULL:
         n = ast.AstNode('NullLiteral')
-        n.set_token(self.lookahead)
-        self.match('NULL')
-      case 'FALSE':
+        n.set_token(self.token())
+        self.match(TokenKind.NULL)
+      case TokenKind.FALSE:
         n = ast.AstNode('BooleanLiteral')
-        n.set_token(self.lookahead)
-        self.match('FALSE')
-      case 'TRUE':
+        n.set_token(self.token())
+        self.match(TokenKind.FALSE)
+      case TokenKind.TRUE:
         n = ast.AstNode('BooleanLiteral')
-        n.set_token(self.lookahead)
-        self.match('TRUE')
-      case 'FLOAT32_LITERAL':
+        n.set_token(self.token())
+        self.match(TokenKind.TRUE)
+      case TokenKind.FLOAT32_LITERAL:
         n = ast.AstNode('FloatingPointLiteral')
-        n.set_token(self.lookahead)
-        self.match('FLOAT32_LITERAL')
-      case 'FLOAT64_LITERAL':
+        n.set_token(self.token())
+        self.match(TokenKind.FLOAT32_LITERAL)
+      case TokenKind.FLOAT64_LITERAL:
         n = ast.AstNode('FloatingPointLiteral')
-        n.set_token(self.lookahead)
-        self.match('FLOAT64_LITERAL')
-      case 'INT32_LITERAL':
+        n.set_token(self.token())
+        self.match(TokenKind.FLOAT64_LITERAL)
+      case TokenKind.INT32_LITERAL:
         n = ast.AstNode('IntegerLiteral')
-        n.set_token(self.lookahead)
-        self.match('INT32_LITERAL')
-      case 'INT64_LITERAL':
+        n.set_token(self.token())
+        self.match(TokenKind.INT32_LITERAL)
+      case TokenKind.INT64_LITERAL:
         n = ast.AstNode('IntegerLiteral')
-        n.set_token(self.lookahead)
-        self.match('INT64_LITERAL')
-      case 'UINT32_LITERAL':
+        n.set_token(self.token())
+        self.match(TokenKind.INT64_LITERAL)
+      case TokenKind.UINT32_LITERAL:
         n = ast.AstNode('IntegerLiteral')
-        n.set_token(self.lookahead)
-        self.match('UINT32_LITERAL')
-      case 'UINT64_LITERAL':
+        n.set_token(self.token())
+        self.match(TokenKind.UINT32_LITERAL)
+      case TokenKind.UINT64_LITERAL:
         n = ast.AstNode('IntegerLiteral')
-        n.set_token(self.lookahead)
-        self.match('UINT64_LITERAL')
-      case 'STRING_LITERAL':
+        n.set_token(self.token())
+        self.match(TokenKind.UINT64_LITERAL)
+      case TokenKind.STRING_LITERAL:
         n = ast.AstNode('StringLiteral')
-        n.set_token(self.lookahead)
-        self.match('STRING_LITERAL')
+        n.set_token(self.token())
+        self.match(TokenKind.STRING_LITERAL)
       case _:
-        print("ERROR NO LITERAL MATCH")
+        self.error('a literal')
     return n
 
   # TYPES
@@ -889,34 +1012,19 @@ class Parser:
   def directType (self) -> deque:
     # Build left fragment
     left = deque()
-    while self.lookahead.kind == 'ASTERISK':
+    while self.lookahead.kind == TokenKind.ASTERISK:
       n = self.pointerType()
       left.appendleft(n)
     # Build center fragment
     center = deque()
     match self.lookahead.kind:
-      case 'FN':
+      case TokenKind.FUN:
         n = self.functionType()
         center.append(n)
-      # To do: void might not be a primitive type - verify
-      case kind if kind in [
-        'NULL_T',
-        'BOOL',
-        'INT8',
-        'INT16',
-        'INT32',
-        'INT64',
-        'UINT8',
-        'UINT16',
-        'UINT32',
-        'UINT64',
-        'FLOAT32',
-        'FLOAT64',
-        'VOID'
-      ]:
+      case kind if kind in PRIMITIVE_TYPE_FIRST_SET:
         n = self.primitiveType()
         center.append(n)
-      case 'IDENTIFIER':
+      case TokenKind.IDENTIFIER:
         # Nominal type. Need to look up name in symbol table to tell
         # what kind it is (e.g. struct, class). For now assume class.
         # What if we don't want to require a symbol table for
@@ -924,14 +1032,16 @@ class Parser:
         # 'nominal' type.
         n = self.nominalType()
         center.append(n)
-      case 'L_PARENTHESIS':
-        self.match('L_PARENTHESIS')
+      case TokenKind.L_PARENTHESIS:
+        self.match(TokenKind.L_PARENTHESIS)
         n = self.directType()
         center = n
-        self.match('R_PARENTHESIS')
+        self.match(TokenKind.R_PARENTHESIS)
+      case _:
+        self.error('a type')
     # Build right fragment
     right = deque()
-    while self.lookahead.kind == 'L_BRACKET':
+    while self.lookahead.kind == TokenKind.L_BRACKET:
       n = self.arrayType()
       right.append(n)
     # Assemble fragments
@@ -942,18 +1052,18 @@ class Parser:
     n = ast.AstNode('ArrayType')
     # We might want to set the token as '[' so that we can at least
     # get position, line number, column, etc.
-    self.match('L_BRACKET')
+    self.match(TokenKind.L_BRACKET)
     # Todo: The value provided inside the brackets must be a constant
     # integer expression that can be evaluated at compile time.
     # Evaluation can occur during semantic analysis phase. For now,
     # just accept a literal.
     n.add_child(self.expressionRoot())
-    self.match('R_BRACKET')
+    self.match(TokenKind.R_BRACKET)
     return n
 
   # def classType (self) -> ast.AstNode:
   #   n = ast.AstNode('ClassType')
-  #   if self.lookahead.kind == 'IDENTIFIER':
+  #   if self.lookahead.kind == TokenKind.IDENTIFIER:
   #     n.add_child(self.name())
   #   else:
   #     self.error('ID')
@@ -965,20 +1075,20 @@ class Parser:
 
   def functionType (self) -> ast.AstNode:
     # Fix parameters
-    self.match('FN')
+    self.match(TokenKind.FUN)
     n = ast.AstNode('FunctionType')
-    self.match('L_PARENTHESIS')
-    if self.lookahead.kind != 'R_PARENTHESIS':
+    self.match(TokenKind.L_PARENTHESIS)
+    if self.lookahead.kind != TokenKind.R_PARENTHESIS:
       # Parameter types
       p = self.type()
       n.add_child(p)
-      while self.lookahead.kind == 'COMMA':
-        self.match('COMMA')
+      while self.lookahead.kind == TokenKind.COMMA:
+        self.match(TokenKind.COMMA)
         p = self.type()
         n.add_child(p)
-    self.match('R_PARENTHESIS')
+    self.match(TokenKind.R_PARENTHESIS)
     # Return type
-    self.match('ARROW')
+    self.match(TokenKind.MINUS_GREATER)
     p = self.type()
     n.add_child(p)
     return n
@@ -988,20 +1098,20 @@ class Parser:
     # I don't think we want to add a name here, we want to set the
     # token instead, but we can revisit this later.
     # n.add_child(self.name())
-    n.set_token(self.lookahead)
-    self.match('IDENTIFIER')
+    n.set_token(self.token())
+    self.match(TokenKind.IDENTIFIER)
     # Need to eventually allow for type parameters. (This would allow
     # us to know that this was a class type, if that matters.)
     return n
 
   def pointerType (self) -> ast.AstNode:
     n = ast.AstNode('PointerType')
-    n.set_token(self.lookahead)
-    self.match('ASTERISK')
+    n.set_token(self.token())
+    self.match(TokenKind.ASTERISK)
     return n
 
   def primitiveType (self) -> ast.AstNode:
     n = ast.AstNode('PrimitiveType')
-    n.set_token(self.lookahead)
+    n.set_token(self.token())
     self.match(self.lookahead.kind)
     return n
@@ -1,7 +1,8 @@
 from enum import Enum
 from typing import List
 
-from co.ast import AstNode
+from co.ast import AstNode, LazyNode
+from co.ast.Traversal import operands
 from co.types import TypeNode
 from co.types import PrimitiveTypeNode, StructureTypeNode, TypealiasTypeNode, UnionTypeNode
 
@@ -88,6 +89,9 @@ class PrimitiveType (Enum):
 
 class Pass1:
 
+  # Passes that must have run first
+  requires = []
+
   def __init__ (self, root_node: AstNode):
     self.root_node = root_node
     self.builtin_scope: Scope = Scope('Builtin')
@@ -121,7 +125,7 @@ class Pass1:
     scope = Scope('Global')
     scope.set_enclosing_scope(self.current_scope)
     self.current_scope = scope
-    node.set_attribute('scope', self.current_scope)
+    node.scope = self.current_scope
     # For now, type definitions only exist at global scope
     for decl_node in node.children:
       self.declaration(decl_node)
@@ -154,7 +158,7 @@ class Pass1:
     # flexible.
     scope.set_enclosing_scope(self.current_scope)
     self.current_scope = scope
-    node.set_attribute('scope', self.current_scope)
+    node.scope = self.current_scope
     self.classBody(node.child(1))
     # Pop scope
     self.current_scope = self.current_scope.enclosing_scope
@@ -178,7 +182,7 @@ class Pass1:
     # flexible. Standard C/C++ do not support nested functions.
     scope.set_enclosing_scope(self.current_scope)
     self.current_scope = scope
-    node.set_attribute('scope', self.current_scope)
+    node.scope = self.current_scope
     self.parameterList(node.child(1))
     self.functionBody(node.child(3))
     # Pop scope
@@ -196,17 +200,33 @@ class Pass1:
       self.parameter(param_node)
 
   def parameter (self, node: AstNode):
-    self.parameterName(node.child(0))
+    self.parameterName(node.child(0), node)
 
-  def parameterName (self, node: AstNode):
+  def parameterName (self, node: AstNode, parent_node: AstNode):
     name = node.token.lexeme
     if self.current_scope.is_defined(name):
       print(f"error ({node.token.line}): symbol '{name}' already defined")
     else:
-      self.current_scope.define(VariableSymbol(name))
+      # The parameter node stands in as the declaration, so that later
+      # passes can find where the name was declared
+      symbol = VariableSymbol(name)
+      symbol.set_declaration(parent_node)
+      self.current_scope.define(symbol)
 
   def functionBody (self, node: AstNode):
+    if isinstance(node, LazyNode) and node.pending():
+      # A body skipped by a lazy parse is left alone until some later
+      # pass reads it, and its locals are defined then
+      scope = self.current_scope
+      node.when_built(lambda body: self.deferredBody(body, scope))
+    else:
+      self.block(node.child())
+
+  def deferredBody (self, node: AstNode, scope: Scope):
+    current_scope = self.current_scope
+    self.current_scope = scope
     self.block(node.child())
+    self.current_scope = current_scope
 
   def block (self, node: AstNode):
     for stmt_node in node.children:
@@ -234,7 +254,7 @@ class Pass1:
     # flexible.
     scope.set_enclosing_scope(self.current_scope)
     self.current_scope = scope
-    node.set_attribute('scope', self.current_scope)
+    node.scope = self.current_scope
     self.structureBody(node.child(1))
     # Pop scope
     self.current_scope = self.current_scope.enclosing_scope
@@ -289,7 +309,7 @@ class Pass1:
     # flexible.
     scope.set_enclosing_scope(self.current_scope)
     self.current_scope = scope
-    node.set_attribute('scope', self.current_scope)
+    node.scope = self.current_scope
     self.unionBody(node.child(1))
     # Pop scope
     self.current_scope = self.current_scope.enclosing_scope
@@ -330,14 +350,14 @@ class Pass1:
     else:
       symbol = VariableSymbol(name)
       symbol.set_declaration(parent_node)
-      symbol.set_constant(parent_node.attribute('is_constant') == True)
-      symbol.set_final(parent_node.attribute('is_final') == True)
+      symbol.set_constant(parent_node.is_constant == True)
+      symbol.set_final(parent_node.is_final == True)
       self.current_scope.define(symbol)
-      node.set_attribute('symbol', symbol)
+      node.symbol = symbol
       # Should we also set scope attribute too? See Parr, pg. 168. We
       # might not need to set it on variableName because we already
       # have the symbol as an attribute.
-      # node.set_attribute('scope', self.current_scope)
+      # node.scope = self.current_scope
 
 # TYPES
 
@@ -369,23 +389,15 @@ class Pass1:
     self.expression(node.child())
 
   def expression (self, node: AstNode):
-    match node.kind:
-      case 'BinaryExpression':
-        self.binaryExpression(node)
-      case 'UnaryExpression':
-        self.unaryExpression(node)
-      case 'Name':
-        self.name(node)
+    # Operators only lead to their operands, so only the names among
+    # them need handling. They are found without recursion, since
+    # expression trees can be very deep.
+    for expr_node in operands(node):
+      if expr_node.kind == 'Name':
+        self.name(expr_node)
       # To do: There may be additional node kinds that we need to
       # address.
 
-  def binaryExpression (self, node: AstNode):
-    self.expression(node.child(0))
-    self.expression(node.child(1))
-
   def name (self, node: AstNode):
-    node.set_attribute('scope', self.current_scope)
-
-  def unaryExpression (self, node: AstNode):
-    self.expression(node.child())
+    node.scope = self.current_scope
 
@@ -17,6 +17,9 @@ from co.st import ClassSymbol, PrimitiveSymbol, StructureSymbol, UnionSymbol
 
 class Pass2:
 
+  # Passes that must have run first
+  requires = ['Pass1']
+
   def __init__ (self, root_node: AstNode, builtin_scope: Scope):
     # Might not need scopes this round
     self.root_node = root_node
@@ -29,7 +32,7 @@ class Pass2:
   # TRANSLATION UNIT
 
   def translationUnit (self, node: AstNode):
-    self.current_scope = node.attribute('scope')
+    self.current_scope = node.scope
     for decl_node in node.children:
       self.declaration(decl_node)
 
@@ -52,7 +55,7 @@ class Pass2:
     # Assume this is a typealias type, otherwise it would be an
     # exception.
     t: TypealiasTypeNode = symbol.type
-    t.set_actual_type(type_node.attribute('type'))
+    t.set_actual_type(type_node.type)
 
   # TYPES
 
@@ -61,8 +64,8 @@ class Pass2:
 
   def typeRoot (self, node: AstNode):
     type = self.type(node.child())
-    node.set_attribute('type', type)
-    # print(node.attribute('type'))
+    node.type = type
+    # print(node.type)
 
   def type (self, node: AstNode) -> TypeNode:
     match node.kind:
@@ -4,7 +4,8 @@ from collections import deque
 
 from graphlib import TopologicalSorter
 
-from co.ast import AstNode
+from co.ast import AstNode, Walker
+from co.ast.Traversal import operands
 from co.types import TypeNode, ArrayTypeNode, PointerTypeNode, PrimitiveTypeNode
 from co.st import Scope, FunctionSymbol, VariableSymbol, TypeSymbol
 from co.st import ClassSymbol, PrimitiveSymbol, StructureSymbol, UnionSymbol
@@ -32,45 +33,37 @@ from co.reader import Pass4
 # because this is generally pretty obvious to a developer):
 # var t = t;
 
-class Pass3a:
+class Pass3a (Walker):
+
+  # Passes that must have run first
+  requires = ['Pass1']
+
+  pre_order = {
+    'ExpressionRoot': 'expressionRoot',
+  }
 
   def __init__ (self, root_node: AstNode):
     self.root_node = root_node
     self.logger = Logger()
 
   def process (self):
-    self.search(self.root_node)
+    self.walk(self.root_node)
+    self.finish()
+
+  def finish (self):
     self.logger.print()
 
   # To do: We want the search to only occur for expressions in local
   # scopes. Global scopes allow forward references.
 
-  def search (self, node: AstNode):
-    if node.kind == 'ExpressionRoot':
-      self.expressionRoot(node)
-    else:
-      for child_node in node.children:
-        self.search(child_node)
-
   def expressionRoot (self, node: AstNode):
     self.expression(node.child())
 
   def expression (self, node: AstNode):
-    # Dispatch method
-    match node.kind:
-      case 'BinaryExpression':
-        self.binaryExpression(node)
-      case 'UnaryExpression':
-        self.unaryExpression(node)
-      case 'Name':
-        self.name(node)
-
-  def binaryExpression (self, node: AstNode):
-    self.expression(node.child(0))
-    self.expression(node.child(1))
-
-  def unaryExpression (self, node: AstNode):
-    self.expression(node.child())
+    # Names in source order, found without recursion
+    for expr_node in operands(node):
+      if expr_node.kind == 'Name':
+        self.name(expr_node)
 
   # Non-existent variable references:
   # If name doesn't resolve, then the variable doesn't exist.
@@ -84,12 +77,12 @@ class Pass3a:
   def name (self, node: AstNode):
     # Look up name in symbol table
     name = node.token.lexeme
-    scope: Scope = node.attribute('scope')
+    scope: Scope = node.scope
     # print(scope.kind)
     symbol: VariableSymbol = scope.resolve(name)
     if symbol:
       decl_node = symbol.declaration
-      if not decl_node.attribute('is_global'):
+      if not decl_node.is_global:
         name_node = decl_node.child(0)
         ref_position = node.token.position
         def_position = name_node.token.position
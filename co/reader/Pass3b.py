@@ -6,6 +6,7 @@ import graphlib
 from graphlib import TopologicalSorter
 
 from co.ast import AstNode
+from co.ast.Traversal import dependencies
 from co.types import TypeNode, ArrayTypeNode, PointerTypeNode, PrimitiveTypeNode
 from co.st import Scope, FunctionSymbol, VariableSymbol, TypeSymbol
 from co.st import ClassSymbol, PrimitiveSymbol, StructureSymbol, UnionSymbol
@@ -30,6 +31,9 @@ from co.reader import PrimitiveType
 
 class Pass3b:
 
+  # Passes that must have run first
+  requires = ['Pass1']
+
   def __init__ (self, root_node: AstNode):
     self.root_node = root_node
     self.logger = Logger()
@@ -80,7 +84,7 @@ class Pass3b:
     spec_node = node.child(1)
     if spec_node.child_count():
       self.typeRoot(spec_node)
-      dep_list: List[AstNode] = spec_node.attribute('dep_list')
+      dep_list: List[AstNode] = spec_node.dep_list
       for dep_node in dep_list:
         self.sorter.add(node, dep_node)
     if node.child_count() == 3:
@@ -88,7 +92,7 @@ class Pass3b:
       self.expressionRoot(init_node)
       # Dep list is a list of symbols that this declaration is
       # dependent upon.
-      dep_list: List[AstNode] = init_node.attribute('dep_list')
+      dep_list: List[AstNode] = init_node.dep_list
       for dep_node in dep_list:
         self.sorter.add(node, dep_node)
 
@@ -96,41 +100,11 @@ class Pass3b:
 
   def expressionRoot (self, node: AstNode):
     dep_list = self.expression(node.child())
-    node.set_attribute('dep_list', dep_list)
+    node.dep_list = dep_list
 
   def expression (self, node: AstNode) -> List[AstNode]:
-    # Dispatch method
-    match node.kind:
-      case 'BinaryExpression':
-        return self.binaryExpression(node)
-      case 'UnaryExpression':
-        return self.unaryExpression(node)
-      case 'Name':
-        return self.name(node)
-      case _:
-        return []
-
-  def binaryExpression (self, node: AstNode) -> List[AstNode]:
-    return self.expression(node.child(0)) + self.expression(node.child(1))
-
-  def unaryExpression (self, node: AstNode) -> List[AstNode]:
-    return self.expression(node.child())
-
-  def name (self, node: AstNode) -> List[AstNode]:
-    # Look up name in symbol table
-    scope: Scope = node.attribute('scope')
-    symbol: VariableSymbol = scope.resolve(node.token.lexeme)
-    if symbol:
-      # Add this node as dependency of current declaration node
-      return [ symbol.declaration ]
-    else:
-      # It's possible that the name wasn't declared, which is an error.
-      # However, we might just wait until pass4b to actually print this
-      # error because that pass handles all name expressions, not just
-      # those without type specifiers.
-      # print(f"error: name {name} not declared.")
-      # Also, this might have already been handled by Pass 3a.
-      return []
+    # Dependencies of the names in the expression, in source order
+    return dependencies(node)
 
 # TYPES
 
@@ -139,7 +113,7 @@ class Pass3b:
 
   def typeRoot (self, node: AstNode):
     dep_list = self.type(node.child())
-    node.set_attribute('dep_list', dep_list)
+    node.dep_list = dep_list
 
   def type (self, node: AstNode):
     match node.kind:
@@ -153,7 +127,7 @@ class Pass3b:
   def arrayType (self, node: AstNode):
     expr_root_node = node.child(0)
     self.expressionRoot(expr_root_node)
-    return expr_root_node.attribute('dep_list') + self.type(node.child(1))
+    return expr_root_node.dep_list + self.type(node.child(1))
 
   def pointerType (self, node: AstNode):
     return self.type(node.child())
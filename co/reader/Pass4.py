@@ -5,11 +5,15 @@ from collections import deque
 from graphlib import TopologicalSorter
 
 from co.ast import AstNode
+from co.ast.Traversal import post_order
 from co.types import TypeNode, ArrayTypeNode, PointerTypeNode, PrimitiveTypeNode
 from co.st import Scope, FunctionSymbol, VariableSymbol, TypeSymbol
 from co.st import ClassSymbol, PrimitiveSymbol, StructureSymbol, UnionSymbol
 from co.reader import Logger, Message
 from co.reader import PrimitiveType
+from co.reader.TokenKind import TokenKind
+from co.reader.Operators import MULTIPLICATIVE_OPERATORS, ADDITIVE_OPERATORS, SHIFT_OPERATORS
+from co.reader.Operators import RELATIONAL_OPERATORS, EQUALITY_OPERATORS, BITWISE_OPERATORS
 
 # Purpose:
 
@@ -68,54 +72,53 @@ class Pass4:
   def expressionRoot (self, node: AstNode):
     expr_node = node.child()
     self.expression(expr_node)
-    node.set_attribute('type', expr_node.attribute('type'))
+    node.type = expr_node.type
 
   def expression (self, node: AstNode):
-    # Dispatch method
-    match node.kind:
-      case 'BinaryExpression':
-        self.binaryExpression(node)
-      case 'UnaryExpression':
-        self.unaryExpression(node)
-      case 'Name':
-        self.name(node)
-      case 'BooleanLiteral':
-        self.booleanLiteral(node)
-      case 'FloatingPointLiteral':
-        self.floatingPointLiteral(node)
-      case 'IntegerLiteral':
-        self.integerLiteral(node)
-      case 'NullLiteral':
-        self.nullLiteral(node)
+    # Dispatch method. Operands must be typed before their operators.
+    # The nodes come in that order from post_order(), so the handlers
+    # below do not recurse, however deep the expression.
+    for expr_node in post_order(node):
+      match expr_node.kind:
+        case 'BinaryExpression':
+          self.binaryExpression(expr_node)
+        case 'UnaryExpression':
+          self.unaryExpression(expr_node)
+        case 'Name':
+          self.name(expr_node)
+        case 'BooleanLiteral':
+          self.booleanLiteral(expr_node)
+        case 'FloatingPointLiteral':
+          self.floatingPointLiteral(expr_node)
+        case 'IntegerLiteral':
+          self.integerLiteral(expr_node)
+        case 'NullLiteral':
+          self.nullLiteral(expr_node)
 
   # BINARY EXPRESSION
 
   def binaryExpression (self, node: AstNode):
-    # Compute left and right sub-expression types
-    left_node  = node.child(0)
-    right_node = node.child(1)
-    self.expression(left_node)
-    self.expression(right_node)
+    # Left and right sub-expression types are already computed
     self.usual_binary_conversions(node)
     match node.token.kind:
-      case kind if kind in ['ASTERISK', 'SLASH', 'PERCENT']:
+      case kind if kind in MULTIPLICATIVE_OPERATORS:
         self.multiplicativeExpression(node)
-      case kind if kind in ['PLUS', 'MINUS']:
+      case kind if kind in ADDITIVE_OPERATORS:
         self.additiveExpression(node)
-      case kind if kind in ['LESS_LESS', 'GREATER_GREATER']:
+      case kind if kind in SHIFT_OPERATORS:
         self.shiftExpression(node)
-      case kind if kind in ['GREATER', 'LESS', 'GREATER_EQUAL', 'LESS_EQUAL']:
+      case kind if kind in RELATIONAL_OPERATORS:
         self.relationalExpression(node)
-      case kind if kind in ['EQUAL_EQUAL', 'EXCLAMATION_EQUAL']:
+      case kind if kind in EQUALITY_OPERATORS:
         self.equalityExpression(node)
-      case kind if kind in ['AMPERSAND', 'CARET', 'BAR']:
+      case kind if kind in BITWISE_OPERATORS:
         self.bitwiseExpression(node)
 
   def usual_binary_conversions (self, node: AstNode):
     left_node  = node.child(0)
     right_node = node.child(1)
-    left_type  = left_node.attribute('type')
-    right_type = right_node.attribute('type')
+    left_type  = left_node.type
+    right_type = right_node.type
     # Rule 1: If either operand is of type float64 and the other is
     # of type float32 or integral type, then promote the other to
     # float64.
@@ -189,22 +192,22 @@ class Pass4:
 
   def multiplicativeExpression (self, node: AstNode):
     left_node = node.child(0)
-    result_type  = left_node.attribute('type')
+    result_type  = left_node.type
     operator = node.token.kind
-    if operator == 'ASTERISK' or operator == 'SLASH':
+    if operator == TokenKind.ASTERISK or operator == TokenKind.SLASH:
       # Operands must be of numeric type
       # Note: C++ calls these arithmetic types, but that includes
       # booleans, which we don't consider to be numeric.
       if result_type in self.numeric_types:
-        node.set_attribute('type', result_type)
+        node.type = result_type
       else:
         message = Message('error', "Invalid operand type, must be numeric")
         message.set_line(node.token.line)
         self.logger.add_message(message)
-    elif operator == 'PERCENT':
+    elif operator == TokenKind.PERCENT:
       # Modulo division requires operands to be of integral type
       if result_type in self.integral_types:
-        node.set_attribute('type', result_type)
+        node.type = result_type
       else:
         message = Message('error', "Invalid operand type, must be integral")
         message.set_line(node.token.line)
@@ -215,19 +218,19 @@ class Pass4:
 
   def additiveExpression (self, node: AstNode):
     left_node = node.child(0)
-    result_type  = left_node.attribute('type')
+    result_type  = left_node.type
     operator = node.token.kind
-    if operator == 'PLUS':
+    if operator == TokenKind.PLUS:
       if result_type in self.numeric_types:
-        node.set_attribute('type', result_type)
+        node.type = result_type
       else:
         # To do: Could also be pointer + integer
         message = Message('error', "Invalid operand type, must be numeric")
         message.set_line(node.token.line)
         self.logger.add_message(message)
-    elif operator == 'MINUS':
+    elif operator == TokenKind.MINUS:
       if result_type in self.numeric_types:
-        node.set_attribute('type', result_type)
+        node.type = result_type
       else:
         # To do: Could also be pointer - integer or pointer - pointer
         # Do we want to allow pointer arithmetic? Perhaps we should
@@ -241,10 +244,10 @@ class Pass4:
 
   def shiftExpression (self, node: AstNode):
     left_node = node.child(0)
-    left_type = left_node.attribute('type')
+    left_type = left_node.type
     if left_type in self.integral_types:
       result_type = left_type
-      node.set_attribute('type', result_type)
+      node.type = result_type
     else:
       message = Message('error', "Invalid operand type, must be integer")
       message.set_line(node.token.line)
@@ -253,12 +256,12 @@ class Pass4:
   def relationalExpression (self, node: AstNode):
     left_node  = node.child(0)
     right_node = node.child(1)
-    left_type  = left_node.attribute('type')
-    right_type = right_node.attribute('type')
+    left_type  = left_node.type
+    right_type = right_node.type
     # To do: Need to allow for pointers too
     if left_type in self.numeric_types and right_type in self.numeric_types:
       result_type = PrimitiveType.BOOL.value
-      node.set_attribute('type', result_type)
+      node.type = result_type
     else:
       message = Message('error', "Invalid operand type, must be numeric")
       message.set_line(node.token.line)
@@ -267,14 +270,14 @@ class Pass4:
   def equalityExpression (self, node: AstNode):
     left_node  = node.child(0)
     right_node = node.child(1)
-    left_type  = left_node.attribute('type')
-    right_type = right_node.attribute('type')
+    left_type  = left_node.type
+    right_type = right_node.type
     # To do: Need to allow for pointers too
     left_cond  = left_type  in self.numeric_types or left_type  == PrimitiveType.BOOL.value
     right_cond = right_type in self.numeric_types or right_type == PrimitiveType.BOOL.value
     if left_cond and right_cond:
       result_type = PrimitiveType.BOOL.value
-      node.set_attribute('type', result_type)
+      node.type = result_type
     else:
       message = Message('error', "Invalid operand type, must be numeric or boolean")
       message.set_line(node.token.line)
@@ -282,10 +285,10 @@ class Pass4:
 
   def bitwiseExpression (self, node: AstNode):
     left_node = node.child(0)
-    left_type = left_node.attribute('type')
+    left_type = left_node.type
     if left_type in self.integral_types:
       result_type = left_type
-      node.set_attribute('type', result_type)
+      node.type = result_type
     else:
       message = Message('error', "Invalid operand type, must be integer")
       message.set_line(node.token.line)
@@ -294,23 +297,21 @@ class Pass4:
   # UNARY EXPRESSION
 
   def unaryExpression (self, node: AstNode):
-    # Compute sub-expression type
-    operand_node  = node.child()
-    self.expression(operand_node)
+    # Sub-expression type is already computed
     self.usual_unary_conversions(node)
     match node.token.kind:
-      case 'TILDE':
+      case TokenKind.TILDE:
         self.bitwiseNegationExpression(node)
-      case 'NOT':
+      case TokenKind.EXCLAMATION:
         self.logicalNegationExpression(node)
-      case 'MINUS':
+      case TokenKind.MINUS:
         self.unaryMinusExpression(node)
-      case 'PLUS':
+      case TokenKind.PLUS:
         self.unaryPlusExpression(node)
 
   def usual_unary_conversions (self, node: AstNode):
     child_node  = node.child()
-    child_type  = child_node.attribute('type')
+    child_type  = child_node.type
     # Rule 1: If operand is of signed integral type with rank less
     # than int32, then promote it to type int32.
     if child_type in [ INT8, INT16 ]:
@@ -325,10 +326,10 @@ class Pass4:
 
   def bitwiseNegationExpression (self, node: AstNode):
     operand_node = node.child()
-    operand_type = operand_node.attribute('type')
+    operand_type = operand_node.type
     if operand_type in self.integral_types:
       result_type = operand_type
-      node.set_attribute('type', result_type)
+      node.type = result_type
     else:
       message = Message('error', "Invalid operand type, must be integral")
       message.set_line(node.token.line)
@@ -336,19 +337,19 @@ class Pass4:
 
   def logicalNegationExpression (self, node: AstNode):
     operand_node = node.child()
-    operand_type = operand_node.attribute('type')
+    operand_type = operand_node.type
     match operand_type:
       case PrimitiveTypeNode():
         if operand_type in (self.numeric_types + [ NULL_T, BOOL ]):
           result_type = PrimitiveType.BOOL.value
-          node.set_attribute('type', result_type)
+          node.type = result_type
         else:
           message = Message('error', "Invalid operand type, must be boolean, numeric, or pointer")
           message.set_line(node.token.line)
           self.logger.add_message(message)
       case PointerTypeNode():
           result_type = PrimitiveType.BOOL.value
-          node.set_attribute('type', result_type)
+          node.type = result_type
       case _:
         message = Message('error', "Invalid operand type, must be boolean, numeric, or pointer")
         message.set_line(node.token.line)
@@ -356,10 +357,10 @@ class Pass4:
 
   def unaryMinusExpression (self, node: AstNode):
     child_node = node.child()
-    child_type = child_node.attribute('type')
+    child_type = child_node.type
     if child_type in self.numeric_types:
       result_type = child_type
-      node.set_attribute('type', result_type)
+      node.type = result_type
     else:
       message = Message('error', "Invalid operand type, must be numeric")
       message.set_line(node.token.line)
@@ -367,10 +368,10 @@ class Pass4:
 
   def unaryPlusExpression (self, node: AstNode):
     child_node = node.child()
-    child_type = child_node.attribute('type')
+    child_type = child_node.type
     if child_type in self.numeric_types:
       result_type = child_type
-      node.set_attribute('type', result_type)
+      node.type = result_type
     else:
       message = Message('error', "Invalid operand type, must be numeric")
       message.set_line(node.token.line)
@@ -379,7 +380,7 @@ class Pass4:
   def promoteExpression (self, node: AstNode, dest_type: TypeNode) -> AstNode:
     cast_node = AstNode('PromoteCast')
     cast_node.add_child(node)
-    cast_node.set_attribute('type', dest_type)
+    cast_node.type = dest_type
     return cast_node
 
   # def widenRightExpression (self, node: AstNode):
@@ -388,7 +389,7 @@ class Pass4:
   #   left_node  = node.child(1)
   #   cast_node = AstNode('WidenCast')
   #   cast_node.add_child(right_node)
-  #   cast_node.set_attribute('type', left_node.attribute('type'))
+  #   cast_node.type = left_node.type
   #   node.set_child(1, cast_node)
 
   # def widenLeftExpression (self, node: AstNode):
@@ -397,22 +398,22 @@ class Pass4:
   #   left_node  = node.child(1)
   #   cast_node = AstNode('WidenCast')
   #   cast_node.add_child(left_node)
-  #   cast_node.set_attribute('type', right_node.attribute('type'))
+  #   cast_node.type = right_node.type
   #   node.set_child(0, cast_node)
 
   def booleanLiteral (self, node: AstNode):
     type = PrimitiveType.BOOL.value
-    node.set_attribute('type', type)
+    node.type = type
 
   def floatingPointLiteral (self, node: AstNode):
     # Note: A value of type float64 can never be implicitly narrowed to type float32
     type_lookup = {
-      'FLOAT32_LITERAL': PrimitiveType.FLOAT32.value,
-      'FLOAT64_LITERAL': PrimitiveType.FLOAT64.value,
+      TokenKind.FLOAT32_LITERAL: PrimitiveType.FLOAT32.value,
+      TokenKind.FLOAT64_LITERAL: PrimitiveType.FLOAT64.value,
     }
     # Map literal value's token kind to its corresponding primitive type
     type = type_lookup[node.token.kind]
-    node.set_attribute('type', type)
+    node.type = type
 
   def integerLiteral (self, node: AstNode):
     # https://learn.microsoft.com/en-us/dotnet/csharp/language-reference/builtin-types/numeric-conversions
@@ -420,27 +421,26 @@ class Pass4:
     # So an integer literal (without suffix) will always be an int32. However, during semantic
     # analysis, we may narrow it if the value is within the range of the destination.
     type_lookup = {
-      'INT32_LITERAL':  PrimitiveType.INT32.value,
-      'INT64_LITERAL':  PrimitiveType.INT64.value,
-      'UINT32_LITERAL': PrimitiveType.UINT32.value,
-      'UINT64_LITERAL': PrimitiveType.UINT64.value,
+      TokenKind.INT32_LITERAL:  PrimitiveType.INT32.value,
+      TokenKind.INT64_LITERAL:  PrimitiveType.INT64.value,
+      TokenKind.UINT32_LITERAL: PrimitiveType.UINT32.value,
+      TokenKind.UINT64_LITERAL: PrimitiveType.UINT64.value,
     }
     # Map literal value's token kind to its corresponding primitive type
     type = type_lookup[node.token.kind]
-    node.set_attribute('type', type)
+    node.type = type
 
   def nullLiteral (self, node: AstNode):
     type = PrimitiveType.NULL_T.value
-    node.set_attribute('type', type)
+    node.type = type
 
   def name (self, node: AstNode):
     # Look up name in symbol table
     name = node.token.lexeme
-    scope: Scope = node.attribute('scope')
+    scope: Scope = node.scope
     symbol: VariableSymbol = scope.resolve(name)
     if symbol:
-      print(f"The symbol type for {name} is {symbol.type}")
-      node.set_attribute('type', symbol.type)
+      node.type = symbol.type
     else:
       # To do, provide proper error message
       print(f"error: name {name} not declared.")
@@ -5,11 +5,13 @@ from collections import deque
 from graphlib import TopologicalSorter
 
 from co.ast import AstNode
+from co.ast.Traversal import dependencies
 from co.types import TypeNode, ArrayTypeNode, PointerTypeNode, PrimitiveTypeNode
 from co.st import Scope, FunctionSymbol, VariableSymbol, TypeSymbol
 from co.st import ClassSymbol, PrimitiveSymbol, StructureSymbol, UnionSymbol
 from co.reader import Logger, Message
 from co.reader import PrimitiveType
+from co.reader.TokenKind import TokenKind
 
 # Purpose:
 
@@ -33,6 +35,9 @@ from co.reader import PrimitiveType
 
 class Pass4a:
 
+  # Passes that must have run first
+  requires = ['Pass2']
+
   def __init__ (self, root_node: AstNode):
     self.root_node = root_node
     self.logger = Logger()
@@ -71,21 +76,21 @@ class Pass4a:
     if spec_node.child_count():
       self.typeRoot(spec_node)
       name_node = node.child(0)
-      name_node.set_attribute('type', spec_node.attribute('type'))
+      name_node.type = spec_node.type
       self.variableName(name_node)
     else:
       init_node = node.child(2)
       self.expressionRoot(init_node)
       # Dep list is a list of symbols that this declaration is
       # dependent upon.
-      dep_list: List[AstNode] = init_node.attribute('dep_list')
+      dep_list: List[AstNode] = init_node.dep_list
       for dep_node in dep_list:
         self.sorter.add(node, dep_node)
 
   def variableName (self, node: AstNode):
     # Update symbol
-    symbol: VariableSymbol = node.attribute('symbol')
-    type = node.attribute('type')
+    symbol: VariableSymbol = node.symbol
+    type = node.type
     symbol.set_type(type)
 
   # We aren't trying to compute the type yet. We just need to build a
@@ -97,47 +102,17 @@ class Pass4a:
 
   def expressionRoot (self, node: AstNode):
     dep_list = self.expression(node.child())
-    node.set_attribute('dep_list', dep_list)
+    node.dep_list = dep_list
 
   def expression (self, node: AstNode) -> List[AstNode]:
-    # Dispatch method
-    match node.kind:
-      case 'BinaryExpression':
-        return self.binaryExpression(node)
-      case 'UnaryExpression':
-        return self.unaryExpression(node)
-      case 'Name':
-        return self.name(node)
-      case _:
-        return []
-
-  def binaryExpression (self, node: AstNode) -> List[AstNode]:
-    return self.expression(node.child(0)) + self.expression(node.child(1))
-
-  def unaryExpression (self, node: AstNode) -> List[AstNode]:
-    return self.expression(node.child())
-
-  def name (self, node: AstNode) -> List[AstNode]:
-    # Look up name in symbol table
-    name = node.token.lexeme
-    scope: Scope = node.attribute('scope')
-    symbol: VariableSymbol = scope.resolve(name)
-    if symbol:
-      # Add this node as dependency of current declaration node
-      return [ symbol.declaration ]
-    else:
-    # It's possible that the name wasn't declared, which is an error.
-    # However, we might just wait until pass4b to actually print this
-    # error because that pass handles all name expressions, not just
-    # those without type specifiers.
-    # print(f"error: name {name} not declared.")
-      return []
+    # Dependencies of the names in the expression, in source order
+    return dependencies(node)
 
 # TYPES
 
   def typeRoot (self, node: AstNode):
     type = self.type(node.child())
-    node.set_attribute('type', type)
+    node.type = type
 
   def type (self, node: AstNode) -> TypeNode:
     match node.kind:
@@ -176,29 +151,29 @@ class Pass4a:
 
   def primitiveType (self, node: AstNode) -> TypeNode:
     match node.token.kind:
-      case 'NULL_T':
+      case TokenKind.NULL_T:
         return PrimitiveType.NULL_T.value
-      case 'BOOL':
+      case TokenKind.BOOL:
         return PrimitiveType.BOOL.value
-      case 'UINT8':
+      case TokenKind.UINT8:
         return PrimitiveType.UINT8.value
-      case 'UINT16':
+      case TokenKind.UINT16:
         return PrimitiveType.UINT16.value
-      case 'UINT32':
+      case TokenKind.UINT32:
         return PrimitiveType.UINT32.value
-      case 'UINT64':
+      case TokenKind.UINT64:
         return PrimitiveType.UINT64.value
-      case 'INT8':
+      case TokenKind.INT8:
         return PrimitiveType.INT8.value
-      case 'INT16':
+      case TokenKind.INT16:
         return PrimitiveType.INT16.value
-      case 'INT32':
+      case TokenKind.INT32:
         return PrimitiveType.INT32.value
-      case 'INT64':
+      case TokenKind.INT64:
         return PrimitiveType.INT64.value
-      case 'FLOAT32':
+      case TokenKind.FLOAT32:
         return PrimitiveType.FLOAT32.value
-      case 'FLOAT64':
+      case TokenKind.FLOAT64:
         return PrimitiveType.FLOAT64.value
       case _:
         print("error: Invalid primitive type")
@@ -30,6 +30,9 @@ from co.reader import Pass4
 
 class Pass4b (Pass4):
 
+  # Passes that must have run first
+  requires = ['Pass4a']
+
   def __init__ (self, root_node: AstNode, decl_list: List[AstNode]):
     super().__init__(root_node)
     self.decl_list = decl_list
@@ -54,12 +57,12 @@ class Pass4b (Pass4):
     spec_node = node.child(1)
     init_node = node.child(2)
     self.expressionRoot(init_node)
-    spec_node.set_attribute('type', init_node.attribute('type'))
-    name_node.set_attribute('type', spec_node.attribute('type'))
+    spec_node.type = init_node.type
+    name_node.type = spec_node.type
     self.variableName(name_node)
 
   def variableName (self, node: AstNode):
     # Update symbol
-    symbol: VariableSymbol = node.attribute('symbol')
-    type = node.attribute('type')
+    symbol: VariableSymbol = node.symbol
+    type = node.type
     symbol.set_type(type)
@@ -10,6 +10,7 @@ from co.st import Scope, FunctionSymbol, VariableSymbol, TypeSymbol
 from co.st import ClassSymbol, PrimitiveSymbol, StructureSymbol, UnionSymbol
 from co.reader import Logger, Message
 from co.reader import PrimitiveType
+from co.reader.TokenKind import TokenKind
 from co.reader import Pass4
 
 # Purpose:
@@ -27,6 +28,9 @@ from co.reader import Pass4
 
 class Pass4c (Pass4):
 
+  # Passes that must have run first
+  requires = ['Pass4b']
+
   def __init__ (self, root_node: AstNode):
     super().__init__(root_node)
 
@@ -59,7 +63,6 @@ class Pass4c (Pass4):
       self.statement(stmt_node)
 
   def variableDeclaration (self, node: AstNode):
-    print("var decl")
     spec_node = node.child(1)
     has_type_specifier = spec_node.child_count()
     has_initializer = node.child_count() == 3
@@ -68,7 +71,7 @@ class Pass4c (Pass4):
       # preparation for updating symbol table entry.
       self.typeRoot(spec_node)
       name_node = node.child(0)
-      name_node.set_attribute('type', spec_node.attribute('type'))
+      name_node.type = spec_node.type
       self.variableName(name_node)
       if has_initializer:
         # Compute type of initializer
@@ -76,15 +79,14 @@ class Pass4c (Pass4):
         self.expressionRoot(init_node)
     else:
       if has_initializer:
-        print("HERE")
         # Compute type of initializer. Inherit type to spec node, and
         # then name node in preparation for updating symbol table
         # entry.
         init_node = node.child(2)
         self.expressionRoot(init_node)
-        spec_node.set_attribute('type', init_node.attribute('type'))
+        spec_node.type = init_node.type
         name_node = node.child(0)
-        name_node.set_attribute('type', spec_node.attribute('type'))
+        name_node.type = spec_node.type
         self.variableName(name_node)
       else:
         # This is an error condition. This scenario should never be
@@ -93,8 +95,8 @@ class Pass4c (Pass4):
 
   def variableName (self, node: AstNode):
     # Update symbol
-    symbol: VariableSymbol = node.attribute('symbol')
-    type = node.attribute('type')
+    symbol: VariableSymbol = node.symbol
+    type = node.type
     symbol.set_type(type)
 
   # STATEMENTS
@@ -114,7 +116,7 @@ class Pass4c (Pass4):
 
   def typeRoot (self, node: AstNode):
     type = self.type(node.child())
-    node.set_attribute('type', type)
+    node.type = type
 
   def type (self, node: AstNode) -> TypeNode:
     match node.kind:
@@ -153,29 +155,29 @@ class Pass4c (Pass4):
 
   def primitiveType (self, node: AstNode) -> TypeNode:
     match node.token.kind:
-      case 'NULL_T':
+      case TokenKind.NULL_T:
         return PrimitiveType.NULL_T.value
-      case 'BOOL':
+      case TokenKind.BOOL:
         return PrimitiveType.BOOL.value
-      case 'UINT8':
+      case TokenKind.UINT8:
         return PrimitiveType.UINT8.value
-      case 'UINT16':
+      case TokenKind.UINT16:
         return PrimitiveType.UINT16.value
-      case 'UINT32':
+      case TokenKind.UINT32:
         return PrimitiveType.UINT32.value
-      case 'UINT64':
+      case TokenKind.UINT64:
         return PrimitiveType.UINT64.value
-      case 'INT8':
+      case TokenKind.INT8:
         return PrimitiveType.INT8.value
-      case 'INT16':
+      case TokenKind.INT16:
         return PrimitiveType.INT16.value
-      case 'INT32':
+      case TokenKind.INT32:
         return PrimitiveType.INT32.value
-      case 'INT64':
+      case TokenKind.INT64:
         return PrimitiveType.INT64.value
-      case 'FLOAT32':
+      case TokenKind.FLOAT32:
         return PrimitiveType.FLOAT32.value
-      case 'FLOAT64':
+      case TokenKind.FLOAT64:
         return PrimitiveType.FLOAT64.value
       case _:
         print("error: Invalid primitive type")
@@ -4,7 +4,7 @@ from collections import deque
 
 from graphlib import TopologicalSorter
 
-from co.ast import AstNode
+from co.ast import AstNode, Walker
 from co.types import TypeNode, ArrayTypeNode, PointerTypeNode, PrimitiveTypeNode
 from co.st import Scope, FunctionSymbol, VariableSymbol, TypeSymbol
 from co.st import ClassSymbol, PrimitiveSymbol, StructureSymbol, UnionSymbol
@@ -17,28 +17,33 @@ from co.reader import Pass4
 # For each expression, determine if its type has already been
 # computed. If not, compute the type of the expression.
 
-class Pass4d (Pass4):
+class Pass4d (Pass4, Walker):
+
+  # Passes that must have run first
+  requires = ['Pass4c']
+
+  pre_order = {
+    'ExpressionRoot': 'expressionRoot',
+  }
 
   def __init__ (self, root_node: AstNode):
     super().__init__(root_node)
 
   def process (self):
+    self.begin()
+    self.walk(self.root_node)
+    self.finish()
+
+  def begin (self):
     print("Pass 4d")
-    self.search(self.root_node)
-    self.logger.print()
 
-  def search (self, node: AstNode):
-    if node.kind == 'ExpressionRoot':
-      self.expressionRoot(node)
-    else:
-      for child_node in node.children:
-        self.search(child_node)
+  def finish (self):
+    self.logger.print()
 
   # EXPRESSIONS
 
   def expressionRoot (self, node: AstNode):
-    if not node.attribute('type'):
-      print("Expr root!")
+    if not node.type:
       expr_node = node.child()
       self.expression(expr_node)
-      node.set_attribute('type', expr_node.attribute('type'))
+      node.type = expr_node.type
@@ -19,6 +19,9 @@ from co.reader import Pass4
 
 class Pass4e:
 
+  # Passes that must have run first
+  requires = ['Pass4d']
+
   def __init__ (self, root_node: AstNode):
     self.root_node = root_node
     self.logger = Logger()
@@ -44,8 +47,8 @@ class Pass4e:
     print("GOT HERE...")
     spec_node = node.child(1)
     init_node = node.child(2)
-    t1 = spec_node.attribute('type')
-    t2 = init_node.attribute('type')
+    t1 = spec_node.type
+    t2 = init_node.type
     print(t1)
     print(t2)
 
@@ -69,9 +72,9 @@ class Pass4e:
   #   if spec_node.kind == 'AlphaType':
   #     init_node = node.child(2)
   #     self.expressionRoot(init_node)
-  #     spec_node.set_attribute('type', init_node.attribute('type'))
-  #     symbol: VariableSymbol = name_node.attribute('symbol')
-  #     symbol.set_type(spec_node.attribute('type'))
+  #     spec_node.type = init_node.type
+  #     symbol: VariableSymbol = name_node.symbol
+  #     symbol.set_type(spec_node.type)
 
   # STATEMENTS
 
@@ -1,7 +1,13 @@
-from co.ast import AstNode
+from co.ast import AstNode, Walker
+from co.ast.Traversal import post_order
 from co.st import Scope, FunctionSymbol, VariableSymbol
 from co.st import ClassSymbol, PrimitiveSymbol, StructureSymbol, UnionSymbol
 
+LITERAL_KINDS = frozenset([
+  'BooleanLiteral',
+  'FloatingPointLiteral',
+  'IntegerLiteral'
+])
 
 # Purpose:
 # 1. Determine if expressions are compile-time constants
@@ -13,67 +19,61 @@ from co.st import ClassSymbol, PrimitiveSymbol, StructureSymbol, UnionSymbol
 # 'is_constant' attribute for each node, in bottom-up fashion, ending
 # with the expression root node itself.
 
-class Pass5a:
+class Pass5a (Walker):
+
+  # Passes that must have run first
+  requires = ['Pass1']
+
+  pre_order = {
+    'ExpressionRoot': 'expressionRoot',
+  }
 
   def __init__ (self, root_node: AstNode):
     self.root_node = root_node
 
   def process (self):
     # Search for expression roots
-    self.search(self.root_node)
-
-  def search (self, node: AstNode):
-    if node.kind == 'ExpressionRoot':
-      self.expressionRoot(node)
-    else:
-      for child_node in node.children:
-        if child_node:
-          self.search(child_node)
+    self.walk(self.root_node)
 
   # EXPRESSIONS
 
   def expressionRoot (self, node: AstNode):
     expr_node = node.child()
     self.expression(expr_node)
-    result = expr_node.attribute('is_constant')
-    node.set_attribute('is_constant', result)
+    result = expr_node.is_constant
+    node.is_constant = result
 
   def expression (self, node: AstNode):
-    # Dispatch method
-    match node.kind:
-      case 'BinaryExpression':
-        self.binaryExpression(node)
-      case 'UnaryExpression':
-        self.unaryExpression(node)
-      case 'Name':
-        self.name(node)
-      case kind if kind in [
-        'BooleanLiteral',
-        'FloatingPointLiteral',
-        'IntegerLiteral'
-      ]:
-        self.literal(node)
+    # Dispatch method. The nodes come from post_order(), operands
+    # before their operators, so the handlers below do not recurse.
+    for expr_node in post_order(node):
+      match expr_node.kind:
+        case 'BinaryExpression':
+          self.binaryExpression(expr_node)
+        case 'UnaryExpression':
+          self.unaryExpression(expr_node)
+        case 'Name':
+          self.name(expr_node)
+        case kind if kind in LITERAL_KINDS:
+          self.literal(expr_node)
 
   def binaryExpression (self, node: AstNode):
     left_node  = node.child(0)
     right_node = node.child(1)
-    self.expression(left_node)
-    self.expression(right_node)
-    result = left_node.attribute('is_constant') and right_node.attribute('is_constant')
-    node.set_attribute('is_constant', result)
+    result = left_node.is_constant and right_node.is_constant
+    node.is_constant = result
 
   def name (self, node: AstNode):
-    scope: Scope = node.attribute('scope')
+    scope: Scope = node.scope
     symbol: VariableSymbol = scope.resolve(node.token.lexeme)
     result = symbol.constant_flag
-    node.set_attribute('is_constant', result)
+    node.is_constant = result
 
   def literal (self, node: AstNode):
     result = True
-    node.set_attribute('is_constant', result)
+    node.is_constant = result
 
   def unaryExpression (self, node: AstNode):
     expr_node = node.child()
-    self.expression(expr_node)
-    result = expr_node.attribute('is_constant')
-    node.set_attribute('is_constant', result)
+    result = expr_node.is_constant
+    node.is_constant = result
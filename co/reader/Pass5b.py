@@ -1,4 +1,4 @@
-from co.ast import AstNode
+from co.ast import AstNode, Walker
 from co.reader import Logger, Message
 from co.st import Scope, FunctionSymbol, VariableSymbol
 from co.st import ClassSymbol, PrimitiveSymbol, StructureSymbol, UnionSymbol
@@ -22,7 +22,15 @@ from co.st import ClassSymbol, PrimitiveSymbol, StructureSymbol, UnionSymbol
 # - A non-final, non-constant global variable does not require an
 #   initializer.
 
-class Pass5b:
+class Pass5b (Walker):
+
+  # Passes that must have run first
+  requires = ['Pass5a']
+
+  pre_order = {
+    'VariableDeclaration': 'variableDeclaration',
+    'ArrayType': 'arrayType',
+  }
 
   def __init__ (self, root_node: AstNode):
     self.root_node = root_node
@@ -32,19 +40,11 @@ class Pass5b:
     # Search for variable declaration nodes. For now just search for
     # any globals, but eventually we need local constant variables
     # too.
-    self.search(self.root_node)
-    self.logger.print()
+    self.walk(self.root_node)
+    self.finish()
 
-  def search (self, node: AstNode):
-    match node.kind:
-      case 'VariableDeclaration':
-        self.variableDeclaration(node)
-      case 'ArrayType':
-        self.arrayType(node)
-    # Continue search
-    for child_node in node.children:
-      if child_node:
-        self.search(child_node)
+  def finish (self):
+    self.logger.print()
 
   # DECLARATIONS
 
@@ -53,7 +53,7 @@ class Pass5b:
     # Ensure initializer expression evaluates to constant
     if node.child_count() == 3:
       init_node = node.child(2)
-      is_constant = init_node.attribute('is_constant')
+      is_constant = init_node.is_constant
       if not is_constant:
         message = Message('error', "global initializer expression must be constant")
         message.set_line(init_node.child().token.line)
@@ -64,7 +64,7 @@ class Pass5b:
   def arrayType (self, node: AstNode):
     # Ensure array size expression evaluates to constant
     size_node = node.child(0)
-    is_constant = size_node.attribute('is_constant')
+    is_constant = size_node.is_constant
     if not is_constant:
       message = Message('error', "array size must be constant")
       message.set_line(size_node.child().token.line)
@@ -0,0 +1,222 @@
+import inspect
+import json
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+
+from co.ast import AstNode, Walker
+from co.st import Scope
+from co.reader import PassProfile
+
+# Purpose:
+
+# Run the semantic analysis passes over a tree in dependency order. A
+# pass class lists the names of the passes that must have run before
+# it in its 'requires' attribute. Passes that do not depend on each
+# other, and that are written as walkers (see Walker), are run
+# together in a single traversal of the tree.
+
+# Description:
+# Passes are grouped into stages. A pass with no requirements is in
+# stage 0; any other pass is one stage after the latest of its
+# requirements. Within a stage, passes keep the order in which they
+# were added. The walkers of a stage are fused: each one's begin() is
+# called, the tree is walked once for all of them, and then each
+# one's finish() is called. This happens at the point where the first
+# of them would have run. The other passes of the stage run on their
+# own through process().
+
+# Notes:
+#
+# 1. A pass that is a walker must do all of its work in begin(),
+# its visit handlers, and finish(), so that fusing it gives the same
+# result as calling its process().
+#
+# 2. A pass is constructed only when its stage is reached, so a
+# factory can hand it results of passes in earlier stages, e.g.
+#
+#   manager.add(Pass2, lambda: Pass2(root, manager.get('Pass1').builtin_scope))
+#
+# 3. With instrument=True, each pass is measured as it runs (see
+# PassProfile) and report() formats the results as a table or as
+# JSON. Fused passes run as one traversal and are measured together,
+# under their names joined by '+'. Use fuse=False to measure each of
+# them on its own. Without instrument=True, no measuring code runs.
+#
+# 4. To count node visits, the methods of a pass that take a node as
+# their first argument, and its visit handlers, are wrapped for the
+# duration of the pass. To count symbol resolutions and how many were
+# answered by the resolution cache, Scope.resolve is wrapped for the
+# duration of the pass.
+
+class PassManager:
+
+  def __init__ (self, root_node: AstNode, fuse: bool = True, instrument: bool = False):
+    self.root_node = root_node
+    self.fuse = fuse
+    self.instrument = instrument
+    # Measurements, in the order the passes ran
+    self.profiles: List[PassProfile] = []
+    # Pass name to (class, factory), in the order added
+    self.entries: Dict[str, tuple] = {}
+    # Pass name to instance, once created
+    self.instances: Dict[str, object] = {}
+
+  def add (self, pass_class: type, factory: Optional[Callable[[], object]] = None):
+    name = pass_class.__name__
+    for required in getattr(pass_class, 'requires', []):
+      if required not in self.entries:
+        raise Exception(f"{name} requires {required}, which has not been added")
+    if factory is None:
+      factory = lambda: pass_class(self.root_node)
+    self.entries[name] = (pass_class, factory)
+
+  def get (self, name: str):
+    return self.instances[name]
+
+  def stages (self) -> List[List[str]]:
+    stage_of: Dict[str, int] = {}
+    for name, (pass_class, _) in self.entries.items():
+      requires = getattr(pass_class, 'requires', [])
+      stage_of[name] = max((stage_of[required] + 1 for required in requires), default=0)
+    result = [[] for _ in range(max(stage_of.values(), default=-1) + 1)]
+    for name, stage in stage_of.items():
+      result[stage].append(name)
+    return result
+
+  def run (self):
+    started_tracing = self.instrument and not tracemalloc.is_tracing()
+    if started_tracing:
+      tracemalloc.start()
+    try:
+      for stage in self.stages():
+        self.run_stage(stage)
+    finally:
+      if started_tracing:
+        tracemalloc.stop()
+
+  def run_stage (self, stage: List[str]):
+    for name in stage:
+      self.instances[name] = self.entries[name][1]()
+    walkers = []
+    if self.fuse:
+      walkers = [
+        self.instances[name] for name in stage
+        if isinstance(self.instances[name], Walker)
+      ]
+    if len(walkers) < 2:
+      walkers = []
+    for name in stage:
+      instance = self.instances[name]
+      if instance not in walkers:
+        if self.instrument:
+          self.measure(name, [instance], instance.process)
+        else:
+          instance.process()
+      elif instance is walkers[0]:
+        fused_name = '+'.join(type(walker).__name__ for walker in walkers)
+        if self.instrument:
+          self.measure(fused_name, walkers, lambda: self.run_fused(walkers))
+        else:
+          self.run_fused(walkers)
+
+  def run_fused (self, walkers: List[Walker]):
+    for walker in walkers:
+      walker.begin()
+    Walker.walk_all(walkers, self.root_node)
+    for walker in walkers:
+      walker.finish()
+
+  # INSTRUMENTATION
+
+  def measure (self, name: str, instances: List[object], action: Callable[[], None]):
+    profile = PassProfile(name)
+    for instance in instances:
+      self.count_visits(instance, profile)
+    resolve = Scope.resolve
+    depth = 0
+    def counting_resolve (scope: Scope, symbol_name: str, recurse: bool = True):
+      # Only count the outermost call, not those on enclosing scopes
+      nonlocal depth
+      if depth == 0:
+        profile.symbols_resolved += 1
+        if recurse:
+          profile.cache_lookups += 1
+          if scope.is_cached(symbol_name):
+            profile.cache_hits += 1
+      depth += 1
+      try:
+        return resolve(scope, symbol_name, recurse)
+      finally:
+        depth -= 1
+    Scope.resolve = counting_resolve
+    try:
+      tracemalloc.reset_peak()
+      start_bytes, _ = tracemalloc.get_traced_memory()
+      start = time.perf_counter()
+      action()
+      profile.seconds = time.perf_counter() - start
+      _, peak_bytes = tracemalloc.get_traced_memory()
+      profile.peak_bytes = max(0, peak_bytes - start_bytes)
+    finally:
+      Scope.resolve = resolve
+      for instance in instances:
+        for attribute in ('pre_table', 'post_table', *self.node_methods(type(instance))):
+          instance.__dict__.pop(attribute, None)
+    profile.last_node = None
+    self.profiles.append(profile)
+
+  @staticmethod
+  def node_methods (pass_class: type) -> List[str]:
+    # Names of methods whose first argument after self is a node
+    names = []
+    for cls in pass_class.__mro__:
+      if cls is object or cls is Walker:
+        continue
+      for name, function in vars(cls).items():
+        if inspect.isfunction(function) and name not in names:
+          parameters = list(inspect.signature(function).parameters)
+          if parameters[1:2] == ['node']:
+            names.append(name)
+    return names
+
+  def count_visits (self, instance: object, profile: PassProfile):
+    visit = profile.visit
+    def counted_method (method):
+      def wrapper (node, *args, **kwargs):
+        visit(node)
+        return method(node, *args, **kwargs)
+      return wrapper
+    def counted_handler (function):
+      def wrapper (walker, node):
+        visit(node)
+        return function(walker, node)
+      return wrapper
+    for name in self.node_methods(type(instance)):
+      setattr(instance, name, counted_method(getattr(instance, name)))
+    if isinstance(instance, Walker):
+      instance.pre_table = { kind: counted_handler(function) for kind, function in instance.pre_table.items() }
+      instance.post_table = { kind: counted_handler(function) for kind, function in instance.post_table.items() }
+
+  def report (self, format: str = 'table') -> str:
+    if format == 'json':
+      return json.dumps({ 'passes': [profile.as_dict() for profile in self.profiles] }, indent=2)
+    if format != 'table':
+      raise Exception(f"unknown report format '{format}'")
+    hits = sum(profile.cache_hits for profile in self.profiles)
+    lookups = sum(profile.cache_lookups for profile in self.profiles)
+    width = max([len('pass'), len('total')] + [len(profile.name) for profile in self.profiles])
+    lines = [f"{'pass':<{width}}{'time (ms)':>12}{'peak (KiB)':>12}{'nodes':>10}{'symbols':>10}{'hit %':>8}"]
+    for profile in self.profiles:
+      lines.append(
+        f"{profile.name:<{width}}{profile.seconds * 1000:>12.2f}{profile.peak_bytes / 1024:>12.1f}"
+        f"{profile.nodes_visited:>10}{profile.symbols_resolved:>10}{profile.hit_rate() * 100:>8.1f}"
+      )
+    lines.append(
+      f"{'total':<{width}}{sum(profile.seconds for profile in self.profiles) * 1000:>12.2f}"
+      f"{max([profile.peak_bytes for profile in self.profiles], default=0) / 1024:>12.1f}"
+      f"{sum(profile.nodes_visited for profile in self.profiles):>10}"
+      f"{sum(profile.symbols_resolved for profile in self.profiles):>10}"
+      f"{hits / lookups * 100 if lookups else 0.0:>8.1f}"
+    )
+    return '\n'.join(lines)
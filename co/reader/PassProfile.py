@@ -0,0 +1,57 @@
+from co.ast import AstNode
+
+# Purpose:
+
+# Measurements taken by the PassManager for one pass, or for a group of
+# passes that were fused into one traversal, when it is created with
+# instrument=True.
+
+# Notes:
+#
+# 1. seconds is wall time. Since tracemalloc is tracing while passes
+# are instrumented, this is slower than an uninstrumented run, but it
+# can be compared between instrumented runs.
+#
+# 2. peak_bytes is the highest amount of memory held during the pass
+# beyond what was held when it started, as seen by tracemalloc.
+#
+# 3. nodes_visited counts the nodes handed to the pass's node methods
+# and visit handlers. A node that is passed on from one method to the
+# next, e.g. from expression() to binaryExpression(), counts once.
+#
+# 4. symbols_resolved counts calls to Scope.resolve, not counting the
+# calls it makes itself on enclosing scopes. Of those that look through
+# enclosing scopes, cache_hits counts the ones answered from the
+# scope's resolution cache, and cache_lookups counts them all.
+
+class PassProfile:
+
+  def __init__ (self, name: str):
+    self.name = name
+    self.seconds = 0.0
+    self.peak_bytes = 0
+    self.nodes_visited = 0
+    self.symbols_resolved = 0
+    self.cache_hits = 0
+    self.cache_lookups = 0
+    self.last_node: AstNode = None
+
+  def visit (self, node: AstNode):
+    if node is not self.last_node:
+      self.last_node = node
+      self.nodes_visited += 1
+
+  def hit_rate (self) -> float:
+    return self.cache_hits / self.cache_lookups if self.cache_lookups else 0.0
+
+  def as_dict (self) -> dict:
+    return {
+      'name': self.name,
+      'seconds': self.seconds,
+      'peak_bytes': self.peak_bytes,
+      'nodes_visited': self.nodes_visited,
+      'symbols_resolved': self.symbols_resolved,
+      'cache_hits': self.cache_hits,
+      'cache_lookups': self.cache_lookups,
+      'cache_hit_rate': self.hit_rate(),
+    }
@@ -0,0 +1,174 @@
+import io
+from typing import TextIO
+
+from co import reader
+from co.reader.LineIndex import LineIndex
+from co.reader.NumberLiteral import decode_number
+from co.reader.TableLexer import TableLexer, TOKEN_PATTERN, OPERATOR_LOOKUP
+from co.reader.TableLexer import IDENTIFIER, BLOCK_COMMENT, FRACTION, OPERATOR, NUMBER
+from co.reader.TableLexer import STRING, CHARACTER, CARRIAGE_RETURN, OTHER, IDENTIFIER_KIND
+from co.reader.TokenBuffer import TokenBuffer
+from co.reader.TokenKind import TokenKind
+
+# Purpose:
+
+# Table-driven lexer over a stream of text, such as a file object,
+# which is read in chunks instead of all at once. Only a window of the
+# input is kept: the unscanned rest of the previous chunk followed by
+# the next chunk. Scanning therefore needs memory for about one chunk
+# however long the input is; memory for what is made from the tokens,
+# such as an AST, is up to the caller. The lexer is also an iterator
+# over its tokens, which the parser can consume directly.
+
+# Notes:
+#
+# 1. A match that reaches the end of the window may continue in the
+# next chunk (an identifier, a number, an operator, a comment, a string
+# or a carriage return before a line feed). It is scanned again once
+# the next chunk has been appended. Any other match is final, since no
+# pattern looks more than one character past its match.
+#
+# 2. Token positions are offsets into the whole stream. The line index
+# grows as chunks are read, by one entry (four bytes) per line, and the
+# string pool keeps one string per distinct identifier. Neither holds
+# on to the text itself.
+#
+# 3. A token handed to the character-at-a-time engine (see TableLexer)
+# is only scanned with at least LOOKAHEAD characters of input after it,
+# or the rest of the input if that is less, so that its error recovery
+# sees the same text as with the whole input.
+#
+# 4. An unterminated string, character literal or block comment runs
+# to the next quote or to the end of the input, as in the other
+# engines, and the window grows to hold it.
+#
+# 5. Streams are read once, front to back. Token buffers and relexing
+# need the whole input; use TableLexer for those.
+
+CHUNK_SIZE = 64 * 1024
+
+LOOKAHEAD = 4096
+
+class StreamLexer (TableLexer):
+
+  def __init__ (self, chunk_size: int = CHUNK_SIZE):
+    super().__init__()
+    self.chunk_size = chunk_size
+    self.file: TextIO = io.StringIO()
+    # Stream offset of the first character of the window (input)
+    self.base = 0
+
+  def __iter__ (self):
+    return self.stream
+
+  def setInput (self, input: str, line_index: LineIndex = None):
+    # A string is streamed like any other text
+    self.setInputStream(io.StringIO(input, newline=''))
+
+  def setInputStream (self, file: TextIO):
+    # Scan text read from file, which should be opened with newline=''
+    # to leave line endings for the lexer to check
+    self.file = file
+    self.input = self.data = ''
+    self.base = 0
+    self.line_index = LineIndex('')
+    self.position = 0
+    self.current = 'EOF'
+    self.stream = self.scan()
+
+  def setInputFile (self, path: str):
+    self.setInputStream(open(path, 'r', newline=''))
+
+  def tokenize_all (self) -> TokenBuffer:
+    raise Exception("A token buffer needs the whole input. Use TableLexer instead.")
+
+  def relex (self, buffer: TokenBuffer, offset: int, removed: int, inserted: str) -> range:
+    raise Exception("Relexing needs the whole input. Use TableLexer instead.")
+
+  def scan (self):
+    # Generator over the tokens of the stream. The window is refilled
+    # whenever the next token may not be complete in it.
+    read = self.file.read
+    chunk_size = self.chunk_size
+    line_index = self.line_index
+    Token = reader.Token
+    strings = self.pool.strings
+    lookup_string = strings.get
+    lookup_keyword = self.pool.keywords.get
+    lookup_operator = OPERATOR_LOOKUP.__getitem__
+    input = ''
+    base = 0
+    position = 0
+    final = False
+    while not final:
+      chunk = read(chunk_size)
+      final = not chunk
+      line_index.extend(chunk, base + len(input))
+      base += position
+      input = input[position:] + chunk
+      position = 0
+      length = len(input)
+      self.input = self.data = input
+      self.base = base
+      restart = True
+      # Error recovery can leave the character-at-a-time engine past the
+      # end of the input
+      while restart and position <= length:
+        restart = False
+        for m in TOKEN_PATTERN.finditer(input, position):
+          end = m.end()
+          if end == length and not final:
+            # May continue in the next chunk (1)
+            break
+          group = m.lastindex
+          if group == IDENTIFIER:
+            id = input[m.start(group):end]
+            pooled = lookup_string(id)
+            if pooled is None:
+              strings[id] = id
+              yield Token(IDENTIFIER_KIND, id, base + end, line_index)
+            else:
+              yield Token(lookup_keyword(pooled, IDENTIFIER_KIND), pooled, base + end, line_index)
+          elif group == OPERATOR:
+            lexeme = input[m.start(group):end]
+            yield Token(lookup_operator(lexeme), lexeme, base + end, line_index)
+          elif group == NUMBER:
+            lexeme = input[m.start(group):end]
+            kind, value = decode_number(lexeme)
+            yield Token(kind, lexeme, base + end, line_index, value)
+          elif group == BLOCK_COMMENT:
+            self.blockCommentErrors(m.start(group), input[m.start(group):end])
+          elif group == STRING or group == CHARACTER:
+            value = input[m.start(group):end]
+            if len(value) > 1 and value[-1] == value[0]:
+              kind = TokenKind.STRING_LITERAL if group == STRING else TokenKind.CHARACTER_LITERAL
+            else:
+              kind = TokenKind.ERROR
+              self.report(m.start(group), "missing string terminator" if group == STRING else "missing character terminator")
+            yield Token(kind, value, base + end, line_index)
+          elif group == CARRIAGE_RETURN:
+            if end - m.start(group) == 1:
+              self.report(m.start(group), "invalid line ending")
+          elif group == FRACTION or group == OTHER:
+            start = end if group == FRACTION else m.start(group)
+            if final or length - start >= LOOKAHEAD:
+              # The token's position is in the window
+              token = self.fallback(start, group == FRACTION)
+              position = self.position
+              yield Token(token.kind, token.lexeme, base + position, line_index, token.value)
+              restart = True
+              break
+            else:
+              # Not enough input after it yet (3)
+              break
+          position = end
+    self.input = self.data = input[position:]
+    self.base = base + position
+    self.position = 0
+    position = self.base
+    while True:
+      yield Token(TokenKind.EOF, '', position, line_index)
+
+  def report (self, offset: int, text: str):
+    # Errors are found at offsets in the window
+    super().report(self.base + offset, text)
@@ -0,0 +1,55 @@
+from typing import Dict, Tuple
+
+from co.reader.TokenKind import TokenKind
+
+# Purpose:
+
+# Per-compilation pool of identifier and keyword lexemes. Every lexeme
+# that goes through the pool comes back as the one string object that
+# represents it, so the thousands of tokens for a common name share a
+# single string, and symbol tables and scope caches keyed by names find
+# their keys by identity instead of comparing characters.
+
+# Notes:
+#
+# 1. Keywords are pooled up front, so a lexeme that is not yet in the
+# pool is an identifier and needs no keyword check. Only a lexeme seen
+# before is looked up in the keyword table, and that probe matches by
+# identity, since the pooled string is the key itself. Python hashes
+# strings once and caches the hash, so these dictionaries take the
+# place of a separate perfect hash for the keywords.
+#
+# 2. The pool maps each string to itself rather than to a (string,
+# kind) pair, which would cost a tuple per distinct identifier.
+#
+# 3. A lexer owns one pool for all the sources it scans. Assign the same
+# pool to several lexers to share it across a compilation.
+
+class StringPool:
+
+  def __init__ (self, keywords: Dict[str, TokenKind]):
+    # Pooled string for each lexeme seen so far
+    self.strings: Dict[str, str] = { name: name for name in keywords }
+    self.keywords = keywords
+    # Kinds of the tokens whose lexemes are pooled
+    self.kinds = frozenset(keywords.values()) | {TokenKind.IDENTIFIER}
+
+  def __len__ (self) -> int:
+    return len(self.strings)
+
+  def __repr__ (self):
+    return f"StringPool({len(self.strings)} strings)"
+
+  def classify (self, lexeme: str) -> Tuple[str, TokenKind]:
+    # Pooled lexeme and its kind (a keyword kind or IDENTIFIER)
+    pooled = self.strings.get(lexeme)
+    if pooled is None:
+      self.strings[lexeme] = lexeme
+      return lexeme, TokenKind.IDENTIFIER
+    return pooled, self.keywords.get(pooled, TokenKind.IDENTIFIER)
+
+  def intern (self, lexeme: str) -> str:
+    pooled = self.strings.get(lexeme)
+    if pooled is None:
+      pooled = self.strings[lexeme] = lexeme
+    return pooled
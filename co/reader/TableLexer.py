@@ -0,0 +1,305 @@
+import re
+
+from co import reader
+from co.reader.Lexer import Lexer, keyword_lookup
+from co.reader.NumberLiteral import NUMBER_PATTERN, DECIMAL_REGEX, number_kind, decode_number
+from co.reader.TokenBuffer import TokenBuffer
+from co.reader.TokenKind import TokenKind
+
+# Purpose:
+
+# Alternative scanning engine for the Lexer. Instead of running a
+# match statement once per character, each token is recognized with a
+# single call into one compiled master regex whose named groups cover
+# whitespace, comments, literals, identifiers and operators. Operator
+# and keyword kinds come from precomputed lookup tables.
+
+# The token stream (kinds, lexemes and positions) is identical to that
+# of the character-at-a-time engine. Rare paths, such as malformed
+# numbers and non-ASCII identifiers, are handed off to the inherited
+# character-at-a-time methods so that their error recovery stays
+# exactly the same. Numeric literals are matched with the patterns in
+# NumberLiteral.
+
+# Notes:
+#
+# 1. Like the original engine, the position of a token is the offset
+# just past its last character. Neither engine counts lines; lines and
+# columns are looked up in the line index of the input (see LineIndex),
+# so line feeds are simply skipped along with other blanks.
+#
+# 2. Errors are reported to the lexer's logger, with their offsets
+# (see Lexer.report). Characters that cannot start a token are handed
+# to the character-at-a-time engine, which makes an error token of
+# each run of them.
+#
+# 3. A MappedSource is scanned with the bytes version of the master
+# regex. scan_all() then decodes nothing: kinds come from tables
+# keyed by bytes, and lexemes are decoded later, when the parser asks
+# for a token. scan() decodes each lexeme as it makes its token.
+
+OPERATOR_LOOKUP = {
+  '=':   TokenKind.EQUAL,
+  '==':  TokenKind.EQUAL_EQUAL,
+  '|':   TokenKind.BAR,
+  '||':  TokenKind.BAR_BAR,
+  '|=':  TokenKind.BAR_EQUAL,
+  '^':   TokenKind.CARET,
+  '^=':  TokenKind.CARET_EQUAL,
+  '&':   TokenKind.AMPERSAND,
+  '&&':  TokenKind.AMPERSAND_AMPERSAND,
+  '&=':  TokenKind.AMPERSAND_EQUAL,
+  '>':   TokenKind.GREATER,
+  '>>':  TokenKind.GREATER_GREATER,
+  '>>=': TokenKind.GREATER_GREATER_EQUAL,
+  '>=':  TokenKind.GREATER_EQUAL,
+  '<':   TokenKind.LESS,
+  '<<':  TokenKind.LESS_LESS,
+  '<<=': TokenKind.LESS_LESS_EQUAL,
+  '<=':  TokenKind.LESS_EQUAL,
+  '+':   TokenKind.PLUS,
+  '+=':  TokenKind.PLUS_EQUAL,
+  '-':   TokenKind.MINUS,
+  '->':  TokenKind.MINUS_GREATER,
+  '-=':  TokenKind.MINUS_EQUAL,
+  '*':   TokenKind.ASTERISK,
+  '*=':  TokenKind.ASTERISK_EQUAL,
+  '/':   TokenKind.SLASH,
+  '/=':  TokenKind.SLASH_EQUAL,
+  '%':   TokenKind.PERCENT,
+  '%=':  TokenKind.PERCENT_EQUAL,
+  '!':   TokenKind.EXCLAMATION,
+  '!=':  TokenKind.EXCLAMATION_EQUAL,
+  '~':   TokenKind.TILDE,
+  '~=':  TokenKind.TILDE_EQUAL,
+  ':':   TokenKind.COLON,
+  ';':   TokenKind.SEMICOLON,
+  '.':   TokenKind.PERIOD,
+  '..':  TokenKind.PERIOD_PERIOD,
+  ',':   TokenKind.COMMA,
+  '{':   TokenKind.L_BRACE,
+  '}':   TokenKind.R_BRACE,
+  '[':   TokenKind.L_BRACKET,
+  ']':   TokenKind.R_BRACKET,
+  '(':   TokenKind.L_PARENTHESIS,
+  ')':   TokenKind.R_PARENTHESIS,
+}
+
+# Blanks in front of a token are absorbed by the same match, and the
+# pattern matches at every position, so the whole input is covered by
+# one finditer() sweep with a single match per token.
+
+TOKEN_PATTERN = re.compile(
+  r'[ \t\n]*(?:'
+  r'(?P<IDENTIFIER>[A-Za-z_][A-Za-z0-9_]*(?![A-Za-z0-9_\x80-\U0010ffff]))'
+  r'|(?P<LINE_COMMENT>//[^\r\n]*)'
+  r'|(?P<BLOCK_COMMENT>/\*.*?(?:\*/|\Z))'
+  r'|(?P<FRACTION>\.(?=[0-9]))'
+  r'|(?P<OPERATOR>>>=|<<=|==|\|\||\|=|\^=|&&|&=|>>|>=|<<|<=|\+=|->|-=|\*=|/=|%='
+  r'|!=|~=|\.\.|[=|^&><+\-*/%!~:;.,{}\[\]()])'
+  rf'|(?P<NUMBER>{NUMBER_PATTERN})'
+  r'|(?P<STRING>"[^"]*"?)'
+  r'|(?P<CHARACTER>\'[^\']*\'?)'
+  r'|(?P<CARRIAGE_RETURN>\r\n?)'
+  r'|(?P<OTHER>.)'
+  r'|(?P<END>\Z))',
+  re.DOTALL
+)
+
+# Group numbers, so that dispatch compares small integers
+
+IDENTIFIER      = TOKEN_PATTERN.groupindex['IDENTIFIER']
+LINE_COMMENT    = TOKEN_PATTERN.groupindex['LINE_COMMENT']
+BLOCK_COMMENT   = TOKEN_PATTERN.groupindex['BLOCK_COMMENT']
+FRACTION        = TOKEN_PATTERN.groupindex['FRACTION']
+OPERATOR        = TOKEN_PATTERN.groupindex['OPERATOR']
+NUMBER          = TOKEN_PATTERN.groupindex['NUMBER']
+STRING          = TOKEN_PATTERN.groupindex['STRING']
+CHARACTER       = TOKEN_PATTERN.groupindex['CHARACTER']
+CARRIAGE_RETURN = TOKEN_PATTERN.groupindex['CARRIAGE_RETURN']
+OTHER           = TOKEN_PATTERN.groupindex['OTHER']
+
+IDENTIFIER_KIND = TokenKind.IDENTIFIER
+
+# For scanning mapped sources, which are ASCII (see MappedSource)
+
+BYTE_TOKEN_PATTERN = re.compile(
+  TOKEN_PATTERN.pattern.replace(r'\x80-\U0010ffff', '').encode('ascii'),
+  re.DOTALL
+)
+
+BYTE_KEYWORD_LOOKUP = { name.encode('ascii'): kind for name, kind in keyword_lookup.items() }
+BYTE_OPERATOR_LOOKUP = { lexeme.encode('ascii'): kind for lexeme, kind in OPERATOR_LOOKUP.items() }
+
+class TableLexer (Lexer):
+
+  def __init__ (self):
+    super().__init__()
+    self.stream = None
+
+  def setPosition (self, position: int):
+    super().setPosition(position)
+    self.stream = self.scan()
+
+  def getToken (self) -> reader.Token:
+    return next(self.stream)
+
+  def scan (self):
+    # Generator that yields one token per getToken() call. Lexemes are
+    # sliced from the text, which decodes them if it is mapped.
+    input = self.input
+    data = self.data
+    length = len(input)
+    pattern = TOKEN_PATTERN if data is input else BYTE_TOKEN_PATTERN
+    line_index = self.line_index
+    Token = reader.Token
+    strings = self.pool.strings
+    lookup_string = strings.get
+    lookup_keyword = self.pool.keywords.get
+    lookup_operator = OPERATOR_LOOKUP.__getitem__
+    position = self.position
+    while position < length:
+      restart = False
+      for m in pattern.finditer(data, position):
+        group = m.lastindex
+        end = m.end()
+        if group == IDENTIFIER:
+          id = input[m.start(group):end]
+          pooled = lookup_string(id)
+          if pooled is None:
+            strings[id] = id
+            yield Token(IDENTIFIER_KIND, id, end, line_index)
+          else:
+            yield Token(lookup_keyword(pooled, IDENTIFIER_KIND), pooled, end, line_index)
+        elif group == OPERATOR:
+          lexeme = input[m.start(group):end]
+          yield Token(lookup_operator(lexeme), lexeme, end, line_index)
+        elif group == NUMBER:
+          lexeme = input[m.start(group):end]
+          kind, value = decode_number(lexeme)
+          yield Token(kind, lexeme, end, line_index, value)
+        elif group == BLOCK_COMMENT:
+          self.blockCommentErrors(m.start(group), input[m.start(group):end])
+        elif group == FRACTION:
+          # The original engine drops the period and scans the digits
+          # that follow it as a decimal number, even after a '0'.
+          position = end
+          restart = True
+          break
+        elif group == STRING or group == CHARACTER:
+          value = input[m.start(group):end]
+          if len(value) > 1 and value[-1] == value[0]:
+            kind = TokenKind.STRING_LITERAL if group == STRING else TokenKind.CHARACTER_LITERAL
+          else:
+            kind = TokenKind.ERROR
+            self.report(m.start(group), "missing string terminator" if group == STRING else "missing character terminator")
+          yield Token(kind, value, end, line_index)
+        elif group == CARRIAGE_RETURN:
+          if end - m.start(group) == 1:
+            self.report(m.start(group), "invalid line ending")
+        elif group == OTHER:
+          # Either a character that cannot start a token or a non-ASCII
+          # letter or digit, which also covers ASCII identifiers that
+          # continue with non-ASCII characters.
+          position = m.start(group)
+          restart = True
+          break
+        position = end
+      if restart:
+        token = self.fallback(position, group == FRACTION)
+        position = self.position
+        yield token
+    self.position = position
+    while True:
+      yield Token(TokenKind.EOF, '', position, line_index)
+
+  def scan_all (self) -> TokenBuffer:
+    # Same sweep as scan(), but the columns of the token buffer are
+    # filled directly, without creating a token object per token.
+    input = self.input
+    data = self.data
+    length = len(input)
+    buffer = TokenBuffer(input, self.line_index, self.pool)
+    kinds = buffer.kinds
+    starts = buffer.starts
+    ends = buffer.ends
+    if data is input:
+      pattern = TOKEN_PATTERN
+      lookup_keyword = keyword_lookup.get
+      lookup_operator = OPERATOR_LOOKUP.__getitem__
+    else:
+      pattern = BYTE_TOKEN_PATTERN
+      lookup_keyword = BYTE_KEYWORD_LOOKUP.get
+      lookup_operator = BYTE_OPERATOR_LOOKUP.__getitem__
+    position = self.position
+    while position < length:
+      restart = False
+      for m in pattern.finditer(data, position):
+        group = m.lastindex
+        end = m.end()
+        if group == IDENTIFIER:
+          kinds.append(lookup_keyword(m[group], IDENTIFIER_KIND))
+          starts.append(m.start(group))
+          ends.append(end)
+        elif group == OPERATOR:
+          kinds.append(lookup_operator(m[group]))
+          starts.append(m.start(group))
+          ends.append(end)
+        elif group == BLOCK_COMMENT:
+          self.blockCommentErrors(m.start(group), input[m.start(group):end])
+        elif group == NUMBER:
+          kinds.append(number_kind(input[m.start(group):end]))
+          starts.append(m.start(group))
+          ends.append(end)
+        elif group == FRACTION:
+          position = end
+          restart = True
+          break
+        elif group == STRING or group == CHARACTER:
+          value = m[group]
+          if len(value) > 1 and value[-1] == value[0]:
+            kind = TokenKind.STRING_LITERAL if group == STRING else TokenKind.CHARACTER_LITERAL
+          else:
+            kind = TokenKind.ERROR
+            self.report(m.start(group), "missing string terminator" if group == STRING else "missing character terminator")
+          buffer.append(kind, m.start(group), end)
+        elif group == CARRIAGE_RETURN:
+          if end - m.start(group) == 1:
+            self.report(m.start(group), "invalid line ending")
+        elif group == OTHER:
+          position = m.start(group)
+          restart = True
+          break
+        position = end
+      if restart:
+        token = self.fallback(position, group == FRACTION)
+        position = self.position
+        buffer.append(token.kind, position - len(token.lexeme), position)
+    buffer.append(TokenKind.EOF, position, position)
+    # Leave the lexer at the end of its input
+    self.position = position
+    self.stream = self.scan()
+    return buffer
+
+  def fallback (self, position: int, number: bool) -> reader.Token:
+    # Re-scan one token with the character-at-a-time engine. The caller
+    # carries its state back over from position.
+    self.position = position
+    self.current = self.input[position]
+    if number:
+      return self.literal(DECIMAL_REGEX, self.number)
+    else:
+      return super().getToken()
+
+  def blockCommentErrors (self, start: int, comment: str):
+    # Report what the original engine reports while skipping a block
+    # comment at start: each carriage return that is not followed by a
+    # line feed, and a missing terminator.
+    closed = len(comment) >= 4 and comment.endswith('*/')
+    body = comment[2:-2] if closed else comment[2:]
+    if '\r' in body:
+      for index, char in enumerate(body):
+        if char == '\r' and body[index + 1:index + 2] != '\n':
+          self.report(start + 2 + index, "invalid line ending")
+    if not closed:
+      self.report(start, "comment not closed")
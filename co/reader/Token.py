@@ -1,13 +1,28 @@
 
+from co.reader.TokenKind import TokenKind
+from co.reader.LineIndex import LineIndex
+
 class Token:
 
-  def __init__ (self, kind: str, lexeme: str, position: int, line: int, column: int):
+  __slots__ = ('kind', 'lexeme', 'position', 'line_index', 'value')
+
+  def __init__ (self, kind: TokenKind, lexeme: str, position: int, line_index: LineIndex, value = None):
     self.kind = kind
-    # Need to change lexeme to value
     self.lexeme = lexeme
+    # Offset just past the last character
     self.position = position
-    self.line = line
-    self.column = column
+    # Line and column are looked up here when needed
+    self.line_index = line_index
+    # Decoded value of a numeric literal (int or float), otherwise None
+    self.value = value
+
+  @property
+  def line (self) -> int:
+    return self.line_index.line(self.position - len(self.lexeme))
+
+  @property
+  def column (self) -> int:
+    return self.position - self.line_index.line_start(self.line)
 
   def __repr__ (self):
-    return f"Token({self.kind}, '{self.lexeme}', {self.position}, {self.line}, {self.column})"
+    return f"Token({self.kind.name}, '{self.lexeme}', {self.position}, {self.line}, {self.column})"
@@ -0,0 +1,122 @@
+from array import array
+from bisect import bisect_left
+from typing import List
+
+from co.reader import Token
+from co.reader.LineIndex import LineIndex
+from co.reader.StringPool import StringPool
+from co.reader.TokenKind import TokenKind, KINDS
+from co.reader.NumberLiteral import NUMBER_KIND_SET, number_value
+
+# Purpose:
+
+# Compact storage for the complete token stream of one source. Instead
+# of one Token object per token, the buffer keeps parallel integer
+# columns for the kind, start offset and end offset of each token.
+# Lexemes are not stored; they are sliced out of the source on demand,
+# and lines and columns are looked up in the line index of the source.
+# Token objects can still be materialized for individual tokens, for
+# example when the parser attaches one to an AST node. The value of a
+# numeric literal is decoded, and identifiers and keywords are interned
+# in the lexer's string pool, when a token is materialized.
+
+# Notes:
+#
+# 1. After an edit (see Lexer.relex), the offsets of all the tokens
+# past the edit change by the same amount. Rather than rewriting them
+# all, the buffer records the amount as a pending shift for every entry
+# from shift_index on, and only the entries between one edit and the
+# next are rewritten when the next edit comes. Use start() and end() to
+# read offsets, or settle() the buffer before reading starts and ends
+# directly.
+
+class TokenBuffer:
+
+  def __init__ (self, input: str, line_index: LineIndex, pool: StringPool):
+    self.input = input
+    self.line_index = line_index
+    self.pool = pool
+    # One entry per token
+    self.kinds  = array('i')
+    self.starts = array('i')
+    self.ends   = array('i')
+    # Entries from shift_index on are stored shift less than their
+    # offsets
+    self.shift_index = 0
+    self.shift = 0
+
+  def __len__ (self) -> int:
+    return len(self.kinds)
+
+  def __repr__ (self):
+    return f"TokenBuffer({len(self)} tokens)"
+
+  def append (self, kind: TokenKind, start: int, end: int):
+    self.kinds.append(kind)
+    self.starts.append(start)
+    self.ends.append(end)
+
+  def kind (self, index: int) -> TokenKind:
+    return KINDS[self.kinds[index]]
+
+  def start (self, index: int) -> int:
+    return self.starts[index] + (self.shift if index >= self.shift_index else 0)
+
+  def end (self, index: int) -> int:
+    return self.ends[index] + (self.shift if index >= self.shift_index else 0)
+
+  def lexeme (self, index: int) -> str:
+    return self.input[self.start(index):self.end(index)]
+
+  def line (self, index: int) -> int:
+    return self.line_index.line(self.start(index))
+
+  def column (self, index: int) -> int:
+    return self.end(index) - self.line_index.line_start(self.line(index))
+
+  def token (self, index: int) -> Token:
+    # Materialize a full token object for a single entry
+    kind = KINDS[self.kinds[index]]
+    shift = self.shift if index >= self.shift_index else 0
+    end = self.ends[index] + shift
+    lexeme = self.input[self.starts[index] + shift:end]
+    value = None
+    if kind in NUMBER_KIND_SET:
+      value = number_value(lexeme)
+    elif kind in self.pool.kinds:
+      lexeme = self.pool.intern(lexeme)
+    return Token(kind, lexeme, end, self.line_index, value)
+
+  def search (self, column: array, offset: int, low: int = 0) -> int:
+    # Index of the first entry from low on whose offset in column
+    # (starts or ends) is at least offset
+    split = max(low, self.shift_index)
+    index = bisect_left(column, offset, low, split)
+    if index < split:
+      return index
+    return bisect_left(column, offset - self.shift, split)
+
+  def settle (self, index: int = None):
+    # Move the pending shift to start at index (by default, the end),
+    # rewriting the entries in between
+    if index is None:
+      index = len(self)
+    if self.shift and index != self.shift_index:
+      low, high = sorted((index, self.shift_index))
+      amount = self.shift if index > self.shift_index else -self.shift
+      for column in (self.starts, self.ends):
+        column[low:high] = array('i', [offset + amount for offset in column[low:high]])
+    self.shift_index = index
+
+  def splice (self, first: int, last: int, kinds: array, starts: array, ends: array, delta: int):
+    # Replace entries first to last - 1 with the given ones, and shift
+    # the offsets of the entries after them by delta
+    self.settle(last)
+    self.kinds[first:last] = kinds
+    self.starts[first:last] = starts
+    self.ends[first:last] = ends
+    self.shift_index = first + len(kinds)
+    self.shift += delta
+
+  def tokens (self) -> List[Token]:
+    return [self.token(index) for index in range(len(self))]
@@ -0,0 +1,101 @@
+import hashlib
+import os
+import struct
+import sys
+from typing import Optional, Tuple, Union
+
+from co.reader.LineIndex import LineIndex
+from co.reader.StringPool import StringPool
+from co.reader.TokenBuffer import TokenBuffer
+
+# Purpose:
+
+# On-disk cache of token buffers, so that a source that has not changed
+# since it was last scanned is not scanned again. Each entry holds the
+# columns of one token buffer (kinds, start offsets and end offsets) as
+# raw integer arrays, together with the diagnostics that scanning
+# reported (as text, in whatever form the lexer gives them), in a file
+# named after a hash of the source and the lexer version. Loading an
+# entry is a file read and three array copies. Assign a cache to a
+# lexer and its tokenize_all() uses it.
+
+# Notes:
+#
+# 1. Lexemes are not stored. As for any token buffer, they are sliced
+# from the source, which the lexer has anyway, and numeric values are
+# decoded when a token is materialized.
+#
+# 2. The key covers the source bytes (UTF-8 for a string) and
+# LEXER_VERSION, which must be bumped whenever a change to the lexer
+# changes the tokens or diagnostics of any input. Entries for other
+# versions are then simply never found again.
+#
+# 3. Arrays are stored in native byte order. An entry written on a
+# machine with the other byte order is treated as missing.
+#
+# 4. Entries are written to a temporary file and renamed into place, so
+# that concurrent builds sharing a cache never read a partial entry.
+
+LEXER_VERSION = 2
+
+MAGIC = b'COTK'
+
+# Magic, byte order, token count, diagnostics length
+HEADER = struct.Struct('<4s1sII')
+
+class TokenCache:
+
+  def __init__ (self, directory: str):
+    self.directory = directory
+    os.makedirs(directory, exist_ok=True)
+    self.hits = 0
+    self.misses = 0
+
+  def __repr__ (self):
+    return f"TokenCache({self.directory!r}, {self.hits} hits, {self.misses} misses)"
+
+  def key (self, data: Union[str, bytes]) -> str:
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(f"{LEXER_VERSION}:".encode('ascii'))
+    digest.update(data.encode('utf-8', 'surrogatepass') if isinstance(data, str) else data)
+    return digest.hexdigest()
+
+  def path (self, key: str) -> str:
+    return os.path.join(self.directory, key + '.tokens')
+
+  def load (self, key: str, input: str, line_index: LineIndex, pool: StringPool) -> Optional[Tuple[TokenBuffer, str]]:
+    # Token buffer and diagnostics stored under key, or None
+    try:
+      with open(self.path(key), 'rb') as file:
+        data = file.read()
+    except FileNotFoundError:
+      self.misses += 1
+      return None
+    magic, order, count, length = HEADER.unpack_from(data)
+    if magic != MAGIC or order != sys.byteorder[0].encode('ascii'):
+      self.misses += 1
+      return None
+    view = memoryview(data)
+    offset = HEADER.size
+    buffer = TokenBuffer(input, line_index, pool)
+    size = count * buffer.kinds.itemsize
+    for column in (buffer.kinds, buffer.starts, buffer.ends):
+      column.frombytes(view[offset:offset + size])
+      offset += size
+    diagnostics = bytes(view[offset:offset + length]).decode('utf-8', 'surrogatepass')
+    self.hits += 1
+    return buffer, diagnostics
+
+  def store (self, key: str, buffer: TokenBuffer, diagnostics: str):
+    buffer.settle()
+    text = diagnostics.encode('utf-8', 'surrogatepass')
+    header = HEADER.pack(MAGIC, sys.byteorder[0].encode('ascii'), len(buffer), len(text))
+    path = self.path(key)
+    temporary = f"{path}.{os.getpid()}"
+    with open(temporary, 'wb') as file:
+      file.write(header)
+      file.write(buffer.kinds)
+      file.write(buffer.starts)
+      file.write(buffer.ends)
+      file.write(text)
+    os.replace(temporary, path)
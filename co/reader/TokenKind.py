@@ -0,0 +1,149 @@
+from enum import IntEnum, auto
+
+# Purpose:
+
+# The kinds of token that the lexer produces, shared by the lexer, the
+# parser and the semantic passes. Kinds are small integers, so that
+# comparisons and set membership tests in the parser are cheap, and so
+# that a token buffer can store them directly in an integer array. The
+# name of each member is the same string that was used for the kind
+# before, and is what diagnostics should print.
+
+# Notes:
+#
+# 1. Values are contiguous and start at zero, so a kind can be
+# recovered from a stored value by indexing KINDS.
+#
+# 2. IntEnum formats as a plain number, so diagnostics print kind.name
+# rather than the kind itself.
+
+class TokenKind (IntEnum):
+
+  EOF = 0
+  # Malformed input that the lexer skipped (see Lexer)
+  ERROR = auto()
+  IDENTIFIER = auto()
+
+  # Keywords
+  AND = auto()
+  BREAK = auto()
+  CASE = auto()
+  CATCH = auto()
+  CLASS = auto()
+  CONST = auto()
+  CONTINUE = auto()
+  DEF = auto()
+  DEFAULT = auto()
+  DELETE = auto()
+  DO = auto()
+  ELSE = auto()
+  END = auto()
+  ENUM = auto()
+  EXTENDS = auto()
+  FALSE = auto()
+  FOR = auto()
+  FOREACH = auto()
+  FUN = auto()
+  IF = auto()
+  IN = auto()
+  LOOP = auto()
+  NULL = auto()
+  OR = auto()
+  PACKAGE = auto()
+  RETURN = auto()
+  STRUCT = auto()
+  THEN = auto()
+  TRUE = auto()
+  TYPEALIAS = auto()
+  UNION = auto()
+  VAL = auto()
+  VAR = auto()
+  WHILE = auto()
+
+  # Primitive types
+  BOOL = auto()
+  FLOAT32 = auto()
+  FLOAT64 = auto()
+  INT8 = auto()
+  INT16 = auto()
+  INT32 = auto()
+  INT64 = auto()
+  NULL_T = auto()
+  UINT8 = auto()
+  UINT16 = auto()
+  UINT32 = auto()
+  UINT64 = auto()
+  VOID = auto()
+
+  # Operators and punctuation
+  EQUAL = auto()
+  EQUAL_EQUAL = auto()
+  BAR = auto()
+  BAR_BAR = auto()
+  BAR_EQUAL = auto()
+  CARET = auto()
+  CARET_EQUAL = auto()
+  AMPERSAND = auto()
+  AMPERSAND_AMPERSAND = auto()
+  AMPERSAND_EQUAL = auto()
+  GREATER = auto()
+  GREATER_GREATER = auto()
+  GREATER_GREATER_EQUAL = auto()
+  GREATER_EQUAL = auto()
+  LESS = auto()
+  LESS_LESS = auto()
+  LESS_LESS_EQUAL = auto()
+  LESS_EQUAL = auto()
+  PLUS = auto()
+  PLUS_EQUAL = auto()
+  MINUS = auto()
+  MINUS_GREATER = auto()
+  MINUS_EQUAL = auto()
+  ASTERISK = auto()
+  ASTERISK_EQUAL = auto()
+  SLASH = auto()
+  SLASH_EQUAL = auto()
+  PERCENT = auto()
+  PERCENT_EQUAL = auto()
+  EXCLAMATION = auto()
+  EXCLAMATION_EQUAL = auto()
+  TILDE = auto()
+  TILDE_EQUAL = auto()
+  COLON = auto()
+  SEMICOLON = auto()
+  PERIOD = auto()
+  PERIOD_PERIOD = auto()
+  COMMA = auto()
+  L_BRACE = auto()
+  R_BRACE = auto()
+  L_BRACKET = auto()
+  R_BRACKET = auto()
+  L_PARENTHESIS = auto()
+  R_PARENTHESIS = auto()
+
+  # Literals
+  STRING_LITERAL = auto()
+  CHARACTER_LITERAL = auto()
+  INT32_LITERAL = auto()
+  INT64_LITERAL = auto()
+  UINT32_LITERAL = auto()
+  UINT64_LITERAL = auto()
+  FLOAT32_LITERAL = auto()
+  FLOAT64_LITERAL = auto()
+  BINARY_INT32_LITERAL = auto()
+  BINARY_INT64_LITERAL = auto()
+  BINARY_UINT32_LITERAL = auto()
+  BINARY_UINT64_LITERAL = auto()
+  OCTAL_INT32_LITERAL = auto()
+  OCTAL_INT64_LITERAL = auto()
+  OCTAL_UINT32_LITERAL = auto()
+  OCTAL_UINT64_LITERAL = auto()
+  HEXADECIMAL_INT32_LITERAL = auto()
+  HEXADECIMAL_INT64_LITERAL = auto()
+  HEXADECIMAL_UINT32_LITERAL = auto()
+  HEXADECIMAL_UINT64_LITERAL = auto()
+  HEXADECIMAL_FLOAT32 = auto()
+  HEXADECIMAL_FLOAT64 = auto()
+
+# Kinds indexed by value
+KINDS = tuple(TokenKind)
@@ -1,8 +1,18 @@
+from co.reader.TokenKind import TokenKind
+from co.reader.LineIndex import LineIndex
+from co.reader.StringPool import StringPool
 from co.reader.Token import Token
+from co.reader.TokenBuffer import TokenBuffer
+from co.reader.TokenCache import TokenCache
+from co.reader.AstCache import AstCache
+from co.reader.MappedSource import MappedSource
 from co.reader.Lexer import Lexer
+from co.reader.TableLexer import TableLexer
+from co.reader.StreamLexer import StreamLexer
 from co.reader.Logger import Logger
 from co.reader.Message import Message
 from co.reader.Parser import Parser
+from co.reader.BufferParser import BufferParser
 from co.reader.Pass1 import PrimitiveType
 from co.reader.Pass1 import Pass1
 from co.reader.Pass2 import Pass2
@@ -16,3 +26,6 @@ from co.reader.Pass4d import Pass4d
 from co.reader.Pass4e import Pass4e
 from co.reader.Pass5a import Pass5a
 from co.reader.Pass5b import Pass5b
+from co.reader.PassProfile import PassProfile
+from co.reader.PassManager import PassManager
+from co.reader.PackageParser import PackageParser
@@ -1,15 +1,40 @@
 from co.st.Symbol import Symbol
 from co.st.SymbolTable import SymbolTable
 
+# Notes:
+#
+# 1. Each scope caches the result of resolving a name through its
+# enclosing scopes, including names that did not resolve. Later passes
+# resolve the same names in the same scopes over and over, and with
+# the cache each repeat is a single dictionary lookup.
+#
+# 2. Defining a symbol in any scope, or changing the enclosing scope of
+# any scope, may change what a name resolves to in every scope nested
+# within it. Rather than tracking which scopes those are, such changes
+# bump a shared generation number, and a scope whose cache is from an
+# older generation clears it before use. Symbols are defined in Pass1,
+# so from then on the caches stay valid.
+#
+# 3. Names come from token lexemes, which the lexer interns (see
+# StringPool), so the table and cache lookups here find their keys by
+# identity without comparing characters.
+
 class Scope:
 
+  # Incremented on every change that can affect name resolution
+  generation = 0
+
   def __init__ (self, kind: str = ''):
     self.kind = kind
     self.table: SymbolTable = SymbolTable()
     self.enclosing_scope: 'Scope' = None
+    # Name to resolved symbol (or None), valid for cache_generation
+    self.cache: dict[str, Symbol] = {}
+    self.cache_generation = Scope.generation
 
   def define (self, symbol: Symbol):
     self.table.insert(symbol)
+    Scope.generation += 1
 
   def is_defined (self, name: str) -> bool:
     if self.resolve(name, False):
@@ -18,11 +43,24 @@ class Scope:
       return False
 
   def resolve (self, name: str, recurse: bool = True) -> Symbol:
+    if recurse == False:
+      return self.table.lookup(name)
+    if self.cache_generation != Scope.generation:
+      self.cache.clear()
+      self.cache_generation = Scope.generation
+    elif name in self.cache:
+      return self.cache[name]
     # Recurse through scope stack, looking for symbol
     symbol = self.table.lookup(name)
-    if symbol == None and recurse == True and self.enclosing_scope != None:
+    if symbol == None and self.enclosing_scope != None:
       symbol = self.enclosing_scope.resolve(name)
+    self.cache[name] = symbol
     return symbol
 
+  def is_cached (self, name: str) -> bool:
+    # Whether resolving name would be answered from the cache
+    return self.cache_generation == Scope.generation and name in self.cache
+
   def set_enclosing_scope (self, scope: 'Scope'):
     self.enclosing_scope = scope
+    Scope.generation += 1
@@ -1,3 +1,4 @@
+import sys
 from enum import Enum
 from typing import List
 from collections import deque
@@ -6,6 +7,8 @@ from co import reader
 from co.reader import Parser, Pass1, Pass2
 from co.reader import Pass3a, Pass3b
 from co.reader import Pass4a, Pass4b, Pass4c, Pass4d
+from co.reader import PassManager
+from co.reader.PackageParser import load_source
 
 from co import st
 from co import ast
@@ -22,33 +25,43 @@ from co.types import StructureTypeNode
 from co.types import FunctionTypeNode
 
 
-# Load input from file
-with open('test.co.txt', 'rt', newline='') as file:
-  content = file.read()
-print(content)
-
-# Create lexer
-lexer = reader.Lexer()
-lexer.setInput(content)
-
-# Create parser
-parser = Parser(lexer)
-root = parser.process()
-
-# To do: For each source file in the package, we parse it and add it to a
-# package AstNode.
-
-pass1 = Pass1(root)
-pass1.process()
-
-pass2 = Pass2(root, pass1.builtin_scope)
-pass2.process()
-
-pass3a = Pass3a(root)
-pass3a.process()
-
-pass3b = Pass3b(root)
-pass3b.process()
+# Pass --cache=DIR to load the tree from an AST cache in DIR if the
+# source has not changed since it was last parsed (see AstCache)
+cache = next((arg[len('--cache='):] for arg in sys.argv[1:] if arg.startswith('--cache=')), None)
+
+if cache is not None:
+  # Raises an exception listing any errors in the source
+  root = load_source('test.co.txt', cache)
+  root.set_attribute('node_index', ast.NodeIndex(root))
+else:
+  # Create lexer. The input file is mapped into memory rather than read.
+  lexer = reader.TableLexer()
+  lexer.setInputFile('test.co.txt')
+
+  # Create parser
+  parser = Parser(lexer)
+  root = parser.process(index=True)
+  lexer.logger.print()
+  parser.logger.print()
+  if lexer.logger.queue or parser.logger.queue:
+    sys.exit(1)
+
+# To parse all the source files of a package directory into a single
+# Package node, use reader.PackageParser.
+
+# Pass --profile or --profile=json to report where the passes spend
+# their time
+profile = next((arg for arg in sys.argv[1:] if arg.startswith('--profile')), None)
+
+manager = PassManager(root, instrument=profile is not None)
+manager.add(Pass1)
+manager.add(Pass2, lambda: Pass2(root, manager.get('Pass1').builtin_scope))
+manager.add(Pass3a)
+manager.add(Pass3b)
+manager.run()
+
+if profile is not None:
+  print(manager.report('json' if profile == '--profile=json' else 'table'))
 
 # pass4a = Pass4a(root)
 # pass4a.process()